@@ -0,0 +1,534 @@
+"""`deploy.py backup` and `restore`: page-deduplicated online backups of the database."""
+
+import subprocess
+import sys
+import os
+import time
+import collections
+import concurrent.futures
+import contextlib
+import gzip
+import hashlib
+import json
+import shutil
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+from common import (
+    DEPLOY_SLOTS, print_success, print_warning, print_error, timed, run_command,
+    is_container_running, find_volume_mountpoint,
+)
+
+# Docker volume holding backups (mounted at /app/data/backups in the container)
+BACKUP_VOLUME = "LaunchList-backups"
+
+# Compression codecs for backup packs and bundles: name -> file suffix
+COMPRESSION_CODECS = {"zstd": ".zst", "gzip": ".gz"}
+
+# Bytes of the blake2b digest that identifies a page in the backup store
+BACKUP_PAGE_HASH = 16
+
+# How long the database and WAL must have gone unwritten before their size and
+# mtime are trusted to show that nothing changed since the last backup
+BACKUP_QUIET_SECONDS = 2.0
+
+
+class BackupRestarted(Exception):
+    """The source database kept changing under a stepped backup."""
+
+
+def resolve_backup_dir(dest: str) -> Path:
+    """Return --dest if given, else the LaunchList-backups volume (or exit)."""
+    if dest:
+        return Path(dest)
+    path = find_volume_mountpoint(BACKUP_VOLUME)
+    if path is None:
+        print_error(f"Could not find the {BACKUP_VOLUME} volume; pass --dest")
+        sys.exit(1)
+    return path
+
+
+def pick_codec(codec: str) -> str:
+    """Resolve 'auto' to zstd when the CLI is installed, else gzip."""
+    if codec == "auto":
+        return "zstd" if shutil.which("zstd") else "gzip"
+    if codec == "zstd" and not shutil.which("zstd"):
+        print_error("zstd not found (apt-get install zstd), or use --compress gzip")
+        sys.exit(1)
+    return codec
+
+
+@contextlib.contextmanager
+def open_compressed(path: Path, codec: str, mode: str):
+    """Stream into (mode 'wb') or out of (mode 'rb') a zstd or gzip file."""
+    if codec == "gzip":
+        with gzip.open(path, mode, compresslevel=6) as fh:
+            yield fh
+        return
+    if mode == "wb":
+        proc = subprocess.Popen(["zstd", "-q", "-T0", "-3", "-f", "-o", str(path)], stdin=subprocess.PIPE)
+        try:
+            yield proc.stdin
+        finally:
+            proc.stdin.close()
+            if proc.wait() != 0:
+                raise OSError(f"zstd exited with status {proc.returncode} writing {path}")
+    else:
+        proc = subprocess.Popen(["zstd", "-q", "-d", "-c", str(path)], stdout=subprocess.PIPE)
+        try:
+            yield proc.stdout
+        finally:
+            proc.stdout.close()
+            if proc.wait() != 0:
+                raise OSError(f"zstd exited with status {proc.returncode} reading {path}")
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_durably(path: Path, data: bytes) -> None:
+    """Write a file via a temp name, fsync and rename."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+def snapshot_database(source: Path, dest: Path, step_pages: int, step_sleep: float) -> int:
+    """Copy a live database with the online backup API, step_pages at a time.
+
+    Each step is a short read transaction, so the server's writer is never
+    held up for long; step_sleep spaces the steps out further. A write from
+    another connection restarts a stepped backup, so if that keeps happening
+    the copy is finished in a single step instead. Returns the restart count.
+    """
+    restarts = 0
+    remaining_seen = None
+
+    def progress(_status, remaining, _total):
+        nonlocal restarts, remaining_seen
+        if remaining_seen is not None and remaining > remaining_seen:
+            restarts += 1
+            if restarts > 3:
+                raise BackupRestarted()
+        remaining_seen = remaining
+        if step_sleep:
+            time.sleep(step_sleep)
+
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    try:
+        for pages in (step_pages, -1):
+            dst = sqlite3.connect(dest)
+            try:
+                src.backup(dst, pages=pages, progress=progress if pages > 0 else None)
+                return restarts
+            except BackupRestarted:
+                print_warning("Database kept changing during the stepped backup; copying in one step")
+            finally:
+                dst.close()
+    finally:
+        src.close()
+    return restarts
+
+
+def load_backup_manifests(backup_dir: Path) -> list[dict]:
+    """Load every backup manifest, oldest first."""
+    manifests = []
+    for path in sorted((backup_dir / "manifests").glob("*.json.gz")):
+        try:
+            with gzip.open(path, "rt") as fh:
+                manifests.append(json.load(fh))
+        except (OSError, ValueError):
+            print_warning(f"Skipping unreadable manifest {path.name}")
+    return manifests
+
+
+def table_row_counts(db_path: Path) -> dict[str, int]:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        return {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tables}
+    finally:
+        conn.close()
+
+
+def database_file_state(db_path: Path) -> dict:
+    """Size and mtime of the database and its WAL, or None if either was
+    written too recently for its mtime to be sure to move on the next write."""
+    now = time.time()
+    state = {}
+    for key, path in (("db", db_path), ("wal", Path(f"{db_path}-wal"))):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            state[key] = None
+            continue
+        if now - st.st_mtime < BACKUP_QUIET_SECONDS:
+            return None
+        state[key] = [st.st_size, st.st_mtime_ns]
+    return state
+
+
+def run_backup(
+    db_path: Path, backup_dir: Path, codec: str, step_pages: int, step_sleep: float, keep: int, full: bool
+) -> dict:
+    """Take an online, page-deduplicated, compressed backup.
+
+    The database is snapshotted with the backup API, split into pages and
+    each page hashed. Pages already stored by a retained backup are only
+    referenced from the new manifest; the rest are appended to one
+    compressed pack. Storage and compression therefore scale with the pages
+    that changed since the last backup, but the snapshot and hashing still
+    read the whole database. Only a database whose files are untouched since
+    the last backup skips them.
+    """
+    started = time.monotonic()
+    for sub in ("manifests", "packs"):
+        (backup_dir / sub).mkdir(parents=True, exist_ok=True)
+    backup_id = f"LaunchList-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}"
+    if (backup_dir / "manifests" / f"{backup_id}.json.gz").exists():
+        print_error(f"Backup {backup_id} already exists")
+        sys.exit(1)
+
+    manifests = [] if full else load_backup_manifests(backup_dir)
+    source_state = database_file_state(db_path)
+    latest = manifests[-1] if manifests else None
+    if latest and source_state and latest.get("source") == str(db_path) \
+            and latest.get("source_state") == source_state:
+        return reuse_backup(backup_dir, backup_id, latest, keep, started)
+
+    # Where every page retained by earlier backups lives: hash -> pack name
+    known, pack_sums = {}, {}
+    if not full:
+        for manifest in manifests:
+            packs = manifest["packs"]
+            for page_hash, pack in zip(manifest["pages"], manifest["page_packs"]):
+                known[page_hash] = packs[pack]
+            pack_sums.update(manifest["pack_sha256"])
+
+    snapshot = backup_dir / f".snapshot-{os.getpid()}.db"
+    with timed("backup snapshot"):
+        restarts = snapshot_database(db_path, snapshot, step_pages, step_sleep)
+    snapshot_time = time.monotonic() - started
+
+    pack_name = f"{backup_id}{COMPRESSION_CODECS[codec]}"
+    pack_tmp = backup_dir / "packs" / f".{pack_name}.tmp"
+    packs, pages, page_packs = [], [], []
+    pack_index = {}
+    db_digest = hashlib.sha256()
+    new_pages = 0
+    try:
+        conn = sqlite3.connect(snapshot)
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        conn.close()
+        row_counts = table_row_counts(snapshot)
+        with timed("backup pages"), open(snapshot, "rb") as src, \
+                open_compressed(pack_tmp, codec, "wb") as pack:
+            for page in iter(lambda: src.read(page_size), b""):
+                db_digest.update(page)
+                page_hash = hashlib.blake2b(page, digest_size=BACKUP_PAGE_HASH).hexdigest()
+                owner = known.get(page_hash)
+                if owner is None:
+                    pack.write(bytes.fromhex(page_hash))
+                    pack.write(page)
+                    owner = known[page_hash] = pack_name
+                    new_pages += 1
+                if owner not in pack_index:
+                    pack_index[owner] = len(packs)
+                    packs.append(owner)
+                pages.append(page_hash)
+                page_packs.append(pack_index[owner])
+    finally:
+        snapshot.unlink(missing_ok=True)
+
+    pack_path = backup_dir / "packs" / pack_name
+    if new_pages:
+        with open(pack_tmp, "rb") as fh:
+            os.fsync(fh.fileno())
+        os.replace(pack_tmp, pack_path)
+        pack_sums[pack_name] = file_sha256(pack_path)
+    else:
+        pack_tmp.unlink(missing_ok=True)
+
+    manifest = {
+        "id": backup_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "source": str(db_path),
+        "page_size": page_size,
+        "sha256": db_digest.hexdigest(),
+        "row_counts": row_counts,
+        "packs": packs,
+        "pack_sha256": {name: pack_sums[name] for name in packs},
+        "pages": pages,
+        "page_packs": page_packs,
+        # Taken before the snapshot, so a write during it shows up next time
+        "source_state": source_state,
+    }
+    write_durably(
+        backup_dir / "manifests" / f"{backup_id}.json.gz",
+        gzip.compress(json.dumps(manifest, separators=(",", ":")).encode(), compresslevel=6),
+    )
+
+    removed = prune_backups(backup_dir, keep)
+    return {
+        "id": backup_id,
+        "pages": len(pages),
+        "new_pages": new_pages,
+        "page_size": page_size,
+        "pack_bytes": pack_path.stat().st_size if new_pages else 0,
+        "restarts": restarts,
+        "snapshot_seconds": snapshot_time,
+        "seconds": time.monotonic() - started,
+        "pruned": removed,
+        "unchanged_since": None,
+    }
+
+
+def reuse_backup(backup_dir: Path, backup_id: str, latest: dict, keep: int, started: float) -> dict:
+    """Record a backup of a database untouched since the latest one.
+
+    The new manifest points at the same pages, without a snapshot or a read
+    of the database.
+    """
+    manifest = dict(latest, id=backup_id, created_at=datetime.now(timezone.utc).isoformat())
+    write_durably(
+        backup_dir / "manifests" / f"{backup_id}.json.gz",
+        gzip.compress(json.dumps(manifest, separators=(",", ":")).encode(), compresslevel=6),
+    )
+    removed = prune_backups(backup_dir, keep)
+    return {
+        "id": backup_id,
+        "pages": len(manifest["pages"]),
+        "new_pages": 0,
+        "page_size": manifest["page_size"],
+        "pack_bytes": 0,
+        "restarts": 0,
+        "snapshot_seconds": 0.0,
+        "seconds": time.monotonic() - started,
+        "pruned": removed,
+        "unchanged_since": latest["id"],
+    }
+
+
+def prune_backups(backup_dir: Path, keep: int) -> list[str]:
+    """Keep the newest `keep` manifests and delete packs none of them reference."""
+    manifest_paths = sorted((backup_dir / "manifests").glob("*.json.gz"))
+    removed = []
+    for path in manifest_paths[:-keep] if keep > 0 else []:
+        path.unlink()
+        removed.append(path.name[:-len(".json.gz")])
+
+    referenced = {name for manifest in load_backup_manifests(backup_dir) for name in manifest["packs"]}
+    for pack in (backup_dir / "packs").iterdir():
+        if pack.name not in referenced:
+            pack.unlink()
+    for stale in backup_dir.glob(".snapshot-*.db"):
+        stale.unlink()
+    return removed
+
+
+def report_backup(result: dict) -> None:
+    total = result["pages"] * result["page_size"]
+    changed = result["new_pages"] / result["pages"] if result["pages"] else 0
+    print(f"  Database: {result['pages']:,} pages ({total / 1e6:,.1f} MB)")
+    print(f"  Changed:  {result['new_pages']:,} pages ({changed:.1%}), "
+          f"pack {result['pack_bytes'] / 1e6:,.2f} MB compressed")
+    if result["unchanged_since"]:
+        print(f"  Snapshot: skipped, database files unchanged since {result['unchanged_since']}")
+    else:
+        print(f"  Snapshot: {result['snapshot_seconds']:.2f}s"
+              + (f" ({result['restarts']} restarts)" if result["restarts"] else ""))
+    if result["pruned"]:
+        print(f"  Pruned:   {', '.join(result['pruned'])}")
+    print_success(f"Backup {result['id']} written in {result['seconds']:.2f}s")
+
+
+def find_backup_manifest(backup_dir: Path, backup_id: str) -> dict:
+    """Return the newest manifest, or the one whose id starts with backup_id (or exit)."""
+    manifests = load_backup_manifests(backup_dir)
+    if backup_id:
+        manifests = [m for m in manifests if m["id"].startswith(backup_id)]
+    if not manifests:
+        print_error(f"No backup {backup_id} found in {backup_dir}" if backup_id else f"No backups in {backup_dir}")
+        sys.exit(1)
+    return manifests[-1]
+
+
+def _restore_pack(pack_path: Path, fd: int, page_size: int, offsets: dict) -> int:
+    """Decompress one pack and write its pages wherever the manifest needs them."""
+    codec = "zstd" if pack_path.suffix == COMPRESSION_CODECS["zstd"] else "gzip"
+    written = 0
+    with open_compressed(pack_path, codec, "rb") as fh:
+        while True:
+            digest = fh.read(BACKUP_PAGE_HASH)
+            if not digest:
+                break
+            page = fh.read(page_size)
+            for offset in offsets.get(digest.hex(), ()):
+                os.pwrite(fd, page, offset)
+                written += 1
+    return written
+
+
+def _verify_table(db_path: str, table: str, pragma: str) -> tuple:
+    """Worker process: run pragma (integrity_check/quick_check, or None to skip)
+    on one table, or on the whole file when table is None, and count its rows."""
+    conn = sqlite3.connect(f"file:{db_path}?immutable=1", uri=True)
+    try:
+        if table is None:
+            return None, [row[0] for row in conn.execute(f"PRAGMA {pragma}")], None
+        quoted = '"' + table.replace('"', '""') + '"'
+        problems = [row[0] for row in conn.execute(f"PRAGMA {pragma}({quoted})")] if pragma else []
+        count = conn.execute(f"SELECT COUNT(*) FROM {quoted}").fetchone()[0]
+        return table, problems, count
+    finally:
+        conn.close()
+
+
+def verify_restored_database(db_path: Path, expected_counts: dict, workers: int, quick: bool) -> list[str]:
+    """Check a restored database in parallel worker processes. Returns problems found.
+
+    SQLite 3.33+ can integrity-check a single table with its indexes, so each
+    table is a separate task (largest first) alongside its row count; older
+    versions fall back to one whole-file check.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?immutable=1", uri=True)
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    conn.close()
+    tables.sort(key=lambda t: expected_counts.get(t, 0), reverse=True)
+    pragma = "quick_check" if quick else "integrity_check"
+
+    problems = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        if sqlite3.sqlite_version_info >= (3, 33, 0):
+            futures = [pool.submit(_verify_table, str(db_path), t, pragma) for t in tables]
+        else:
+            # Whole-file check, with the row counts running beside it
+            futures = [pool.submit(_verify_table, str(db_path), None, pragma)]
+            futures += [pool.submit(_verify_table, str(db_path), t, None) for t in tables]
+        for future in concurrent.futures.as_completed(futures):
+            table, table_problems, count = future.result()
+            problems += [f"{table or 'database'}: {p}" for p in table_problems if p != "ok"]
+            if table is not None and table in expected_counts and count != expected_counts[table]:
+                problems.append(f"{table}: {count:,} rows, backup recorded {expected_counts[table]:,}")
+    missing = set(expected_counts) - set(tables)
+    problems += [f"{table}: missing from the restored database" for table in sorted(missing)]
+    return problems
+
+
+def run_restore(
+    manifest: dict, backup_dir: Path, target: Path, workers: int, quick: bool, swap: bool
+) -> bool:
+    """Rebuild a backup next to target, verify it and (if swap) swap it in.
+
+    Packs are decompressed concurrently and their pages written straight to
+    their offsets; the result must match the manifest's SHA-256 and pass the
+    parallel integrity and row-count checks before the live file is touched.
+    The container only stops for the final rename.
+    """
+    started = time.monotonic()
+    page_size = manifest["page_size"]
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Private until swapped in, so it is opened with immutable=1 (no locks, no -shm)
+    restored = target.with_name(f".{target.name}.restore-{os.getpid()}")
+
+    offsets = {}
+    for index, page_hash in enumerate(manifest["pages"]):
+        offsets.setdefault(page_hash, []).append(index * page_size)
+    by_pack = collections.defaultdict(dict)
+    for page_hash, pack in zip(manifest["pages"], manifest["page_packs"]):
+        by_pack[manifest["packs"][pack]][page_hash] = offsets[page_hash]
+
+    try:
+        with timed("restore pages"):
+            fd = os.open(restored, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.ftruncate(fd, len(manifest["pages"]) * page_size)
+                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                    checksums = {
+                        name: pool.submit(file_sha256, backup_dir / "packs" / name) for name in by_pack
+                    }
+                    writes = [
+                        pool.submit(_restore_pack, backup_dir / "packs" / name, fd, page_size, pages)
+                        for name, pages in by_pack.items()
+                    ]
+                    for name, future in checksums.items():
+                        if future.result() != manifest["pack_sha256"][name]:
+                            print_error(f"Pack {name} does not match its recorded checksum")
+                            return False
+                    for future in writes:
+                        try:
+                            future.result()
+                        except (OSError, EOFError) as exc:
+                            print_error(f"Could not read backup pack: {exc}")
+                            return False
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        print(f"  Rebuilt {len(manifest['pages']):,} pages from {len(by_pack)} pack(s) "
+              f"in {time.monotonic() - started:.2f}s")
+
+        with timed("restore verify"):
+            if file_sha256(restored) != manifest["sha256"]:
+                print_error("Restored database does not match the backup's SHA-256")
+                return False
+            problems = verify_restored_database(restored, manifest.get("row_counts", {}), workers, quick)
+        if problems:
+            print_error("Verification failed:")
+            for problem in problems[:20]:
+                print(f"    {problem}")
+            return False
+        print_success(f"Checksum, {'quick' if quick else 'integrity'} check and row counts verified "
+                      f"({time.monotonic() - started:.2f}s)")
+
+        if not swap:
+            kept = target.with_name(f"{manifest['id']}.db")
+            os.replace(restored, kept)
+            print_success(f"Verified copy written to {kept} (live database untouched)")
+            return True
+
+        # Match the owner of the data directory (the container's nodejs user)
+        owner = target.parent.stat()
+        os.chown(restored, owner.st_uid, owner.st_gid)
+
+        running = [name for name, _ in DEPLOY_SLOTS.values()
+                   if shutil.which("docker") and is_container_running(name)]
+        with timed("restore swap"):
+            swap_started = time.monotonic()
+            for name in running:
+                run_command(["docker", "stop", "-t", "10", name], capture=True)
+            # The WAL can hold committed writes not yet in the main file, so
+            # it moves with the old database instead of being deleted; SQLite
+            # finds it again under the new name when the copy is opened
+            kept = None
+            if target.exists():
+                stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+                kept = target.with_name(f"{target.name}.pre-restore-{stamp}")
+                os.replace(target, kept)
+            for suffix in ("-wal", "-shm"):
+                sidecar = Path(f"{target}{suffix}")
+                if kept and sidecar.exists():
+                    os.replace(sidecar, Path(f"{kept}{suffix}"))
+                else:
+                    sidecar.unlink(missing_ok=True)
+            os.replace(restored, target)
+            for name in running:
+                run_command(["docker", "start", name], capture=True)
+        print_success(f"Restored {manifest['id']} to {target} "
+                      f"({time.monotonic() - swap_started:.2f}s with the app stopped, "
+                      f"{time.monotonic() - started:.2f}s total)")
+        return True
+    finally:
+        restored.unlink(missing_ok=True)
@@ -0,0 +1,357 @@
+"""Output, timing, subprocess and HTTP helpers shared by deploy.py and its modules."""
+
+import subprocess
+import sys
+import os
+import time
+import asyncio
+import contextlib
+import contextvars
+import json
+import math
+import shutil
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Name of the compose-managed container (container_name in docker-compose.yml)
+CONTAINER_NAME = "LaunchList"
+
+# Blue/green slots: (container name, host port); blue is the compose container
+DEPLOY_SLOTS = {
+    "blue": (CONTAINER_NAME, 3000),
+    "green": ("LaunchList-green", 3001),
+}
+
+
+class Colors:
+    GREEN = "\033[92m"
+    YELLOW = "\033[93m"
+    RED = "\033[91m"
+    BLUE = "\033[94m"
+    CYAN = "\033[96m"
+    BOLD = "\033[1m"
+    END = "\033[0m"
+
+
+def print_step(msg: str) -> None:
+    print(f"\n{Colors.BLUE}{Colors.BOLD}==>{Colors.END} {msg}")
+
+
+def print_success(msg: str) -> None:
+    print(f"{Colors.GREEN}✓{Colors.END} {msg}")
+
+
+def print_warning(msg: str) -> None:
+    print(f"{Colors.YELLOW}⚠{Colors.END} {msg}")
+
+
+def print_error(msg: str) -> None:
+    print(f"{Colors.RED}✗{Colors.END} {msg}")
+
+
+# Timing records of the blocks currently running in this context (outermost first)
+_active_timings = contextvars.ContextVar("active_timings", default=())
+
+# Name of the deploy step running in this context, if any
+_current_step = contextvars.ContextVar("current_step", default=None)
+
+# Completed timing records for this run, in completion order
+_timings: list[dict] = []
+
+
+@contextlib.contextmanager
+def timed(name: str):
+    """Time a block as a step, or as a sub-step of the enclosing timed block.
+
+    Records wall time and the CPU time of child processes started through
+    run_command while the block is active.
+    """
+    parents = _active_timings.get()
+    if parents:
+        name = f"{parents[-1]['name']}/{name}"
+    record = {"name": name, "wall": 0.0, "cpu": 0.0}
+    token = _active_timings.set(parents + (record,))
+    start = time.monotonic()
+    try:
+        yield record
+    finally:
+        record["wall"] = round(time.monotonic() - start, 3)
+        record["cpu"] = round(record["cpu"], 3)
+        _active_timings.reset(token)
+        _timings.append(record)
+
+
+def _collect_output(proc: subprocess.Popen) -> tuple:
+    """Read a child's captured output without reaping it."""
+    if proc.stdout is None:
+        return None, None
+    stderr = []
+    reader = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)
+    reader.start()
+    stdout = proc.stdout.read()
+    reader.join()
+    proc.stdout.close()
+    proc.stderr.close()
+    return stdout, stderr[0] if stderr else ""
+
+
+def _reap(proc: subprocess.Popen) -> None:
+    """Wait for a child, charging its CPU time to the active timed() blocks.
+
+    Without os.wait4 (non-Unix platforms) the child is only waited for.
+    """
+    if not hasattr(os, "wait4"):
+        proc.wait()
+        return
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    for record in _active_timings.get():
+        record["cpu"] += usage.ru_utime + usage.ru_stime
+
+
+def run_command(
+    cmd: list[str],
+    check: bool = True,
+    capture: bool = False,
+    env: dict = None,
+    cwd: Path = None
+) -> subprocess.CompletedProcess:
+    """Run a shell command and handle errors.
+
+    Output that is not captured streams to the terminal as the command runs.
+    If anything interrupts the run (an exception, Ctrl-C) the child is killed
+    and reaped before the error propagates.
+    """
+    full_env = os.environ.copy()
+    if env:
+        full_env.update(env)
+    # Inside a concurrent step, output passes through the step's buffer
+    buffered = not capture and _step_output_buffered()
+    if capture:
+        pipes = {"stdout": subprocess.PIPE, "stderr": subprocess.PIPE}
+    elif buffered:
+        pipes = {"stdout": subprocess.PIPE, "stderr": subprocess.STDOUT}
+    else:
+        pipes = {}
+    proc = subprocess.Popen(cmd, text=True, env=full_env, cwd=cwd, **pipes)
+    try:
+        stdout, stderr = None, None
+        if capture:
+            stdout, stderr = _collect_output(proc)
+        elif buffered:
+            for line in proc.stdout:
+                sys.stdout.write(line)
+        _reap(proc)
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            proc.wait()
+        for pipe in (proc.stdout, proc.stderr):
+            if pipe:
+                pipe.close()
+
+    if proc.returncode == 0 or not check:
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+    print_error(f"Command failed: {' '.join(cmd)}")
+    if stderr:
+        print(stderr)
+    sys.exit(1)
+
+
+class HttpResponse:
+    """Status, headers and body of one HTTP exchange, with its timings."""
+
+    def __init__(self, status: int, headers: dict[str, str], body: bytes, ttfb: float, elapsed: float):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.ttfb = ttfb
+        self.elapsed = elapsed
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+
+class HttpConnection:
+    """A keep-alive HTTP/1.1 client connection built on asyncio streams.
+
+    Deliberately minimal (plain HTTP, one request at a time) so probes and
+    load tests cost no process spawn and no third-party dependency.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            with contextlib.suppress(OSError, asyncio.CancelledError):
+                await self.writer.wait_closed()
+        self.reader = self.writer = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        headers: dict = None,
+        body: bytes = b"",
+        timeout: float = 5.0,
+    ) -> HttpResponse:
+        """Send one request, reconnecting if needed. Timings exclude connect."""
+        try:
+            return await asyncio.wait_for(self._exchange(method, path, headers or {}, body), timeout)
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _exchange(self, method: str, path: str, headers: dict, body: bytes) -> HttpResponse:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{key}: {value}" for key, value in headers.items()]
+        if body or method in ("POST", "PUT", "PATCH"):
+            lines.append(f"Content-Length: {len(body)}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+
+        start = time.perf_counter()
+        await self.writer.drain()
+        first = await self.reader.readexactly(1)
+        ttfb = time.perf_counter() - start
+        head = first + await self.reader.readuntil(b"\r\n\r\n")
+
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        for line in header_lines:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                response_headers[key.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    break
+                chunks.append((await self.reader.readexactly(size + 2))[:-2])
+            data = b"".join(chunks)
+            # Trailers, if any, end with an empty line
+            while (await self.reader.readuntil(b"\r\n")) != b"\r\n":
+                pass
+        elif "content-length" in response_headers:
+            data = await self.reader.readexactly(int(response_headers["content-length"]))
+        elif method == "HEAD" or status in (204, 304):
+            data = b""
+        else:
+            data = await self.reader.read()
+            response_headers["connection"] = "close"
+
+        elapsed = time.perf_counter() - start
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return HttpResponse(status, response_headers, data, ttfb, elapsed)
+
+
+def split_url(url: str) -> tuple[str, int, str]:
+    """Split an http:// URL into host, port and path (with query)."""
+    parts = urlsplit(url)
+    if parts.scheme != "http":
+        raise ValueError(f"Only http:// URLs are supported: {url}")
+    path = parts.path or "/"
+    if parts.query:
+        path += f"?{parts.query}"
+    return parts.hostname, parts.port or 80, path
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def is_container_running(name: str) -> bool:
+    """Check whether a container is running."""
+    result = run_command(
+        ["docker", "container", "inspect", "--format", "{{.State.Running}}", name],
+        check=False, capture=True
+    )
+    return result.stdout.strip() == "true"
+
+
+def find_volume_mountpoint(volume: str) -> Path:
+    """Return the host mountpoint of a compose volume, or None."""
+    if not shutil.which("docker"):
+        return None
+    result = run_command(
+        ["docker", "volume", "ls", "-q", "--filter", f"name={volume}"], check=False, capture=True
+    )
+    names = [n for n in result.stdout.split() if n == volume or n.endswith(f"_{volume}")]
+    if not names:
+        return None
+    result = run_command(
+        ["docker", "volume", "inspect", "--format", "{{.Mountpoint}}", names[0]], check=False, capture=True
+    )
+    if result.returncode != 0:
+        return None
+    return Path(result.stdout.strip())
+
+
+class StepOutput:
+    """Stand-in for sys.stdout that keeps concurrent steps' output apart.
+
+    The earliest-started step still running writes straight through; later
+    steps are buffered and their output is written, in start order, once every
+    step started before them has finished.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.started: list[str] = []
+        self.finished: set[str] = set()
+        self.buffers: dict[str, list[str]] = {}
+
+    def begin(self, name: str) -> None:
+        with self.lock:
+            self.started.append(name)
+            self.buffers[name] = []
+
+    def end(self, name: str) -> None:
+        with self.lock:
+            self.finished.add(name)
+            while self.started and self.started[0] in self.finished:
+                self.buffers.pop(self.started.pop(0))
+                if self.started:
+                    pending = self.buffers[self.started[0]]
+                    self.stream.write("".join(pending))
+                    pending.clear()
+            self.stream.flush()
+
+    def write(self, text: str) -> int:
+        name = _current_step.get()
+        with self.lock:
+            if name is None or name not in self.buffers or name == self.started[0]:
+                self.stream.write(text)
+            else:
+                self.buffers[name].append(text)
+        return len(text)
+
+    def flush(self) -> None:
+        with self.lock:
+            self.stream.flush()
+
+    def __getattr__(self, attr):
+        return getattr(self.stream, attr)
+
+
+def _step_output_buffered() -> bool:
+    """Whether this thread's output goes through a StepOutput buffer."""
+    return isinstance(sys.stdout, StepOutput) and _current_step.get() is not None
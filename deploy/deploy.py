@@ -4,10 +4,25 @@ LaunchList Deployment Script for Debian
 Installs Docker, configures the application, and starts the container.
 
 Usage:
-    sudo python3 deploy.py [--non-interactive]
+    sudo python3 deploy.py [--non-interactive] [--rebuild] [--blue-green] [--from-bundle PATH] [--no-tune]
+    python3 deploy.py timings [--window N] [--threshold X]
+    python3 deploy.py probe [--url URL] [--duration S] [--rate N]
+    python3 deploy.py bench [--scenario NAME ...] [--duration S] [--concurrency N]
+    python3 deploy.py seed-load --db PATH [--from-volume] [--orders N]
+    sudo python3 deploy.py backup [--db PATH] [--dest DIR] [--keep N] [--full]
+    sudo python3 deploy.py restore [BACKUP_ID] [--db PATH] [--verify-only] [--quick]
+    sudo python3 deploy.py bundle [--output PATH]
+    sudo python3 deploy.py rollback [--to TAG] [--list]
+    sudo python3 deploy.py db-maint [--db PATH] [--report-only] [--vacuum-seconds S]
+    python3 deploy.py explain --db PATH [--from-volume] [--runs N] [--only NAME ...]
+    sudo python3 deploy.py top [--db PATH] [--interval S] [--once]
 
 Options:
     --non-interactive    Use defaults/env vars instead of prompting
+    --rebuild            Ignore the build cache and rebuild every stage
+    --blue-green         Zero-downtime deploy via a second container and nginx
+    --from-bundle PATH   Install and start from a 'bundle' tarball, offline
+    --no-tune            Use docker-compose.yml limits; removes a generated override
 """
 
 import subprocess
@@ -15,8 +30,37 @@ import sys
 import os
 import time
 import argparse
+import asyncio
+import collections
+import contextlib
+import contextvars
+import hashlib
+import json
+import random
+import re
 import secrets
+import shutil
+import sqlite3
+import statistics
+import tarfile
+import uuid
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
+from urllib.parse import urlsplit
+
+from common import (
+    CONTAINER_NAME, DEPLOY_SLOTS, Colors, print_step, print_success, print_warning, print_error,
+    _active_timings, _current_step, _timings, timed, run_command, HttpResponse, HttpConnection,
+    split_url, percentile, is_container_running, find_volume_mountpoint, StepOutput,
+)
+from tuning import COMPOSE_OVERRIDE, tune_for_host, remove_compose_override
+from explain import EXPLAIN_CATALOG, run_explain
+from top import run_top
+from backup import (
+    BACKUP_VOLUME, COMPRESSION_CODECS, resolve_backup_dir, pick_codec, open_compressed, run_backup,
+    report_backup, find_backup_manifest, run_restore,
+)
 
 # Configuration with defaults
 CONFIG_FIELDS = [
@@ -37,15 +81,72 @@ CONFIG_FIELDS = [
     ("FROM_EMAIL", "From Email (optional)", "", False),
 ]
 
+# Image tag built by docker-compose.yml
+IMAGE_REPO = "launchlist"
+IMAGE_NAME = f"{IMAGE_REPO}:latest"
+
+# Tagged releases kept for `deploy.py rollback` (least recently deployed pruned first)
+KEEP_RELEASES = 5
+
+# Deploy state (build cache etc.) kept under the project directory
+STATE_DIR = ".deploy"
+
+# Inputs of each Dockerfile stage, relative to the project directory
+BUILD_STAGES = {
+    "frontend": [
+        "package.json", "package-lock.json", "index.html", "vite.config.ts",
+        "tsconfig.json", "tsconfig.app.json", "tsconfig.node.json",
+        "tailwind.config.ts", "postcss.config.js", "components.json",
+        "src", "public",
+    ],
+    "backend": [
+        "server/package.json", "server/package-lock.json",
+        "server/tsconfig.json", "server/src",
+    ],
+    "runtime": ["Dockerfile", ".dockerignore", "scripts/backup.sh"],
+}
+
+# Frontend build args from docker-compose.yml. Store settings are served to
+# the frontend at runtime (/config.js), so they no longer invalidate the build.
+FRONTEND_BUILD_ARGS = [
+    # (build arg, config key, default)
+    ("VITE_API_URL", None, "/api"),
+]
+
+# Seconds the green container keeps finishing in-flight requests after a
+# regular deploy hands traffic back to blue
+HAND_BACK_DRAIN_SECONDS = 10
+
+# Site config written by install.sh (Debian style first, then RHEL/Arch style)
+NGINX_SITE_PATHS = [
+    Path("/etc/nginx/sites-available/LaunchList"),
+    Path("/etc/nginx/conf.d/LaunchList.conf"),
+]
+
+# The server line of the LaunchList_backend upstream in deploy/nginx.conf
+NGINX_UPSTREAM_RE = re.compile(
+    r"(upstream\s+LaunchList_backend\s*\{[^}]*?server\s+127\.0\.0\.1:)(\d+)"
+)
+
+# Docker volume holding the SQLite database (the name is prefixed by compose)
+DATA_VOLUME = "LaunchList-data"
+DB_FILENAME = "LaunchList.db"
+
+# Packages installed from Docker's apt repository
+DOCKER_PACKAGES = ["docker-ce", "docker-ce-cli", "containerd.io", "docker-compose-plugin"]
+
+# Health endpoint: answers as soon as Express is listening
+HEALTH_URL = "http://127.0.0.1:3000/api/health"
+
+# Readiness endpoint polled after (re)starting the container: 200 only once the
+# database, email queue and scheduler are healthy (older images lack it)
+READY_URL = "http://127.0.0.1:3000/api/ready"
 
-class Colors:
-    GREEN = "\033[92m"
-    YELLOW = "\033[93m"
-    RED = "\033[91m"
-    BLUE = "\033[94m"
-    CYAN = "\033[96m"
-    BOLD = "\033[1m"
-    END = "\033[0m"
+# Readiness probe backoff: first delay, growth factor and cap (seconds)
+PROBE_BACKOFF = (0.05, 1.5, 0.5)
+
+# Directories never hashed as build inputs
+HASH_SKIP_DIRS = {"node_modules", "dist", ".git"}
 
 
 def print_banner() -> None:
@@ -59,50 +160,6 @@ def print_banner() -> None:
 {Colors.END}""")
 
 
-def print_step(msg: str) -> None:
-    print(f"\n{Colors.BLUE}{Colors.BOLD}==>{Colors.END} {msg}")
-
-
-def print_success(msg: str) -> None:
-    print(f"{Colors.GREEN}✓{Colors.END} {msg}")
-
-
-def print_warning(msg: str) -> None:
-    print(f"{Colors.YELLOW}⚠{Colors.END} {msg}")
-
-
-def print_error(msg: str) -> None:
-    print(f"{Colors.RED}✗{Colors.END} {msg}")
-
-
-def run_command(
-    cmd: list[str],
-    check: bool = True,
-    capture: bool = False,
-    env: dict = None
-) -> subprocess.CompletedProcess:
-    """Run a shell command and handle errors."""
-    try:
-        full_env = os.environ.copy()
-        if env:
-            full_env.update(env)
-        result = subprocess.run(
-            cmd,
-            check=check,
-            capture_output=capture,
-            text=True,
-            env=full_env
-        )
-        return result
-    except subprocess.CalledProcessError as e:
-        print_error(f"Command failed: {' '.join(cmd)}")
-        if e.stderr:
-            print(e.stderr)
-        if check:
-            sys.exit(1)
-        return e
-
-
 def check_root() -> None:
     """Ensure script is run as root."""
     if os.geteuid() != 0:
@@ -133,35 +190,38 @@ def get_compose_command() -> list[str]:
     return None
 
 
-def install_docker() -> None:
-    """Install Docker on Debian."""
+def install_docker_repo() -> None:
+    """Add Docker's apt repository and signing key."""
     print_step("Installing Docker...")
 
     # Update package index
     print("  Updating package index...")
-    run_command(["apt-get", "update", "-qq"])
+    with timed("apt-get update"):
+        run_command(["apt-get", "update", "-qq"])
 
     # Install prerequisites
     print("  Installing prerequisites...")
-    run_command([
-        "apt-get", "install", "-y", "-qq",
-        "ca-certificates", "curl", "gnupg", "lsb-release"
-    ])
+    with timed("apt-get install"):
+        run_command([
+            "apt-get", "install", "-y", "-qq",
+            "ca-certificates", "curl", "gnupg", "lsb-release"
+        ])
 
     # Add Docker's official GPG key
     print("  Adding Docker GPG key...")
     Path("/etc/apt/keyrings").mkdir(parents=True, exist_ok=True)
 
-    curl_proc = subprocess.Popen(
-        ["curl", "-fsSL", "https://download.docker.com/linux/debian/gpg"],
-        stdout=subprocess.PIPE
-    )
-    subprocess.run(
-        ["gpg", "--dearmor", "-o", "/etc/apt/keyrings/docker.gpg"],
-        stdin=curl_proc.stdout,
-        check=True
-    )
-    curl_proc.wait()
+    with timed("gpg key"):
+        curl_proc = subprocess.Popen(
+            ["curl", "-fsSL", "https://download.docker.com/linux/debian/gpg"],
+            stdout=subprocess.PIPE
+        )
+        subprocess.run(
+            ["gpg", "--batch", "--yes", "--dearmor", "-o", "/etc/apt/keyrings/docker.gpg"],
+            stdin=curl_proc.stdout,
+            check=True
+        )
+        curl_proc.wait()
 
     os.chmod("/etc/apt/keyrings/docker.gpg", 0o644)
 
@@ -183,13 +243,14 @@ def install_docker() -> None:
     )
     Path("/etc/apt/sources.list.d/docker.list").write_text(repo_line + "\n")
 
-    # Install Docker
+
+def install_docker_engine() -> None:
+    """Install and start Docker from the repository added by install_docker_repo."""
     print("  Installing Docker packages...")
-    run_command(["apt-get", "update", "-qq"])
-    run_command([
-        "apt-get", "install", "-y", "-qq",
-        "docker-ce", "docker-ce-cli", "containerd.io", "docker-compose-plugin"
-    ])
+    with timed("apt-get update"):
+        run_command(["apt-get", "update", "-qq"])
+    with timed("apt-get install"):
+        run_command(["apt-get", "install", "-y", "-qq", *DOCKER_PACKAGES])
 
     # Start and enable Docker
     run_command(["systemctl", "start", "docker"])
@@ -198,6 +259,36 @@ def install_docker() -> None:
     print_success("Docker installed successfully")
 
 
+def install_docker() -> None:
+    """Install Docker on Debian."""
+    install_docker_repo()
+    install_docker_engine()
+
+
+def get_base_images(project_dir: Path) -> list[str]:
+    """List the external base images referenced by the Dockerfile."""
+    images = []
+    stages = set()
+    for line in (project_dir / "Dockerfile").read_text().splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].upper() == "FROM":
+            if parts[1] not in stages and parts[1] not in images:
+                images.append(parts[1])
+            if len(parts) >= 4 and parts[2].upper() == "AS":
+                stages.add(parts[3])
+    return images
+
+
+def pull_base_images(project_dir: Path) -> None:
+    """Pull any Dockerfile base images that are not already present."""
+    for image in get_base_images(project_dir):
+        if get_image_id(image):
+            continue
+        print(f"  Pulling base image {image}...")
+        with timed(f"pull {image}"):
+            run_command(["docker", "pull", "-q", image], capture=True)
+
+
 def get_script_directory() -> Path:
     """Get the project root directory."""
     script_path = Path(__file__).resolve()
@@ -209,14 +300,21 @@ def generate_jwt_secret() -> str:
     return secrets.token_hex(32)
 
 
-def prompt_config(non_interactive: bool) -> dict[str, str]:
-    """Prompt user for configuration or use defaults."""
-    config = {}
+def prompt_config(non_interactive: bool, existing: dict[str, str] = None) -> dict[str, str]:
+    """Prompt user for configuration or use defaults.
+
+    Values already in LaunchList.env (existing) replace the defaults, an
+    existing JWT_SECRET is kept so staff sessions survive a redeploy, and
+    keys the script does not prompt for are carried over unchanged.
+    """
+    existing = existing or {}
+    config = dict(existing)
 
     if non_interactive:
-        print_step("Using default/environment configuration...")
+        print_step("Using existing/environment configuration..." if existing
+                   else "Using default/environment configuration...")
         for key, _, default, required in CONFIG_FIELDS:
-            value = os.environ.get(key, default)
+            value = os.environ.get(key, existing.get(key, default))
             # Auto-generate JWT secret if not provided
             if key == "JWT_SECRET" and not value:
                 value = generate_jwt_secret()
@@ -228,24 +326,38 @@ def prompt_config(non_interactive: bool) -> dict[str, str]:
         return config
 
     print_step("Configuration")
+    if existing:
+        print(f"Existing configuration found in LaunchList.env ({len(existing)} settings).")
+        answer = input("  Keep it unchanged? [Y/n]: ").strip().lower()
+        if answer in ("", "y", "yes"):
+            return config
     print("Press Enter to accept defaults shown in brackets.\n")
 
     for key, prompt, default, required in CONFIG_FIELDS:
+        current = existing.get(key, "")
         # Special handling for JWT_SECRET
         if key == "JWT_SECRET":
-            generated = generate_jwt_secret()
-            print(f"  {prompt}")
-            print(f"  [Generated: {generated[:8]}...] (press Enter to use, or type your own)")
+            if current:
+                print(f"  {prompt}")
+                print(f"  [Current: {current[:8]}...] (press Enter to keep; changing it logs out all staff)")
+                default_secret = current
+            else:
+                default_secret = generate_jwt_secret()
+                print(f"  {prompt}")
+                print(f"  [Generated: {default_secret[:8]}...] (press Enter to use, or type your own)")
             value = input("  > ").strip()
             if not value:
-                value = generated
+                value = default_secret
             elif len(value) < 32:
-                print_warning("JWT secret should be at least 32 characters. Using generated value.")
-                value = generated
+                print_warning("JWT secret should be at least 32 characters. Keeping the value shown.")
+                value = default_secret
             config[key] = value
             continue
 
-        if required:
+        # Required fields have no default: they must be typed in, unless
+        # LaunchList.env already has a value to keep
+        default = current if required else current or default
+        if required and not current:
             suffix = " [required]: "
         elif default:
             suffix = f" [{default}]: "
@@ -254,7 +366,7 @@ def prompt_config(non_interactive: bool) -> dict[str, str]:
 
         value = input(f"  {prompt}{suffix}").strip()
 
-        if not value and required:
+        if not value and required and not current:
             print_error(f"{prompt} is required")
             sys.exit(1)
 
@@ -263,73 +375,613 @@ def prompt_config(non_interactive: bool) -> dict[str, str]:
     return config
 
 
+def format_env_line(key: str, value: str) -> str:
+    if " " in value or "(" in value:
+        return f'{key}="{value}"'
+    return f"{key}={value}"
+
+
 def write_env_file(project_dir: Path, config: dict[str, str]) -> None:
-    """Write the LaunchList.env file with configuration."""
-    env_path = project_dir / "LaunchList.env"
+    """Write the LaunchList.env file with configuration.
 
-    lines = [
-        "# LaunchList Configuration",
-        "# Generated by deploy.py",
-        "# Rebuild container after changes: docker compose --env-file LaunchList.env up -d --build",
-        "",
-    ]
+    An existing file is updated in place, so its comments, ordering and any
+    keys the script does not manage are preserved.
+    """
+    env_path = project_dir / "LaunchList.env"
 
-    for key, value in config.items():
-        if " " in value or "(" in value:
-            lines.append(f'{key}="{value}"')
-        else:
-            lines.append(f"{key}={value}")
+    if env_path.exists():
+        lines, written = [], set()
+        for line in env_path.read_text().splitlines():
+            key = line.split("=", 1)[0].strip()
+            if "=" in line and not line.lstrip().startswith("#") and key in config:
+                lines.append(format_env_line(key, config[key]))
+                written.add(key)
+            else:
+                lines.append(line)
+        lines += [format_env_line(key, value) for key, value in config.items() if key not in written]
+    else:
+        lines = [
+            "# LaunchList Configuration",
+            "# Generated by deploy.py",
+            "# Apply changes (restarts the container, no rebuild): docker compose --env-file LaunchList.env up -d",
+            "",
+        ]
+        lines += [format_env_line(key, value) for key, value in config.items()]
 
     env_path.write_text("\n".join(lines) + "\n")
+    env_path.chmod(0o600)
     print_success(f"Configuration written to {env_path}")
 
 
-def build_and_start(project_dir: Path, config: dict[str, str]) -> None:
-    """Build and start the Docker containers."""
-    print_step("Building and starting containers...")
+def load_env_file(project_dir: Path) -> dict[str, str]:
+    """Read LaunchList.env back into a dict (empty if it does not exist)."""
+    env_path = project_dir / "LaunchList.env"
+    config = {}
+    if not env_path.exists():
+        return config
+    for line in env_path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        config[key.strip()] = value
+    return config
+
+
+def runtime_env_keys(project_dir: Path) -> set[str]:
+    """Variables the running container reads.
+
+    Taken from the server's config schema, direct process.env lookups and the
+    variables compose interpolates, plus those Node itself honours.
+    """
+    keys = {"NODE_OPTIONS", "UV_THREADPOOL_SIZE", "TZ"}
+    server_src = project_dir / "server" / "src"
+    keys |= set(re.findall(r"^\s+([A-Z][A-Z0-9_]*): z\.", (server_src / "config.ts").read_text(), re.MULTILINE))
+    for path in server_src.rglob("*.ts"):
+        keys |= set(re.findall(r"process\.env\.([A-Z][A-Z0-9_]*)", path.read_text()))
+    for name in ("docker-compose.yml", COMPOSE_OVERRIDE):
+        if (project_dir / name).exists():
+            keys |= set(re.findall(r"\$\{([A-Z][A-Z0-9_]*)", (project_dir / name).read_text()))
+    return keys
+
+
+def classify_config_changes(project_dir: Path, old: dict[str, str], new: dict[str, str]) -> dict[str, list[str]]:
+    """Sort changed keys by the least work that applies them.
+
+    rebuild-frontend: baked into the bundle as a build arg.
+    restart: read by the container, applied by recreating it.
+    no-op: not read by the app (e.g. DOMAIN, used by install.sh and nginx).
+    """
+    build_keys = {key for _, key, _ in FRONTEND_BUILD_ARGS if key}
+    runtime_keys = runtime_env_keys(project_dir)
+    changes = {"rebuild-frontend": [], "restart": [], "no-op": []}
+    for key in sorted(set(old) | set(new)):
+        if old.get(key) == new.get(key):
+            continue
+        if key in build_keys:
+            changes["rebuild-frontend"].append(key)
+        elif key in runtime_keys:
+            changes["restart"].append(key)
+        else:
+            changes["no-op"].append(key)
+    return changes
+
+
+def apply_config(project_dir: Path, existing: dict[str, str], config: dict[str, str]) -> dict[str, list[str]]:
+    """Write LaunchList.env if anything changed and report what each change needs."""
+    changes = classify_config_changes(project_dir, existing, config)
+    if existing and not any(changes.values()):
+        print_success("LaunchList.env unchanged")
+        return changes
+    labels = {"rebuild-frontend": "Rebuild frontend", "restart": "Restart", "no-op": "No effect on the app"}
+    for kind, keys in changes.items():
+        if existing and keys:
+            print(f"  {labels[kind]}: {', '.join(keys)}")
+    write_env_file(project_dir, config)
+    return changes
+
+
+def hash_path(path: Path) -> str:
+    """Hash a file, or every file below a directory, by relative path and content."""
+    digest = hashlib.sha256()
+    if path.is_file():
+        files = [path]
+        base = path.parent
+    elif path.is_dir():
+        files = []
+        for root, dirs, names in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d not in HASH_SKIP_DIRS)
+            files.extend(Path(root) / name for name in sorted(names))
+        base = path
+    else:
+        return "missing"
+
+    for file in files:
+        digest.update(str(file.relative_to(base)).encode())
+        digest.update(b"\0")
+        with open(file, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 16), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def compute_build_fingerprint(project_dir: Path, config: dict[str, str]) -> dict[str, dict[str, str]]:
+    """Fingerprint the inputs of each Dockerfile stage."""
+    fingerprint = {
+        stage: {name: hash_path(project_dir / name) for name in inputs}
+        for stage, inputs in BUILD_STAGES.items()
+    }
+    for arg, key, default in FRONTEND_BUILD_ARGS:
+        value = (config.get(key) if key else None) or default
+        fingerprint["frontend"][arg] = hashlib.sha256(value.encode()).hexdigest()
+    return fingerprint
+
+
+def load_build_cache(project_dir: Path) -> dict:
+    """Load the fingerprint recorded by the last successful build."""
+    cache_path = project_dir / STATE_DIR / "build-cache.json"
+    try:
+        return json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_build_cache(project_dir: Path, fingerprint: dict, image_id: str) -> None:
+    """Record the fingerprint of the image that was just built."""
+    state_dir = project_dir / STATE_DIR
+    state_dir.mkdir(exist_ok=True)
+    (state_dir / "build-cache.json").write_text(json.dumps({
+        "image": IMAGE_NAME,
+        "image_id": image_id,
+        "stages": fingerprint,
+    }, indent=2) + "\n")
+
+
+def get_image_id(image: str = IMAGE_NAME) -> str:
+    """Return the local image ID for a tag, or an empty string."""
+    result = run_command(
+        ["docker", "image", "inspect", "--format", "{{.Id}}", image],
+        check=False, capture=True
+    )
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+
+def invalidated_stages(cache: dict, fingerprint: dict) -> dict[str, list[str]]:
+    """Compare a fingerprint against the cache, returning changed inputs per stage."""
+    cached_stages = cache.get("stages", {})
+    changes = {}
+    for stage, inputs in fingerprint.items():
+        cached = cached_stages.get(stage)
+        if cached is None:
+            changes[stage] = ["no previous build"]
+            continue
+        changed = [name for name, digest in inputs.items() if cached.get(name) != digest]
+        changed += [name for name in cached if name not in inputs]
+        if changed:
+            changes[stage] = changed
+    return changes
+
+
+def load_releases(project_dir: Path) -> list[dict]:
+    """Load the tagged releases recorded by previous builds."""
+    try:
+        return json.loads((project_dir / STATE_DIR / "releases.json").read_text())
+    except (OSError, ValueError):
+        return []
+
+
+def save_releases(project_dir: Path, releases: list[dict]) -> None:
+    state_dir = project_dir / STATE_DIR
+    state_dir.mkdir(exist_ok=True)
+    (state_dir / "releases.json").write_text(json.dumps(releases, indent=2) + "\n")
+
+
+def record_release(project_dir: Path, fingerprint: dict, image_id: str) -> str:
+    """Tag the image being deployed and mark it most recently used. Returns the tag.
+
+    Tags are <content hash>-<build time>, so rebuilding identical inputs
+    reuses the existing release instead of adding another.
+    """
+    releases = load_releases(project_dir)
+    now = datetime.now(timezone.utc)
+    release = next((r for r in releases if r["image_id"] == image_id), None)
+    if release is None:
+        content = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:12]
+        release = {
+            "tag": f"{content}-{now.strftime('%Y%m%d-%H%M%S')}",
+            "image_id": image_id,
+            "stages": fingerprint,
+            "built_at": now.isoformat(),
+        }
+        releases.append(release)
+    run_command(["docker", "tag", IMAGE_NAME, f"{IMAGE_REPO}:{release['tag']}"], capture=True)
+    release["last_used"] = now.isoformat()
+    prune_releases(releases, image_id)
+    save_releases(project_dir, releases)
+    return release["tag"]
+
+
+def prune_releases(releases: list[dict], current_image_id: str) -> None:
+    """Untag the least recently used releases beyond KEEP_RELEASES (in place).
+
+    The release being deployed is never pruned; `docker rmi` of the tag
+    frees the image once nothing else references it.
+    """
+    by_use = sorted(releases, key=lambda r: r["last_used"], reverse=True)
+    for release in by_use[KEEP_RELEASES:]:
+        if release["image_id"] == current_image_id:
+            continue
+        run_command(["docker", "rmi", f"{IMAGE_REPO}:{release['tag']}"], check=False, capture=True)
+        releases.remove(release)
+
+
+def list_releases(project_dir: Path) -> None:
+    current = get_image_id()
+    releases = sorted(load_releases(project_dir), key=lambda r: r["last_used"], reverse=True)
+    if not releases:
+        print_warning("No releases recorded yet; they are tagged by each deploy")
+        return
+    print(f"  {'Tag':<30} {'Built':<20} {'Last deployed':<20}")
+    for release in releases:
+        marker = f" {Colors.GREEN}(current){Colors.END}" if release["image_id"] == current else ""
+        print(f"  {release['tag']:<30} {release['built_at'][:19]:<20} {release['last_used'][:19]:<20}{marker}")
+
+
+def rollback(project_dir: Path, to_tag: str) -> bool:
+    """Point launchlist:latest at an earlier release and restart on it."""
+    releases = load_releases(project_dir)
+    current = get_image_id()
+    if to_tag:
+        matches = [r for r in releases if r["tag"].startswith(to_tag)]
+        if len(matches) != 1:
+            print_error(f"{'No' if not matches else 'More than one'} release matches {to_tag}; see 'rollback --list'")
+            sys.exit(1)
+        release = matches[0]
+    else:
+        previous = sorted(
+            (r for r in releases if r["image_id"] != current), key=lambda r: r["last_used"], reverse=True
+        )
+        if not previous:
+            print_error("No earlier release to roll back to")
+            sys.exit(1)
+        release = previous[0]
 
-    os.chdir(project_dir)
+    tagged = f"{IMAGE_REPO}:{release['tag']}"
+    if get_image_id(tagged) != release["image_id"]:
+        print_error(f"Image {tagged} is no longer present")
+        sys.exit(1)
+    print_step(f"Rolling back to {release['tag']} (built {release['built_at'][:19]})...")
+    run_command(["docker", "tag", tagged, IMAGE_NAME], capture=True)
+    # The build cache must describe the image now tagged latest, so the next
+    # deploy rebuilds whatever differs from this release
+    save_build_cache(project_dir, release["stages"], release["image_id"])
+    record_release(project_dir, release["stages"], release["image_id"])
 
     compose_cmd = get_compose_command()
     if not compose_cmd:
         print_error("Docker Compose not found")
         sys.exit(1)
+    start_containers(project_dir, compose_cmd, load_env_file(project_dir))
+    return wait_for_healthy()
 
-    # Build with environment variables
-    print("  Building Docker image (this may take a few minutes)...")
-    run_command(compose_cmd + ["build", "--no-cache"], env=config)
 
-    # Start
-    print("  Starting containers...")
-    run_command(compose_cmd + ["up", "-d"], env=config)
+# BuildKit plain-progress lines: "#7 [frontend-builder 3/7] RUN npm ci", "#7 DONE 41.2s"
+BUILDKIT_STEP_RE = re.compile(r"^#(\d+) \[(\S+)(?: \d+/\d+)?\] (.*)")
+BUILDKIT_DONE_RE = re.compile(r"^#(\d+) DONE ([\d.]+)s")
+
+
+def run_compose_build(cmd: list[str], env: dict, cwd: Path) -> None:
+    """Run a compose build, echoing BuildKit steps and timing each Dockerfile stage.
+
+    Stage times (sum of their BuildKit step durations) are recorded as
+    sub-steps of the enclosing timed() block.
+    """
+    full_env = os.environ.copy()
+    full_env.update(env)
+    full_env["BUILDKIT_PROGRESS"] = "plain"
+
+    stage_of_step: dict[str, str] = {}
+    stage_seconds: dict[str, float] = collections.defaultdict(float)
+    tail = collections.deque(maxlen=40)
+
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=full_env, cwd=cwd
+    )
+    for line in proc.stdout:
+        line = line.rstrip()
+        tail.append(line)
+        step = BUILDKIT_STEP_RE.match(line)
+        if step and step.group(1) not in stage_of_step:
+            stage_of_step[step.group(1)] = step.group(2)
+            if step.group(2) != "internal":
+                print(f"    [{step.group(2)}] {step.group(3)}")
+            continue
+        done = BUILDKIT_DONE_RE.match(line)
+        if done and done.group(1) in stage_of_step:
+            stage_seconds[stage_of_step[done.group(1)]] += float(done.group(2))
+    proc.wait()
+
+    if proc.returncode != 0:
+        print_error(f"Command failed: {' '.join(cmd)}")
+        print("\n".join(tail))
+        sys.exit(1)
+
+    parents = _active_timings.get()
+    prefix = f"{parents[-1]['name']}/" if parents else ""
+    for stage, seconds in stage_seconds.items():
+        if stage != "internal":
+            _timings.append({"name": f"{prefix}stage {stage}", "wall": round(seconds, 3), "cpu": 0.0})
+
+
+def build_image(
+    project_dir: Path, config: dict[str, str], rebuild: bool = False, offline: bool = False
+) -> list[str]:
+    """Build the image if any stage input changed. Returns the compose command.
+
+    With offline (--from-bundle) a build is an error: it would need the network.
+    """
+    compose_cmd = get_compose_command()
+    if not compose_cmd:
+        print_error("Docker Compose not found")
+        sys.exit(1)
+
+    fingerprint = compute_build_fingerprint(project_dir, config)
+    cache = load_build_cache(project_dir)
+    image_id = get_image_id()
+
+    if rebuild:
+        changes = {stage: ["--rebuild requested"] for stage in fingerprint}
+    elif not image_id:
+        changes = {stage: [f"image {IMAGE_NAME} not found"] for stage in fingerprint}
+    elif image_id != cache.get("image_id"):
+        changes = {stage: [f"image {IMAGE_NAME} changed since the last recorded build"] for stage in fingerprint}
+    else:
+        changes = invalidated_stages(cache, fingerprint)
+
+    if changes:
+        for stage, reasons in changes.items():
+            print(f"  Stage {stage} invalidated: {', '.join(reasons)}")
+        if offline:
+            print_error("The bundled image does not match this source tree; make a new bundle")
+            sys.exit(1)
+        reused = [stage for stage in fingerprint if stage not in changes]
+        if reused:
+            print(f"  Reusing cached layers for: {', '.join(reused)}")
+
+        # Build with environment variables
+        print("  Building Docker image (this may take a few minutes)...")
+        build_args = ["build", "--no-cache"] if rebuild else ["build"]
+        with timed("compose build"):
+            run_compose_build(compose_cmd + build_args, env=config, cwd=project_dir)
+        image_id = get_image_id()
+        save_build_cache(project_dir, fingerprint, image_id)
+    else:
+        print_success(f"Build inputs unchanged, reusing image {IMAGE_NAME} (config changes apply on restart)")
+    print(f"  Release {record_release(project_dir, fingerprint, image_id)}")
+
+    return compose_cmd
+
+
+def build_and_start(
+    project_dir: Path, config: dict[str, str], rebuild: bool = False, offline: bool = False,
+    restart: bool = True
+) -> None:
+    """Build (if any stage input changed) and start the Docker containers.
+
+    With restart=False (no configuration change needs it) a running
+    container is left alone unless the image changed.
+    """
+    print_step("Building and starting containers...")
+
+    image_before = get_image_id()
+    compose_cmd = build_image(project_dir, config, rebuild, offline)
+    if not restart and get_image_id() == image_before and is_container_running(CONTAINER_NAME):
+        print_success("Image and configuration unchanged; container left running")
+        return
+    start_containers(project_dir, compose_cmd, config)
+
+
+def start_containers(project_dir: Path, compose_cmd: list[str], config: dict[str, str]) -> None:
+    """Start (or recreate) the compose container on the current image.
+
+    If a blue/green deploy left nginx on the green slot, traffic is handed
+    back: the compose container must pass the health check on the blue port
+    before nginx is repointed and the green container is stopped.
+    """
+    blue_name, blue_port = DEPLOY_SLOTS["blue"]
+    green_name, green_port = DEPLOY_SLOTS["green"]
+    live_port = get_nginx_upstream_port()
+    hand_back = live_port is not None and live_port != blue_port
+    if hand_back and live_port != green_port:
+        print_error(f"nginx upstream port {live_port} does not match a blue/green slot")
+        sys.exit(1)
+    if hand_back:
+        print(f"  nginx is serving the green slot (port {green_port}); handing traffic back to blue")
+
+    # A blue/green deploy leaves the app in plain `docker run` containers;
+    # the live green one keeps serving until blue is healthy
+    for name, _ in DEPLOY_SLOTS.values():
+        if hand_back and name == green_name:
+            continue
+        if container_exists(name) and not is_compose_container(name):
+            run_command(["docker", "rm", "-f", name], capture=True)
 
+    # Start (recreates the container only if its image or environment changed)
+    print("  Starting containers...")
+    with timed("compose up"):
+        run_command(compose_cmd + ["up", "-d"], env=config, cwd=project_dir)
     print_success("Containers started")
 
+    if hand_back:
+        with timed("health gate"):
+            healthy = wait_for_healthy(url=f"http://127.0.0.1:{blue_port}{urlsplit(READY_URL).path}")
+        if not healthy:
+            print_error(f"{blue_name} did not become healthy; green is still serving traffic")
+            print_error("Retry, or deploy the new image beside it with: sudo python3 deploy/deploy.py --blue-green")
+            sys.exit(1)
+        with timed("switch"):
+            set_nginx_upstream_port(blue_port)
+        print_success(f"nginx now routes to blue (port {blue_port})")
+        with timed("drain"):
+            time.sleep(HAND_BACK_DRAIN_SECONDS)
+            run_command(["docker", "rm", "-f", green_name], capture=True)
+
+
+async def probe_until_ready(url: str, timeout: float, fallback_path: str = None) -> dict:
+    """Poll a URL until it returns 200, backing off from 50 ms to 500 ms.
+
+    Returns time-to-first-byte (first time the server answered at all),
+    time-to-healthy, the per-probe series of (offset, status, latency) and
+    the last response body. If the server answers 404 and fallback_path is
+    given, polling switches to that path (an image predating the endpoint).
+    """
+    host, port, path = split_url(url)
+    connection = HttpConnection(host, port)
+    first_delay, growth, max_delay = PROBE_BACKOFF
+    delay = first_delay
+    start = time.monotonic()
+    result = {
+        "healthy": False, "time_to_first_byte": None, "time_to_healthy": None, "probes": [],
+        "path": path, "body": None,
+    }
 
-def wait_for_healthy(timeout: int = 90) -> bool:
-    """Wait for the application to become healthy."""
+    try:
+        while time.monotonic() - start < timeout:
+            offset = time.monotonic() - start
+            try:
+                response = await connection.request("GET", path, timeout=min(5.0, timeout))
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                result["probes"].append((round(offset, 3), None, None))
+                delay = min(delay * growth, max_delay)
+            else:
+                result["probes"].append((round(offset, 3), response.status, round(response.elapsed, 4)))
+                result["body"] = response.body
+                if result["time_to_first_byte"] is None:
+                    result["time_to_first_byte"] = offset + response.ttfb
+                if response.status == 404 and fallback_path:
+                    path = result["path"] = fallback_path
+                    fallback_path = None
+                    continue
+                if response.status == 200:
+                    result["healthy"] = True
+                    result["time_to_healthy"] = time.monotonic() - start
+                    break
+                # Listening but not ready yet: readiness is close, poll fast
+                delay = first_delay
+            await asyncio.sleep(delay)
+    finally:
+        await connection.close()
+    return result
+
+
+def readiness_summary(body: bytes) -> str:
+    """One line of timings from an /api/ready response body."""
+    try:
+        checks = json.loads(body).get("checks", {})
+    except (ValueError, AttributeError):
+        return ""
+    parts = []
+    database = checks.get("database")
+    if database:
+        parts.append(f"db read {database['readMs']:.2f} ms, WAL {database['walBytes'] / 1e6:,.1f} MB")
+    queue = checks.get("emailQueue")
+    if queue:
+        parts.append(f"{queue['pending']} emails pending")
+    scheduler = checks.get("scheduler")
+    if scheduler and scheduler.get("lastTickSecondsAgo") is not None:
+        parts.append(f"scheduler ticked {scheduler['lastTickSecondsAgo']}s ago")
+    leader = checks.get("leader")
+    if leader and leader.get("holder"):
+        parts.append("runs background jobs" if leader.get("isLeader") else f"jobs run in {leader['holder']}")
+    return "; ".join(parts)
+
+
+def wait_for_healthy(timeout: int = 90, url: str = READY_URL) -> bool:
+    """Wait for the application to become ready (healthy, for older images)."""
     print_step(f"Waiting for application to start (timeout: {timeout}s)...")
 
-    start_time = time.time()
-    while time.time() - start_time < timeout:
+    fallback = urlsplit(HEALTH_URL).path if url.endswith("/api/ready") else None
+    result = asyncio.run(probe_until_ready(url, timeout, fallback))
+    latencies = [latency for _, status, latency in result["probes"] if latency is not None]
+
+    if result["time_to_first_byte"] is not None:
+        print(f"  First response after {result['time_to_first_byte']:.2f}s")
+    if result["path"] != urlsplit(url).path:
+        print_warning(f"{urlsplit(url).path} not found (older image); waited for {result['path']} instead")
+    if result["healthy"]:
+        print(
+            f"  Ready after {result['time_to_healthy']:.2f}s "
+            f"({len(result['probes'])} probes, last {latencies[-1] * 1000:.1f} ms)"
+        )
+        summary = readiness_summary(result["body"]) if result["path"].endswith("/api/ready") else ""
+        if summary:
+            print(f"  {summary}")
+    elif result["body"]:
         try:
-            result = subprocess.run(
-                ["curl", "-s", "-o", "/dev/null", "-w", "%{http_code}",
-                 "http://localhost:3000/api/health"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.stdout.strip() == "200":
-                print()
-                return True
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
-            pass
-        time.sleep(2)
-        print(".", end="", flush=True)
+            reasons = json.loads(result["body"]).get("reasons") or []
+        except (ValueError, AttributeError):
+            reasons = []
+        for reason in reasons:
+            print_error(f"Not ready: {reason}")
+    return result["healthy"]
+
+
+async def probe_latency(url: str, duration: float, rate: float) -> dict:
+    """Probe a URL at a steady rate over one keep-alive connection."""
+    host, port, path = split_url(url)
+    connection = HttpConnection(host, port)
+    latencies, ttfbs = [], []
+    statuses = collections.Counter()
+    interval = 1.0 / rate
+    start = time.monotonic()
+    next_at = start
 
-    print()
-    return False
+    try:
+        while time.monotonic() - start < duration:
+            try:
+                response = await connection.request("GET", path)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                statuses["error"] += 1
+            else:
+                statuses[str(response.status)] += 1
+                if response.status == 200:
+                    latencies.append(response.elapsed)
+                    ttfbs.append(response.ttfb)
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+    finally:
+        await connection.close()
+
+    return {
+        "url": url,
+        "duration": round(time.monotonic() - start, 3),
+        "statuses": dict(statuses),
+        "latency_ms": {
+            name: round(percentile(latencies, pct) * 1000, 2)
+            for name, pct in (("p50", 50), ("p90", 90), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "ttfb_ms_p50": round(percentile(ttfbs, 50) * 1000, 2),
+    }
+
+
+def report_probe(url: str, duration: float, rate: float) -> bool:
+    """Run a sustained latency probe and print the percentiles."""
+    print_step(f"Probing {url} at {rate:g}/s for {duration:g}s...")
+    report = asyncio.run(probe_latency(url, duration, rate))
+
+    ok = report["statuses"].get("200", 0)
+    total = sum(report["statuses"].values())
+    print(f"  Responses: {', '.join(f'{k}={v}' for k, v in sorted(report['statuses'].items()))}")
+    if ok:
+        print("  Latency:   " + "  ".join(f"{k} {v:.1f} ms" for k, v in report["latency_ms"].items()))
+        print(f"  TTFB p50:  {report['ttfb_ms_p50']:.1f} ms")
+    if report["statuses"].get("429"):
+        print_warning("Some probes were rate limited (general limiter: 100 req/min per IP)")
+    return total > 0 and ok == total
 
 
 def get_server_ip() -> str:
@@ -342,6 +994,1022 @@ def get_server_ip() -> str:
         return "localhost"
 
 
+class HttpPool:
+    """A fixed-size pool of keep-alive connections to one host."""
+
+    def __init__(self, host: str, port: int, size: int):
+        self.connections = asyncio.Queue()
+        self.all = [HttpConnection(host, port) for _ in range(size)]
+        for connection in self.all:
+            self.connections.put_nowait(connection)
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        connection = await self.connections.get()
+        try:
+            yield connection
+        finally:
+            self.connections.put_nowait(connection)
+
+    async def close(self) -> None:
+        for connection in self.all:
+            await connection.close()
+
+
+class BenchContext:
+    """Shared state for a bench run: connection pool, auth, and known orders."""
+
+    def __init__(self, pool: HttpPool, deck_lines: int):
+        self.pool = pool
+        self.deck_lines = deck_lines
+        self.token = None
+        self.order_ids: list[str] = []
+        self.lookups: list[tuple[str, str]] = []
+        self.total_orders = 0
+        self.staff_cursor = None
+        self.counter = 0
+
+    async def request(
+        self, method: str, path: str, payload=None, headers: dict = None, auth: bool = False
+    ) -> HttpResponse:
+        headers = dict(headers or {})
+        body = b""
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers["Content-Type"] = "application/json"
+        if auth and self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        async with self.pool.connection() as connection:
+            return await connection.request(method, path, headers=headers, body=body, timeout=30.0)
+
+    def next_index(self) -> int:
+        self.counter += 1
+        return self.counter
+
+    async def login(self, email: str, password: str) -> None:
+        response = await self.request("POST", "/api/auth/login", {"email": email, "password": password})
+        if response.status != 200:
+            raise RuntimeError(f"Staff login failed with HTTP {response.status}")
+        self.token = response.json()["token"]
+
+    async def load_orders(self) -> None:
+        """Collect order IDs and lookup keys from the staff order list."""
+        response = await self.request("GET", "/api/staff/orders?limit=100", auth=True)
+        if response.status != 200:
+            raise RuntimeError(f"Listing staff orders failed with HTTP {response.status}")
+        data = response.json()
+        self.total_orders = data["total"]
+        for order in data["orders"]:
+            self.order_ids.append(order["id"])
+            self.lookups.append((order["orderNumber"], order["email"]))
+
+
+def bench_decklist(lines: int) -> tuple[str, list[dict]]:
+    """Build a synthetic decklist with the given number of distinct lines."""
+    items = [
+        {"quantity": 1 + i % 4, "cardName": f"Bench Card {i}", "lineRaw": f"{1 + i % 4} Bench Card {i}"}
+        for i in range(lines)
+    ]
+    return "\n".join(item["lineRaw"] for item in items), items
+
+
+async def scenario_health(ctx: BenchContext) -> int:
+    return (await ctx.request("GET", "/api/health")).status
+
+
+async def scenario_submit(ctx: BenchContext) -> int:
+    csrf = await ctx.request("GET", "/api/csrf-token")
+    if csrf.status != 200:
+        return csrf.status
+    n = ctx.next_index()
+    raw, items = bench_decklist(ctx.deck_lines)
+    response = await ctx.request("POST", "/api/orders", {
+        "customerName": f"Bench Customer {n}",
+        "email": f"bench+{n}@example.com",
+        "phone": "555.123.4567",
+        "notifyMethod": "email",
+        "game": "magic",
+        "rawDecklist": raw,
+        "lineItems": items,
+    }, headers={"X-CSRF-Token": csrf.json()["token"]})
+    if response.status == 201:
+        order = response.json()["order"]
+        ctx.order_ids.append(order["id"])
+        ctx.lookups.append((order["orderNumber"], order["email"]))
+    return response.status
+
+
+async def scenario_lookup(ctx: BenchContext) -> int:
+    order_number, email = ctx.lookups[ctx.next_index() % len(ctx.lookups)]
+    response = await ctx.request("POST", "/api/orders/lookup", {"orderNumber": order_number, "email": email})
+    return response.status
+
+
+async def scenario_staff_list(ctx: BenchContext) -> int:
+    # Page through the list the way the dashboard does, starting over after the last page
+    path = "/api/staff/orders?limit=50"
+    if ctx.staff_cursor:
+        path += f"&cursor={ctx.staff_cursor}"
+    response = await ctx.request("GET", path, auth=True)
+    if response.status == 200:
+        ctx.staff_cursor = json.loads(response.body).get("nextCursor")
+    else:
+        ctx.staff_cursor = None
+    return response.status
+
+
+async def scenario_detail(ctx: BenchContext) -> int:
+    order_id = ctx.order_ids[ctx.next_index() % len(ctx.order_ids)]
+    return (await ctx.request("GET", f"/api/staff/orders/{order_id}", auth=True)).status
+
+
+# name: (operation, needs staff auth, needs known orders, creates data)
+BENCH_SCENARIOS = {
+    "health": (scenario_health, False, False, False),
+    "submit": (scenario_submit, False, False, True),
+    "lookup": (scenario_lookup, False, True, False),
+    "staff-list": (scenario_staff_list, True, False, False),
+    "detail": (scenario_detail, True, True, False),
+}
+
+# Scenarios run when none are named: everything that does not write
+DEFAULT_BENCH_SCENARIOS = ["health", "lookup", "staff-list", "detail"]
+
+
+async def run_scenario(ctx: BenchContext, name: str, duration: float, concurrency: int) -> dict:
+    """Run one scenario from `concurrency` workers for `duration` seconds."""
+    operation = BENCH_SCENARIOS[name][0]
+    latencies = []
+    statuses = collections.Counter()
+    start = time.monotonic()
+    deadline = start + duration
+
+    async def worker() -> None:
+        while time.monotonic() < deadline:
+            op_start = time.perf_counter()
+            try:
+                status = await operation(ctx)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, KeyError):
+                statuses["error"] += 1
+                await asyncio.sleep(0.01)
+                continue
+            latencies.append(time.perf_counter() - op_start)
+            statuses[status] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.monotonic() - start
+    total = sum(statuses.values())
+    failed = sum(count for status, count in statuses.items() if status == "error" or (status >= 400 and status != 429))
+    return {
+        "scenario": name,
+        "operations": total,
+        "duration": round(elapsed, 3),
+        "throughput": round(total / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            label: round(percentile(latencies, pct) * 1000, 2)
+            for label, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "rate_limited": round(statuses.get(429, 0) / total, 4) if total else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+    }
+
+
+async def run_bench(
+    url: str, scenarios: list[str], duration: float, concurrency: int, deck_lines: int,
+    email: str = None, password: str = None, token: str = None,
+) -> list[dict]:
+    """Prepare auth and known orders, then run each scenario in turn."""
+    host, port, _ = split_url(url)
+    pool = HttpPool(host, port, concurrency)
+    ctx = BenchContext(pool, deck_lines)
+    results = []
+    try:
+        ctx.token = token
+        if email and password and not token:
+            await ctx.login(email, password)
+        if ctx.token:
+            await ctx.load_orders()
+
+        for name in scenarios:
+            _, needs_auth, needs_orders, _ = BENCH_SCENARIOS[name]
+            if needs_auth and not ctx.token:
+                print_warning(f"Skipping {name}: needs staff credentials (--email/--password or --token)")
+                continue
+            if needs_orders and not ctx.order_ids:
+                print_warning(f"Skipping {name}: no known orders (give staff credentials or run submit first)")
+                continue
+            print(f"  Running {name} for {duration:g}s with {concurrency} connections...")
+            results.append(await run_scenario(ctx, name, duration, concurrency))
+    finally:
+        await pool.close()
+    return results
+
+
+def print_bench_table(results: list[dict]) -> None:
+    """Print bench results as a table."""
+    print(f"\n  {'Scenario':<12} {'Ops':>7} {'Ops/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'Errors':>7} {'429s':>7}")
+    for r in results:
+        lat = r["latency_ms"]
+        print(
+            f"  {r['scenario']:<12} {r['operations']:>7} {r['throughput']:>8.1f} "
+            f"{lat['p50']:>6.1f}ms {lat['p95']:>6.1f}ms {lat['p99']:>6.1f}ms "
+            f"{r['error_rate']:>6.1%} {r['rate_limited']:>6.1%}"
+        )
+
+
+def container_exists(name: str) -> bool:
+    """Check whether a container (running or stopped) exists."""
+    return run_command(["docker", "container", "inspect", name], check=False, capture=True).returncode == 0
+
+
+def is_compose_container(name: str) -> bool:
+    """Check whether a container was created by docker compose."""
+    result = run_command(
+        ["docker", "container", "inspect", "--format",
+         '{{index .Config.Labels "com.docker.compose.project"}}', name],
+        check=False, capture=True
+    )
+    return result.returncode == 0 and bool(result.stdout.strip())
+
+
+def find_nginx_site() -> Path:
+    """Return the installed LaunchList nginx site config, if any."""
+    for path in NGINX_SITE_PATHS:
+        if path.exists():
+            return path
+    return None
+
+
+def get_nginx_upstream_port() -> int:
+    """Return the port nginx currently proxies LaunchList to, if installed."""
+    site = find_nginx_site()
+    if site is None:
+        return None
+    match = NGINX_UPSTREAM_RE.search(site.read_text())
+    return int(match.group(2)) if match else None
+
+
+def set_nginx_upstream_port(port: int) -> None:
+    """Atomically repoint the LaunchList_backend upstream and reload nginx.
+
+    The new file is renamed over the old one, validated with nginx -t
+    (restoring the original on failure), then applied with a graceful
+    reload so in-flight requests finish on the old workers.
+    """
+    site = find_nginx_site()
+    original = site.read_text()
+    updated = NGINX_UPSTREAM_RE.sub(lambda m: f"{m.group(1)}{port}", original, count=1)
+
+    def replace_site(text: str) -> None:
+        tmp_path = site.with_name(f".{site.name}.tmp")
+        tmp_path.write_text(text)
+        os.chmod(tmp_path, site.stat().st_mode & 0o777)
+        os.replace(tmp_path, site)
+
+    replace_site(updated)
+    if run_command(["nginx", "-t"], check=False, capture=True).returncode != 0:
+        replace_site(original)
+        print_error("nginx rejected the updated config; original restored")
+        sys.exit(1)
+    run_command(["systemctl", "reload", "nginx"])
+
+
+def get_service_definition(project_dir: Path, compose_cmd: list[str], config: dict[str, str]) -> dict:
+    """Return the fully resolved compose definition of the app service."""
+    result = run_command(
+        compose_cmd + ["config", "--format", "json"], capture=True, env=config, cwd=project_dir
+    )
+    return json.loads(result.stdout)["services"]["app"]
+
+
+def run_slot_container(
+    project_dir: Path, service: dict, name: str, port: int, volumes_from: str
+) -> None:
+    """Start the app image in a standalone container for a blue/green slot."""
+    env_path = project_dir / STATE_DIR / f"{name}.env"
+    env_path.parent.mkdir(exist_ok=True)
+    env_path.touch(mode=0o600)
+    environment = service.get("environment") or {}
+    env_path.write_text("".join(f"{key}={value or ''}\n" for key, value in environment.items()))
+
+    cmd = [
+        "docker", "run", "-d",
+        "--name", name,
+        "--env-file", str(env_path),
+        "--volumes-from", volumes_from,
+        "-p", f"127.0.0.1:{port}:3000",
+        "--restart", "unless-stopped",
+        "--log-opt", "max-size=10m",
+        "--log-opt", "max-file=3",
+    ]
+    limits = (service.get("deploy") or {}).get("resources", {}).get("limits", {})
+    if limits.get("cpus"):
+        cmd += ["--cpus", str(limits["cpus"])]
+    if limits.get("memory"):
+        cmd += ["--memory", str(limits["memory"])]
+    try:
+        run_command(cmd + [IMAGE_NAME], capture=True)
+    finally:
+        env_path.unlink()
+
+
+def blue_green_deploy(
+    project_dir: Path, config: dict[str, str], rebuild: bool = False, drain_seconds: float = 10.0,
+    offline: bool = False
+) -> bool:
+    """Build, start the new image beside the live one, and switch nginx over.
+
+    The new container runs on the idle slot's port against the live
+    container's volumes and must pass wait_for_healthy before nginx is
+    repointed. The old container is then drained and stopped (kept for
+    manual rollback). Returns False, leaving the live slot untouched, if the
+    new container never becomes healthy.
+    """
+    print_step("Blue/green deploy...")
+
+    if find_nginx_site() is None:
+        print_error("Blue/green deploys switch traffic in nginx, but no LaunchList site config was found")
+        print_error(f"Looked in: {', '.join(str(p) for p in NGINX_SITE_PATHS)}")
+        sys.exit(1)
+
+    live_port = get_nginx_upstream_port()
+    live_slot = next((slot for slot, (_, port) in DEPLOY_SLOTS.items() if port == live_port), None)
+    if live_slot is None:
+        print_error(f"nginx upstream port {live_port} does not match a blue/green slot")
+        sys.exit(1)
+    live_name = DEPLOY_SLOTS[live_slot][0]
+    target_slot = "green" if live_slot == "blue" else "blue"
+    target_name, target_port = DEPLOY_SLOTS[target_slot]
+
+    compose_cmd = build_image(project_dir, config, rebuild, offline)
+
+    if not is_container_running(live_name):
+        print_warning(f"Live container {live_name} is not running; doing a regular deploy instead")
+        build_and_start(project_dir, config, offline=offline)
+        return wait_for_healthy()
+
+    print(f"  Live slot: {live_slot} ({live_name}, port {live_port})")
+    print(f"  Starting {target_slot} ({target_name}, port {target_port})...")
+    if container_exists(target_name):
+        run_command(["docker", "rm", "-f", target_name], capture=True)
+    with timed("start"):
+        service = get_service_definition(project_dir, compose_cmd, config)
+        run_slot_container(project_dir, service, target_name, target_port, live_name)
+
+    with timed("health gate"):
+        healthy = wait_for_healthy(url=f"http://127.0.0.1:{target_port}{urlsplit(READY_URL).path}")
+    if not healthy:
+        print_error(f"{target_name} did not become healthy; {live_slot} is still serving traffic")
+        run_command(["docker", "rm", "-f", target_name], capture=True)
+        return False
+
+    with timed("switch"):
+        set_nginx_upstream_port(target_port)
+    print_success(f"nginx now routes to {target_slot} (port {target_port})")
+
+    print(f"  Draining {live_name} for {drain_seconds:g}s...")
+    with timed("drain"):
+        time.sleep(drain_seconds)
+        run_command(["docker", "stop", "-t", "30", live_name], capture=True)
+    print_success(f"Stopped {live_name} (kept for manual rollback)")
+    return True
+
+
+def apt_dependency_closure(packages: list[str]) -> list[str]:
+    """Return packages plus everything they depend on, recursively.
+
+    Base libraries are included too; install_bundle_debs skips whatever the
+    target already has, so the bundle works on a minimal install.
+    """
+    result = run_command([
+        "apt-cache", "depends", "--recurse", "--no-recommends", "--no-suggests", "--no-conflicts",
+        "--no-breaks", "--no-replaces", "--no-enhances", *packages,
+    ], capture=True)
+    return sorted({
+        line.strip() for line in result.stdout.splitlines()
+        if line and not line[0].isspace() and not line.startswith("<") and ":" not in line
+    })
+
+
+def create_bundle(project_dir: Path, output: Path, codec: str) -> None:
+    """Write a tarball with everything --from-bundle needs to deploy offline.
+
+    It holds the Docker .debs (with the dependencies a minimal Debian lacks),
+    `docker save` of the built image and the Dockerfile base images, and the
+    build cache that marks the image as current for this source tree.
+    """
+    cache = load_build_cache(project_dir)
+    image_id = get_image_id()
+    if not image_id or image_id != cache.get("image_id"):
+        print_error(f"{IMAGE_NAME} is missing or not the last recorded build; deploy on this host first")
+        sys.exit(1)
+    if invalidated_stages(cache, compute_build_fingerprint(project_dir, {})):
+        print_error(f"The source tree changed since {IMAGE_NAME} was built; redeploy on this host first")
+        sys.exit(1)
+
+    work = project_dir / STATE_DIR / f"bundle-{os.getpid()}"
+    (work / "debs").mkdir(parents=True)
+    try:
+        print("  Downloading Docker packages...")
+        with timed("bundle debs"):
+            packages = apt_dependency_closure(DOCKER_PACKAGES + ["docker-buildx-plugin"])
+            run_command(["apt-get", "download", "-qq", *packages], capture=True, cwd=work / "debs")
+        for keyring in (Path("/etc/apt/keyrings/docker.gpg"), Path("/etc/apt/sources.list.d/docker.list")):
+            if keyring.exists():
+                shutil.copy2(keyring, work / keyring.name)
+
+        images = [IMAGE_NAME] + get_base_images(project_dir)
+        image_file = f"images.tar{COMPRESSION_CODECS[codec]}"
+        print(f"  Saving {', '.join(images)}...")
+        with timed("bundle images"), open_compressed(work / image_file, codec, "wb") as out:
+            proc = subprocess.Popen(["docker", "save", *images], stdout=subprocess.PIPE)
+            shutil.copyfileobj(proc.stdout, out, 1 << 20)
+            if proc.wait() != 0:
+                print_error("docker save failed")
+                sys.exit(1)
+
+        shutil.copy2(project_dir / STATE_DIR / "build-cache.json", work / "build-cache.json")
+        (work / "bundle.json").write_text(json.dumps({
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "codename": run_command(["lsb_release", "-cs"], capture=True).stdout.strip(),
+            "arch": run_command(["dpkg", "--print-architecture"], capture=True).stdout.strip(),
+            "image_id": image_id,
+            "images": images,
+            "image_file": image_file,
+            "debs": sorted(p.name for p in (work / "debs").glob("*.deb")),
+        }, indent=2) + "\n")
+
+        # Already compressed inside, so the outer tar is plain
+        with timed("bundle tar"), tarfile.open(output, "w") as tar:
+            for path in sorted(work.iterdir()):
+                tar.add(path, arcname=path.name)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def extract_bundle(project_dir: Path, bundle: Path) -> Path:
+    """Unpack a bundle into the state directory and check it fits this host."""
+    print_step(f"Unpacking {bundle}...")
+    bundle_dir = project_dir / STATE_DIR / "bundle"
+    shutil.rmtree(bundle_dir, ignore_errors=True)
+    bundle_dir.mkdir(parents=True)
+    with timed("bundle extract"), tarfile.open(bundle) as tar:
+        for member in tar.getmembers():
+            if not (member.isfile() or member.isdir()) or member.name.startswith("/") \
+                    or ".." in Path(member.name).parts:
+                print_error(f"Unexpected entry in bundle: {member.name}")
+                sys.exit(1)
+        tar.extractall(bundle_dir, **({"filter": "data"} if hasattr(tarfile, "data_filter") else {}))
+
+    meta = json.loads((bundle_dir / "bundle.json").read_text())
+    arch = run_command(["dpkg", "--print-architecture"], capture=True).stdout.strip()
+    if meta["arch"] != arch:
+        print_error(f"Bundle was made for {meta['arch']}, this host is {arch}")
+        sys.exit(1)
+    codename = run_command(["lsb_release", "-cs"], check=False, capture=True).stdout.strip()
+    if codename and meta["codename"] != codename:
+        print_warning(f"Bundle was made on Debian {meta['codename']}, this host runs {codename}")
+    print_success(f"Bundle from {meta['created_at']}: {len(meta['debs'])} packages, "
+                  f"{len(meta['images'])} images")
+    return bundle_dir
+
+
+def install_bundle_debs(bundle_dir: Path) -> None:
+    """Install Docker from the bundled .debs without touching the network."""
+    print_step("Installing Docker from bundle...")
+    result = run_command(["dpkg-query", "-W", "-f", "${Package} ${Status}\\n"], check=False, capture=True)
+    installed = {
+        line.split()[0] for line in result.stdout.splitlines() if line.endswith("install ok installed")
+    }
+    debs = [
+        str(deb) for deb in sorted((bundle_dir / "debs").glob("*.deb"))
+        if deb.name.split("_")[0] not in installed
+    ]
+    with timed("apt-get install"):
+        run_command([
+            "apt-get", "install", "-y", "-qq", "--no-download", "--no-install-recommends", *debs
+        ], capture=True)
+    for name, dest in (("docker.gpg", "/etc/apt/keyrings"), ("docker.list", "/etc/apt/sources.list.d")):
+        if (bundle_dir / name).exists():
+            Path(dest).mkdir(parents=True, exist_ok=True)
+            shutil.copy2(bundle_dir / name, Path(dest) / name)
+
+    run_command(["systemctl", "start", "docker"])
+    run_command(["systemctl", "enable", "docker"])
+    print_success("Docker installed from bundle")
+
+
+def load_bundle_images(project_dir: Path, bundle_dir: Path) -> None:
+    """docker load the bundled images and adopt the bundle's build cache."""
+    meta = json.loads((bundle_dir / "bundle.json").read_text())
+    if get_image_id() == meta["image_id"]:
+        print_success(f"{IMAGE_NAME} from the bundle is already loaded")
+    else:
+        print(f"  Loading {', '.join(meta['images'])}...")
+        image_file = bundle_dir / meta["image_file"]
+        with timed("docker load"):
+            if image_file.suffix == COMPRESSION_CODECS["gzip"]:
+                run_command(["docker", "load", "-q", "-i", str(image_file)], capture=True)
+            else:
+                with open_compressed(image_file, "zstd", "rb") as src:
+                    subprocess.run(["docker", "load", "-q"], stdin=src, stdout=subprocess.DEVNULL, check=True)
+    (project_dir / STATE_DIR).mkdir(exist_ok=True)
+    shutil.copy2(bundle_dir / "build-cache.json", project_dir / STATE_DIR / "build-cache.json")
+
+
+def find_data_volume_db() -> Path:
+    """Locate LaunchList.db inside the compose data volume on this host."""
+    mountpoint = find_volume_mountpoint(DATA_VOLUME)
+    return mountpoint / DB_FILENAME if mountpoint is not None else None
+
+
+def resolve_db_path(db: str) -> Path:
+    """Return --db if given, else the database in the data volume (or exit)."""
+    if db:
+        return Path(db)
+    path = find_data_volume_db()
+    if path is None or not path.exists():
+        print_error(f"Could not find {DB_FILENAME} in the {DATA_VOLUME} volume; pass --db")
+        sys.exit(1)
+    return path
+
+
+def copy_database(source: Path, dest: Path) -> None:
+    """Copy a live SQLite database with the online backup API."""
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(dest)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def apply_server_schema(conn: sqlite3.Connection, project_dir: Path) -> None:
+    """Create tables exactly as server/src/db/index.ts does.
+
+    The CREATE/ALTER statements are read from the server's sqlite.exec()
+    calls rather than duplicated here, so the schema cannot drift.
+    """
+    source = (project_dir / "server" / "src" / "db" / "index.ts").read_text()
+    for sql in re.findall(r"sqlite\.exec\(\s*`(.*?)`\s*\)", source, re.DOTALL):
+        if not sql.strip().upper().startswith(("CREATE", "ALTER")):
+            continue
+        try:
+            conn.executescript(sql)
+        except sqlite3.OperationalError as exc:
+            if "duplicate column" not in str(exc):
+                raise
+
+
+def match_db_owner(db_path: Path) -> None:
+    """Give -wal/-shm files created by this (root) process to the database's owner."""
+    owner = db_path.stat()
+    for suffix in ("-wal", "-shm"):
+        path = Path(f"{db_path}{suffix}")
+        if path.exists() and (path.stat().st_uid, path.stat().st_gid) != (owner.st_uid, owner.st_gid):
+            os.chown(path, owner.st_uid, owner.st_gid)
+
+
+def report_db_size(conn: sqlite3.Connection, db_path: Path) -> dict:
+    """Print per-table/index page usage, freelist bloat and WAL size."""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    auto_vacuum = ("none", "full", "incremental")[conn.execute("PRAGMA auto_vacuum").fetchone()[0]]
+    wal_path = Path(f"{db_path}-wal")
+    wal_bytes = wal_path.stat().st_size if wal_path.exists() else 0
+
+    types = dict(conn.execute("SELECT name, type FROM sqlite_master"))
+    try:
+        objects = conn.execute(
+            "SELECT name, pageno, unused, pgsize FROM dbstat WHERE aggregate = TRUE ORDER BY pageno DESC"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        objects = []
+        print_warning("This SQLite build has no dbstat table; per-object sizes unavailable")
+    if objects:
+        print(f"  {'Object':<40} {'Type':<6} {'Pages':>9} {'Size':>10} {'Unused':>7}")
+        for name, pages, unused, size in objects:
+            print(f"  {name:<40} {types.get(name, 'table'):<6} {pages:>9,} "
+                  f"{size / 1e6:>8,.1f}MB {unused / size if size else 0:>7.0%}")
+    print(f"  File:     {page_count * page_size / 1e6:,.1f} MB ({page_count:,} pages of {page_size} B)")
+    print(f"  Freelist: {freelist:,} pages ({freelist * page_size / 1e6:,.1f} MB, "
+          f"{freelist / page_count if page_count else 0:.1%}), auto_vacuum={auto_vacuum}")
+    print(f"  WAL:      {wal_bytes / 1e6:,.1f} MB")
+    return {"freelist": freelist, "auto_vacuum": auto_vacuum, "page_size": page_size}
+
+
+def db_maintenance(db_path: Path, report_only: bool, vacuum_seconds: float, convert: bool) -> None:
+    """Report on and tidy up a live database.
+
+    Checkpointing, ANALYZE and incremental vacuum all run in short
+    transactions with a busy timeout, so the server keeps working; only
+    --convert-incremental needs a full VACUUM, which blocks writers while it
+    rewrites the file.
+    """
+    conn = sqlite3.connect(db_path, timeout=10, isolation_level=None)
+    try:
+        print_step(f"Database report for {db_path}")
+        stats = report_db_size(conn, db_path)
+        if report_only:
+            return
+
+        print_step("Maintenance")
+        with timed("wal checkpoint"):
+            busy, wal_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            print_warning(f"Checkpoint blocked by active readers ({checkpointed}/{wal_frames} frames copied)")
+        else:
+            print_success(f"Checkpointed {wal_frames:,} WAL frames and truncated the WAL")
+
+        with timed("analyze"):
+            started = time.monotonic()
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA optimize")
+        print_success(f"ANALYZE and PRAGMA optimize done in {time.monotonic() - started:.2f}s")
+
+        if convert and stats["auto_vacuum"] != "incremental":
+            print("  Switching to auto_vacuum=INCREMENTAL (full VACUUM, writers wait until it finishes)...")
+            with timed("vacuum"):
+                started = time.monotonic()
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            print_success(f"Rebuilt the database in {time.monotonic() - started:.2f}s")
+        elif vacuum_seconds > 0:
+            if stats["auto_vacuum"] != "incremental":
+                print_warning("Incremental vacuum needs auto_vacuum=INCREMENTAL; run once with --convert-incremental")
+            else:
+                freed = 0
+                deadline = time.monotonic() + vacuum_seconds
+                with timed("incremental vacuum"):
+                    # Small steps, each its own write transaction, until the budget runs out
+                    while time.monotonic() < deadline:
+                        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                        if not before:
+                            break
+                        conn.execute("PRAGMA incremental_vacuum(256)")
+                        freed += before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+                remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                print_success(f"Released {freed:,} free pages ({freed * stats['page_size'] / 1e6:,.1f} MB)"
+                              + (f", {remaining:,} left for the next run" if remaining else ""))
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+        match_db_owner(db_path)
+
+
+# Synthetic order mix: game -> (weight, (min, mode, max) distinct decklist lines)
+SEED_GAMES = {
+    "magic": (0.6, (18, 30, 95)),
+    "pokemon": (0.2, (12, 22, 35)),
+    "onepiece": (0.15, (10, 16, 25)),
+    "other": (0.05, (3, 12, 40)),
+}
+SEED_ORDER_CHARS = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+
+
+def _iso(ts: float) -> str:
+    """Format a UNIX timestamp the way JavaScript's toISOString() does."""
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _seed_status(age_days: float, rng: random.Random) -> str:
+    """Pick a status that is plausible for an order of this age."""
+    roll = rng.random()
+    if age_days < 2:
+        return "submitted" if roll < 0.6 else "in_progress" if roll < 0.85 else "ready"
+    if age_days < 10:
+        return ("submitted", "in_progress", "ready", "picked_up", "cancelled")[
+            0 if roll < 0.05 else 1 if roll < 0.15 else 2 if roll < 0.4 else 3 if roll < 0.93 else 4
+        ]
+    return "picked_up" if roll < 0.92 else "cancelled" if roll < 0.99 else "ready"
+
+
+def seed_load(
+    db_path: Path, project_dir: Path, orders: int, days: int, batch: int, prefix: str, seed: int
+) -> None:
+    """Bulk-write synthetic orders, line items, queued emails and audit entries."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    apply_server_schema(conn, project_dir)
+
+    games = list(SEED_GAMES)
+    weights = [SEED_GAMES[g][0] for g in games]
+    card_pool = [f"Synthetic Card {i:05d}" for i in range(20000)]
+    customers = max(1, orders // 3)
+    used_numbers = {row[0] for row in conn.execute("SELECT order_number FROM deck_requests")}
+    now = time.time()
+
+    totals = collections.Counter()
+    start = time.monotonic()
+    for first in range(0, orders, batch):
+        order_rows, item_rows, email_rows, audit_rows = [], [], [], []
+        for _ in range(min(batch, orders - first)):
+            game = rng.choices(games, weights)[0]
+            low, mode, high = SEED_GAMES[game][1]
+            lines = int(rng.triangular(low, high, mode))
+            created = now - rng.random() ** 1.5 * days * 86400
+            age_days = (now - created) / 86400
+            status = _seed_status(age_days, rng)
+            worked = status in ("ready", "picked_up")
+            updated = created + (rng.uniform(0.1, min(age_days, 9)) * 86400 if status != "submitted" else 0)
+
+            day = datetime.fromtimestamp(created, timezone.utc).strftime("%y%m%d")
+            while True:
+                number = f"{prefix}-{day}-{''.join(rng.choices(SEED_ORDER_CHARS, k=6))}"
+                if number not in used_numbers:
+                    used_numbers.add(number)
+                    break
+
+            order_id = str(uuid.uuid4())
+            customer = rng.randrange(customers)
+            email = f"customer{customer}@example.com"
+            created_iso, updated_iso = _iso(created), _iso(updated)
+            total_price = 0.0
+            raw_lines = []
+            for _ in range(lines):
+                card = card_pool[min(int(rng.paretovariate(1.2)) - 1, len(card_pool) - 1)
+                                 if rng.random() < 0.5 else rng.randrange(len(card_pool))]
+                quantity = 1 if game == "magic" and lines > 60 else rng.choice((1, 1, 2, 3, 4, 4))
+                found = price = None
+                if worked:
+                    found = quantity if rng.random() < 0.9 else rng.randrange(quantity + 1)
+                    price = round(rng.lognormvariate(-0.5, 1.2), 2)
+                    total_price += (found or 0) * price
+                raw_lines.append(f"{quantity} {card}")
+                item_rows.append((
+                    str(uuid.uuid4()), order_id, quantity, card, round(rng.uniform(0.8, 1.0), 2),
+                    raw_lines[-1], found, price, created_iso,
+                ))
+            order_rows.append((
+                order_id, number, f"Customer {customer}", email, "555.123.4567", "email", game,
+                None, None, None, "\n".join(raw_lines), status, None,
+                round(total_price, 2) if worked else None, None, 1 if age_days > 2 else 0, 0,
+                created_iso, updated_iso,
+            ))
+            email_rows.append((order_id, email, "confirmation", "sent" if age_days > 0.01 else "pending",
+                               created_iso, created_iso if age_days > 0.01 else None))
+            if worked:
+                email_rows.append((order_id, email, "ready", "sent", updated_iso, updated_iso))
+            if status != "submitted":
+                audit_rows.append(("order.update", "order", order_id, json.dumps({"status": status}), updated_iso))
+
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO deck_requests (id, order_number, customer_name, email, phone, notify_method, game, "
+            "format, pickup_window, notes, raw_decklist, status, staff_notes, estimated_total, missing_items, "
+            "stale_alert_sent, pickup_alert_sent, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", order_rows)
+        conn.executemany(
+            "INSERT INTO deck_line_items (id, deck_request_id, quantity, card_name, parse_confidence, "
+            "line_raw, quantity_found, unit_price, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", item_rows)
+        conn.executemany(
+            "INSERT INTO email_queue (order_id, recipient, template, status, created_at, sent_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)", email_rows)
+        conn.executemany(
+            "INSERT INTO audit_log (action, entity_type, entity_id, details, ip_address, created_at) "
+            "VALUES (?, ?, ?, ?, '127.0.0.1', ?)", audit_rows)
+        conn.execute("COMMIT")
+
+        totals.update(orders=len(order_rows), items=len(item_rows), emails=len(email_rows), audit=len(audit_rows))
+        elapsed = time.monotonic() - start
+        print(f"\r  {totals['orders']:,} orders, {totals['items']:,} line items "
+              f"({totals['items'] / elapsed * 60:,.0f} items/min)", end="", flush=True)
+
+    conn.close()
+    print()
+    print_success(
+        f"Wrote {totals['orders']:,} orders, {totals['items']:,} line items, {totals['emails']:,} queued emails "
+        f"and {totals['audit']:,} audit entries in {time.monotonic() - start:.1f}s"
+    )
+
+
+class StepExit(Exception):
+    """A step called sys.exit(); carried through the event loop as a plain exception."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+class DeployStep:
+    """A unit of deploy work and the names of the steps it depends on."""
+
+    def __init__(self, name: str, func, deps: tuple = ()):
+        self.name = name
+        self.func = func
+        self.deps = deps
+        self.started = 0.0
+        self.finished = 0.0
+        self.result = None
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+def _run_in_thread(func):
+    """Run a blocking function on a daemon thread and return an awaitable future.
+
+    Daemon threads (unlike asyncio.to_thread) cannot keep the process alive if
+    another step fails while this one is blocked, e.g. on input().
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    context = contextvars.copy_context()
+
+    def settle(method, value) -> None:
+        if not future.done():
+            method(value)
+
+    def target() -> None:
+        try:
+            result = context.run(func)
+        except SystemExit as exc:
+            loop.call_soon_threadsafe(settle, future.set_exception, StepExit(exc.code))
+        except BaseException as exc:
+            loop.call_soon_threadsafe(settle, future.set_exception, exc)
+        else:
+            loop.call_soon_threadsafe(settle, future.set_result, result)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+async def run_steps(steps: list[DeployStep]) -> dict[str, DeployStep]:
+    """Run steps as a dependency graph, overlapping steps that are independent.
+
+    Each step's function receives the dict of steps (by name) so it can read
+    the results of its dependencies. The first failure cancels every step that
+    has not started yet, waits for the ones already running, and is re-raised.
+    """
+    by_name = {step.name: step for step in steps}
+    for step in steps:
+        for dep in step.deps:
+            if dep not in by_name:
+                raise ValueError(f"Step {step.name} depends on unknown step {dep}")
+
+    tasks: dict[str, asyncio.Task] = {}
+    running: set[str] = set()
+    origin = time.monotonic()
+    output = sys.stdout if isinstance(sys.stdout, StepOutput) else None
+
+    def call(step: DeployStep):
+        _current_step.set(step.name)
+        if output:
+            output.begin(step.name)
+        try:
+            with timed(step.name):
+                return step.func(by_name)
+        finally:
+            if output:
+                output.end(step.name)
+
+    async def run(step: DeployStep) -> None:
+        # asyncio.wait, unlike gather, leaves the dependencies running if this
+        # step is cancelled
+        if step.deps:
+            await asyncio.wait([tasks[dep] for dep in step.deps])
+            for dep in step.deps:
+                tasks[dep].result()
+        running.add(step.name)
+        step.started = time.monotonic() - origin
+        try:
+            step.result = await _run_in_thread(lambda: call(step))
+        finally:
+            step.finished = time.monotonic() - origin
+
+    for step in steps:
+        tasks[step.name] = asyncio.ensure_future(run(step))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except Exception:
+        for name, task in tasks.items():
+            if name not in running:
+                task.cancel()
+        busy = [task for name, task in tasks.items() if name in running and not task.done()]
+        if busy:
+            await asyncio.wait(busy)
+        raise
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return by_name
+
+
+def execute_steps(steps: list[DeployStep]) -> dict[str, DeployStep]:
+    """Run a step graph to completion, exiting if any step exits."""
+    stdout = sys.stdout
+    sys.stdout = StepOutput(stdout)
+    try:
+        return asyncio.run(run_steps(steps))
+    except StepExit as exc:
+        sys.exit(exc.code)
+    finally:
+        sys.stdout = stdout
+
+
+def critical_path(steps: dict[str, DeployStep]) -> list[DeployStep]:
+    """Walk back from the last step to finish through its latest-finishing dependency."""
+    path = []
+    step = max(steps.values(), key=lambda s: s.finished, default=None)
+    while step is not None:
+        path.append(step)
+        step = max((steps[dep] for dep in step.deps), key=lambda s: s.finished, default=None)
+    return list(reversed(path))
+
+
+def print_timing_summary(steps: dict[str, DeployStep]) -> None:
+    """Print per-step timings with the critical path highlighted."""
+    path = {step.name for step in critical_path(steps)}
+    total = max((step.finished for step in steps.values()), default=0.0)
+    serial = sum(step.duration for step in steps.values())
+
+    print_step("Deploy timings")
+    print(f"  {'Step':<16} {'Start':>8} {'Duration':>9}")
+    for step in sorted(steps.values(), key=lambda s: s.started):
+        marker = f"{Colors.YELLOW}*{Colors.END}" if step.name in path else " "
+        print(f"{marker} {step.name:<16} {step.started:>7.1f}s {step.duration:>8.1f}s")
+    print(f"\n  Total {total:.1f}s (serial {serial:.1f}s); * marks the critical path")
+
+
+def append_timing_history(project_dir: Path, total: float) -> None:
+    """Append this run's step timings to the deploy timing history."""
+    state_dir = project_dir / STATE_DIR
+    state_dir.mkdir(exist_ok=True)
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "total": round(total, 3),
+        "steps": {record["name"]: {"wall": record["wall"], "cpu": record["cpu"]} for record in _timings},
+    }
+    with open(state_dir / "timings.jsonl", "a") as fh:
+        fh.write(json.dumps(entry) + "\n")
+
+
+def load_timing_history(project_dir: Path) -> list[dict]:
+    """Load every recorded deploy run, oldest first."""
+    history_path = project_dir / STATE_DIR / "timings.jsonl"
+    runs = []
+    try:
+        with open(history_path) as fh:
+            for line in fh:
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return runs
+
+
+def report_timings(project_dir: Path, window: int, threshold: float, min_delta: float) -> bool:
+    """Compare the latest deploy against the rolling median of the runs before it.
+
+    A step is flagged when it took more than `threshold` times its median
+    and at least `min_delta` seconds longer. Returns True if any step regressed.
+    """
+    runs = load_timing_history(project_dir)
+    if not runs:
+        print_warning(f"No timing history yet ({project_dir / STATE_DIR / 'timings.jsonl'})")
+        return False
+
+    latest, previous = runs[-1], runs[-1 - window:-1]
+    print_step(f"Deploy of {latest['timestamp']} vs median of {len(previous)} previous run(s)")
+    print(f"  {'Step':<40} {'Latest':>8} {'Median':>8} {'CPU':>7}")
+
+    regressed = False
+    rows = [("total", {"wall": latest["total"], "cpu": 0.0}, [run["total"] for run in previous])]
+    rows += [
+        (name, sample, [run["steps"][name]["wall"] for run in previous if name in run.get("steps", {})])
+        for name, sample in latest["steps"].items()
+    ]
+    for name, sample, history in rows:
+        wall = sample["wall"]
+        if history:
+            median = statistics.median(history)
+            slow = wall > median * threshold and wall - median >= min_delta
+            median_text = f"{median:>7.1f}s"
+        else:
+            slow = False
+            median_text = f"{'-':>8}"
+        regressed = regressed or slow
+        flag = f"  {Colors.RED}REGRESSED{Colors.END}" if slow else ""
+        print(f"  {name:<40} {wall:>7.1f}s {median_text} {sample['cpu']:>6.1f}s{flag}")
+
+    if regressed:
+        print_warning("Some steps are slower than usual")
+    elif previous:
+        print_success("No regressions")
+    return regressed
+
+
 def print_summary(project_dir: Path, config: dict[str, str]) -> None:
     """Print deployment summary and next steps."""
     ip = get_server_ip()
@@ -373,11 +2041,12 @@ def print_summary(project_dir: Path, config: dict[str, str]) -> None:
     docker compose logs -f          # View logs
     docker compose restart          # Restart
     docker compose down             # Stop
-    docker compose up -d --build    # Rebuild after config changes
+    docker compose up -d            # Apply config changes (restart only)
+    docker compose up -d --build    # Rebuild after code changes
 
 {Colors.BOLD}Configuration File:{Colors.END}
     {project_dir}/LaunchList.env
-    (Rebuild required after changes)
+    (Re-run deploy.py or `docker compose up -d` after changes; no rebuild needed)
 
 {Colors.BOLD}Database Location:{Colors.END}
     Docker volume: LaunchList-data
@@ -399,13 +2068,304 @@ def main() -> None:
         action="store_true",
         help="Use defaults/environment variables instead of prompting"
     )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore the build cache and rebuild every stage from scratch"
+    )
+    parser.add_argument(
+        "--blue-green",
+        action="store_true",
+        help="Start the new image beside the live one and switch nginx over with no downtime"
+    )
+    parser.add_argument(
+        "--no-tune", action="store_true",
+        help=f"Do not size limits, heap, threadpool and SQLite caches to this host; removes a {COMPOSE_OVERRIDE} "
+             "an earlier run generated"
+    )
+    parser.add_argument(
+        "--from-bundle", metavar="PATH",
+        help="Install Docker and the images from a 'deploy.py bundle' tarball, without network access"
+    )
+    parser.add_argument(
+        "--drain", type=float, default=10.0,
+        help="Seconds to let the old container finish requests after a blue/green switch (default: 10)"
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    timings_parser = subparsers.add_parser(
+        "timings", help="Compare the last deploy's step timings against recent history"
+    )
+    timings_parser.add_argument(
+        "--window", type=int, default=10,
+        help="Number of previous runs in the rolling median (default: 10)"
+    )
+    timings_parser.add_argument(
+        "--threshold", type=float, default=1.5,
+        help="Flag steps slower than this multiple of their median (default: 1.5)"
+    )
+    timings_parser.add_argument(
+        "--min-delta", type=float, default=2.0,
+        help="Ignore slowdowns smaller than this many seconds (default: 2)"
+    )
+    probe_parser = subparsers.add_parser(
+        "probe", help="Measure sustained /api/health latency percentiles"
+    )
+    probe_parser.add_argument("--url", default=HEALTH_URL, help=f"URL to probe (default: {HEALTH_URL})")
+    probe_parser.add_argument(
+        "--duration", type=float, default=60.0, help="Seconds to probe for (default: 60)"
+    )
+    probe_parser.add_argument(
+        "--rate", type=float, default=1.0,
+        help="Probes per second (default: 1; the API allows 100 requests/min per IP)"
+    )
+    bench_parser = subparsers.add_parser(
+        "bench", help="Load test a running instance with named scenarios"
+    )
+    bench_parser.add_argument(
+        "--url", default="http://127.0.0.1:3000", help="Base URL (default: http://127.0.0.1:3000)"
+    )
+    bench_parser.add_argument(
+        "--scenario", action="append", choices=list(BENCH_SCENARIOS), dest="scenarios",
+        help=f"Scenario to run, repeatable (default: {', '.join(DEFAULT_BENCH_SCENARIOS)}; "
+             "submit creates real orders and must be named explicitly)"
+    )
+    bench_parser.add_argument("--duration", type=float, default=30.0, help="Seconds per scenario (default: 30)")
+    bench_parser.add_argument("--concurrency", type=int, default=8, help="Pooled connections (default: 8)")
+    bench_parser.add_argument("--deck-lines", type=int, default=60, help="Lines per submitted decklist (default: 60)")
+    bench_parser.add_argument("--email", help="Staff email for staff-list/detail scenarios")
+    bench_parser.add_argument("--password", help="Staff password for staff-list/detail scenarios")
+    bench_parser.add_argument("--token", help="Staff bearer token instead of --email/--password")
+    bench_parser.add_argument("--json", metavar="PATH", help="Also write results as JSON ('-' for stdout)")
+    seed_parser = subparsers.add_parser(
+        "seed-load", help="Fill a copy of the database with synthetic orders"
+    )
+    seed_parser.add_argument("--db", required=True, help="SQLite file to write (created if missing)")
+    seed_parser.add_argument(
+        "--from-volume", action="store_true",
+        help=f"First copy the live database from the {DATA_VOLUME} volume to --db"
+    )
+    seed_parser.add_argument("--orders", type=int, default=10000, help="Orders to create (default: 10000)")
+    seed_parser.add_argument("--days", type=int, default=180, help="Spread orders over this many days (default: 180)")
+    seed_parser.add_argument("--batch", type=int, default=2000, help="Orders per transaction (default: 2000)")
+    seed_parser.add_argument("--prefix", default="LP", help="Order number prefix (default: LP)")
+    seed_parser.add_argument("--seed", type=int, default=None, help="Random seed for a reproducible dataset")
+    backup_parser = subparsers.add_parser(
+        "backup", help="Take an online, compressed, page-deduplicated database backup"
+    )
+    backup_parser.add_argument("--db", help=f"Database to back up (default: {DB_FILENAME} in the {DATA_VOLUME} volume)")
+    backup_parser.add_argument("--dest", help=f"Backup directory (default: the {BACKUP_VOLUME} volume)")
+    backup_parser.add_argument(
+        "--compress", choices=["auto", *COMPRESSION_CODECS], default="auto",
+        help="Pack compression (default: zstd if installed, else gzip)"
+    )
+    backup_parser.add_argument(
+        "--step-pages", type=int, default=256,
+        help="Pages copied per backup step; each step is one short read transaction (default: 256)"
+    )
+    backup_parser.add_argument(
+        "--step-sleep", type=float, default=0.0, help="Milliseconds to pause between steps (default: 0)"
+    )
+    backup_parser.add_argument("--keep", type=int, default=14, help="Backups to retain (default: 14)")
+    backup_parser.add_argument(
+        "--full", action="store_true", help="Store every page again instead of deduplicating"
+    )
+    maint_parser = subparsers.add_parser(
+        "db-maint", help="Report database size/bloat and checkpoint, ANALYZE and vacuum it"
+    )
+    maint_parser.add_argument("--db", help=f"Database (default: {DB_FILENAME} in the {DATA_VOLUME} volume)")
+    maint_parser.add_argument("--report-only", action="store_true", help="Only print the size report")
+    maint_parser.add_argument(
+        "--vacuum-seconds", type=float, default=5.0,
+        help="Time budget for incremental vacuum; 0 to skip (default: 5)"
+    )
+    maint_parser.add_argument(
+        "--convert-incremental", action="store_true",
+        help="Switch an existing database to auto_vacuum=INCREMENTAL (one full VACUUM)"
+    )
+    top_parser = subparsers.add_parser(
+        "top", help="Live dashboard of container, request, database and queue load"
+    )
+    top_parser.add_argument("--db", help=f"Database (default: {DB_FILENAME} in the {DATA_VOLUME} volume)")
+    top_parser.add_argument("--url", default=HEALTH_URL, help=f"URL probed for latency (default: {HEALTH_URL})")
+    top_parser.add_argument("--interval", type=float, default=1.0, help="Seconds between refreshes (default: 1)")
+    top_parser.add_argument("--once", action="store_true", help="Print one sample and exit (no terminal UI)")
+    explain_parser = subparsers.add_parser(
+        "explain", help="Plan and time the server's queries on a database copy and suggest indexes"
+    )
+    explain_parser.add_argument("--db", required=True, help="SQLite copy to analyse (never the live database)")
+    explain_parser.add_argument(
+        "--from-volume", action="store_true", help=f"First copy {DB_FILENAME} from the {DATA_VOLUME} volume to --db"
+    )
+    explain_parser.add_argument("--runs", type=int, default=5, help="Timed executions per query (default: 5)")
+    explain_parser.add_argument(
+        "--only", nargs="+", metavar="NAME", default=[], help="Catalog entries or prefixes, e.g. orders auth.revoked-tokens"
+    )
+    rollback_parser = subparsers.add_parser(
+        "rollback", help="Switch back to an earlier tagged release without rebuilding"
+    )
+    rollback_parser.add_argument("--to", metavar="TAG", help="Release tag or prefix (default: the previous release)")
+    rollback_parser.add_argument("--list", action="store_true", help="List retained releases and exit")
+    bundle_parser = subparsers.add_parser(
+        "bundle", help="Write a tarball for offline deploys with --from-bundle"
+    )
+    bundle_parser.add_argument(
+        "--output", help="Tarball to write (default: LaunchList-bundle-<date>.tar in the project directory)"
+    )
+    bundle_parser.add_argument(
+        "--compress", choices=["auto", *COMPRESSION_CODECS], default="auto",
+        help="Image archive compression (default: zstd if installed, else gzip)"
+    )
+    restore_parser = subparsers.add_parser(
+        "restore", help="Rebuild, verify and swap in a backup made by 'backup'"
+    )
+    restore_parser.add_argument("backup_id", nargs="?", help="Backup id or prefix (default: newest)")
+    restore_parser.add_argument("--dest", help=f"Backup directory (default: the {BACKUP_VOLUME} volume)")
+    restore_parser.add_argument("--db", help=f"Database to replace (default: {DB_FILENAME} in the {DATA_VOLUME} volume)")
+    restore_parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 2,
+        help="Parallel decompression and verification workers (default: CPU count)"
+    )
+    restore_parser.add_argument(
+        "--quick", action="store_true", help="Use PRAGMA quick_check instead of integrity_check"
+    )
+    restore_parser.add_argument(
+        "--verify-only", action="store_true",
+        help="Write the verified copy beside the database instead of swapping it in"
+    )
+    restore_parser.add_argument("--yes", "-y", action="store_true", help="Do not ask for confirmation")
     args = parser.parse_args()
 
+    if args.command == "db-maint":
+        db_maintenance(resolve_db_path(args.db), args.report_only, args.vacuum_seconds, args.convert_incremental)
+        sys.exit(0)
+
+    if args.command == "top":
+        run_top(resolve_db_path(args.db), args.url, max(args.interval, 0.2), args.once or not sys.stdout.isatty())
+        sys.exit(0)
+
+    if args.command == "explain":
+        db_path = Path(args.db).resolve()
+        live_db = find_data_volume_db()
+        if live_db is not None and live_db.exists() and db_path == live_db.resolve():
+            print_error("Refusing to lock the live database for trial indexes; use a copy")
+            sys.exit(1)
+        if args.from_volume:
+            if live_db is None or not live_db.exists():
+                print_error(f"Could not find {DB_FILENAME} in the {DATA_VOLUME} volume")
+                sys.exit(1)
+            print_step(f"Copying {live_db} to {db_path}...")
+            copy_database(live_db, db_path)
+        if not db_path.exists():
+            print_error(f"{db_path} does not exist; use --from-volume or 'seed-load' to create it")
+            sys.exit(1)
+        print_step(f"Explaining {len(EXPLAIN_CATALOG)} catalog queries against {db_path}...")
+        flagged = run_explain(db_path, max(args.runs, 1), args.only)
+        if flagged:
+            print_warning(f"{flagged} quer{'y' if flagged == 1 else 'ies'} scan or sort; see the suggestions above")
+        else:
+            print_success("Every query is served by an index")
+        sys.exit(0)
+
+    if args.command == "rollback":
+        project_dir = get_script_directory()
+        if args.list:
+            list_releases(project_dir)
+            sys.exit(0)
+        check_root()
+        started = time.monotonic()
+        if not rollback(project_dir, args.to):
+            print_error("Rolled-back release did not become healthy; check: docker compose logs -f")
+            sys.exit(1)
+        print_success(f"Rolled back in {time.monotonic() - started:.1f}s")
+        sys.exit(0)
+
+    if args.command == "bundle":
+        check_root()
+        project_dir = get_script_directory()
+        output = Path(args.output or project_dir / f"LaunchList-bundle-{datetime.now():%Y%m%d}.tar")
+        print_step(f"Writing offline bundle {output}...")
+        create_bundle(project_dir, output.resolve(), pick_codec(args.compress))
+        print_success(f"Bundle written: {output} ({output.stat().st_size / 1e6:,.0f} MB)")
+        sys.exit(0)
+
+    if args.command == "restore":
+        backup_dir = resolve_backup_dir(args.dest)
+        manifest = find_backup_manifest(backup_dir, args.backup_id)
+        if args.db:
+            target = Path(args.db)
+        else:
+            mountpoint = find_volume_mountpoint(DATA_VOLUME)
+            if mountpoint is None:
+                print_error(f"Could not find the {DATA_VOLUME} volume; pass --db")
+                sys.exit(1)
+            target = mountpoint / DB_FILENAME
+        print_step(f"Restoring {manifest['id']} ({manifest['created_at']}) to {target}...")
+        if not args.verify_only and not args.yes:
+            answer = input(f"  This replaces {target} and briefly stops the app. Continue? [y/N]: ")
+            if answer.strip().lower() not in ("y", "yes"):
+                sys.exit(1)
+        sys.exit(0 if run_restore(
+            manifest, backup_dir, target, max(1, args.workers), args.quick, not args.verify_only
+        ) else 1)
+
+    if args.command == "backup":
+        db_path = resolve_db_path(args.db)
+        backup_dir = resolve_backup_dir(args.dest)
+        codec = pick_codec(args.compress)
+        print_step(f"Backing up {db_path} to {backup_dir} ({codec})...")
+        report_backup(run_backup(
+            db_path, backup_dir, codec, args.step_pages, args.step_sleep / 1000, args.keep, args.full
+        ))
+        sys.exit(0)
+
+    if args.command == "seed-load":
+        db_path = Path(args.db).resolve()
+        live_db = find_data_volume_db()
+        if live_db is not None and live_db.exists() and db_path == live_db.resolve():
+            print_error("Refusing to write synthetic data into the live database; use a copy")
+            sys.exit(1)
+        if args.from_volume:
+            if live_db is None or not live_db.exists():
+                print_error(f"Could not find {DB_FILENAME} in the {DATA_VOLUME} volume")
+                sys.exit(1)
+            print_step(f"Copying {live_db} to {db_path}...")
+            copy_database(live_db, db_path)
+        print_step(f"Seeding {db_path} with {args.orders:,} orders...")
+        seed_load(db_path, get_script_directory(), args.orders, args.days, args.batch, args.prefix, args.seed)
+        sys.exit(0)
+
+    if args.command == "bench":
+        scenarios = args.scenarios or DEFAULT_BENCH_SCENARIOS
+        if "submit" in scenarios:
+            print_warning("The submit scenario creates real orders and queues confirmation emails")
+        print_step(f"Benchmarking {args.url}")
+        results = asyncio.run(run_bench(
+            args.url, scenarios, args.duration, args.concurrency, args.deck_lines,
+            email=args.email, password=args.password, token=args.token,
+        ))
+        print_bench_table(results)
+        if any(r["rate_limited"] for r in results):
+            print_warning("Responses were rate limited; API limiters are per client IP")
+        if args.json == "-":
+            print(json.dumps(results, indent=2))
+        elif args.json:
+            Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+        sys.exit(0)
+
+    if args.command == "probe":
+        sys.exit(0 if report_probe(args.url, args.duration, args.rate) else 1)
+
+    if args.command == "timings":
+        regressed = report_timings(
+            get_script_directory(), args.window, args.threshold, args.min_delta
+        )
+        sys.exit(1 if regressed else 0)
+
     print_banner()
 
     # Preflight checks
     check_root()
-    check_debian()
 
     project_dir = get_script_directory()
     print(f"Project directory: {project_dir}")
@@ -418,30 +2378,94 @@ def main() -> None:
             print_error("Make sure you're running from the correct directory")
             sys.exit(1)
 
-    # Install Docker if needed
-    if is_docker_installed():
-        print_success("Docker is already installed")
-    else:
-        install_docker()
-
-    if not get_compose_command():
-        print_error("Docker Compose not available")
-        sys.exit(1)
+    existing_config = load_env_file(project_dir)
+
+    def docker_repo(_steps) -> bool:
+        if is_docker_installed():
+            print_success("Docker is already installed")
+            return False
+        if args.from_bundle:
+            return True
+        install_docker_repo()
+        return True
+
+    def docker_engine(steps) -> None:
+        if steps["docker-repo"].result:
+            if args.from_bundle:
+                install_bundle_debs(steps["bundle"].result)
+            else:
+                install_docker_engine()
+        if not get_compose_command():
+            print_error("Docker Compose not available")
+            sys.exit(1)
 
-    # Configure
-    config = prompt_config(args.non_interactive)
-    write_env_file(project_dir, config)
+    def needs_restart(steps) -> bool:
+        changes = steps["env-file"].result
+        return not existing_config or bool(changes["restart"] or changes["rebuild-frontend"]) \
+            or bool(steps["tune"].result)
 
-    # Build and start
-    build_and_start(project_dir, config)
+    def base_images(steps) -> None:
+        if args.from_bundle:
+            load_bundle_images(project_dir, steps["bundle"].result)
+        else:
+            pull_base_images(project_dir)
+
+    # Prompts would be lost among other steps' output, so when interactive
+    # the configuration is gathered before anything else starts
+    first = () if args.non_interactive else ("config",)
+    steps = [
+        DeployStep("preflight", lambda _: check_debian(), first),
+        DeployStep("docker-repo", docker_repo, ("preflight",)),
+    ]
+    if args.from_bundle:
+        bundle_path = Path(args.from_bundle).resolve()
+        steps.append(DeployStep("bundle", lambda _: extract_bundle(project_dir, bundle_path), first))
+    engine_deps = ("docker-repo", "bundle") if args.from_bundle else ("docker-repo",)
+    steps += [
+        DeployStep("docker-engine", docker_engine, engine_deps),
+        DeployStep("base-images", base_images, ("docker-engine",)),
+        DeployStep("config", lambda _: prompt_config(args.non_interactive, existing_config)),
+        DeployStep(
+            "env-file", lambda s: apply_config(project_dir, existing_config, s["config"].result), ("config",)
+        ),
+        DeployStep("tune", lambda _: remove_compose_override(project_dir) if args.no_tune else tune_for_host(project_dir), first),
+    ]
+    if args.blue_green:
+        steps.append(DeployStep(
+            "blue-green",
+            lambda s: blue_green_deploy(
+                project_dir, s["config"].result, rebuild=args.rebuild, drain_seconds=args.drain,
+                offline=bool(args.from_bundle),
+            ),
+            ("env-file", "base-images", "tune"),
+        ))
+    else:
+        steps += [
+            DeployStep(
+                "build",
+                lambda s: build_and_start(
+                    project_dir, s["config"].result, rebuild=args.rebuild, offline=bool(args.from_bundle),
+                    restart=needs_restart(s),
+                ),
+                ("env-file", "base-images", "tune"),
+            ),
+            DeployStep("health", lambda _: wait_for_healthy(), ("build",)),
+        ]
+    results = execute_steps(steps)
+    config = results["config"].result
 
     # Health check
-    if wait_for_healthy():
+    if results["blue-green" if args.blue_green else "health"].result:
         print_success("Application is running and healthy")
     else:
         print_warning("Application may still be starting.")
         print_warning("Check logs with: docker compose logs -f")
 
+    print_timing_summary(results)
+    append_timing_history(
+        project_dir, max(step.finished for step in results.values())
+    )
+
     # Summary
     print_summary(project_dir, config)
 
@@ -0,0 +1,200 @@
+"""`deploy.py explain`: query plans and timings of the server's SQL hot paths."""
+
+import time
+import re
+import sqlite3
+import statistics
+from pathlib import Path
+
+from common import Colors
+
+# A trial index is only suggested if the query's median time drops below this
+# fraction of the time without it; removing a scan alone is not enough
+EXPLAIN_MIN_SPEEDUP = 0.8
+
+# The server's SQL hot paths, as issued (drizzle's column lists written as *):
+# (name, where it runs, SQL with named parameters from explain_params)
+EXPLAIN_CATALOG = [
+    ("orders.list", "statements.ts ordersAfter",
+     "SELECT * FROM deck_requests WHERE (created_at, id) < (:cursor_created_at, :cursor_id) "
+     "ORDER BY created_at DESC, id DESC LIMIT :limit"),
+    ("orders.list-status", "statements.ts ordersByStatusAfter",
+     "SELECT * FROM deck_requests WHERE status = :status AND (created_at, id) < (:cursor_created_at, :cursor_id) "
+     "ORDER BY created_at DESC, id DESC LIMIT :limit"),
+    ("orders.list-offset", "orderService.ts getAllOrders (legacy ?offset=)",
+     "SELECT * FROM deck_requests ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset"),
+    ("orders.count", "statements.ts orderCounts", "SELECT status, count FROM order_counts"),
+    ("orders.lookup", "orderService.ts getOrderByNumberAndEmail",
+     "SELECT * FROM deck_requests WHERE order_number = :order_number AND email = :email"),
+    ("orders.by-id", "orderService.ts getOrderById", "SELECT * FROM deck_requests WHERE id = :order_id"),
+    ("line-items.by-order", "orderService.ts getOrderWithItems",
+     "SELECT * FROM deck_line_items WHERE deck_request_id = :order_id"),
+    ("digest.status-count", "discordService.ts sendDailyDigest",
+     "SELECT COUNT(*) AS c FROM deck_requests WHERE status = 'submitted'"),
+    ("digest.stale-orders", "discordService.ts sendDailyDigest",
+     "SELECT order_number, customer_name, game, created_at FROM deck_requests "
+     "WHERE status = 'submitted' AND created_at < datetime('now', :stale_hours) ORDER BY created_at ASC"),
+    ("digest.stale-pickups", "discordService.ts sendDailyDigest",
+     "SELECT order_number, customer_name, game, email, phone, updated_at FROM deck_requests "
+     "WHERE status = 'ready' AND updated_at < datetime('now', :hold_days) ORDER BY updated_at ASC"),
+    ("alerts.stale-orders", "discordService.ts checkStaleOrders",
+     "SELECT id, order_number, customer_name, email, phone, game, created_at FROM deck_requests "
+     "WHERE status = 'submitted' AND stale_alert_sent = 0 AND created_at < datetime('now', :stale_hours)"),
+    ("alerts.item-count", "discordService.ts checkStaleOrders",
+     "SELECT COUNT(*) AS c FROM deck_line_items WHERE deck_request_id = :order_id"),
+    ("alerts.stale-pickups", "discordService.ts checkStaleOrders",
+     "SELECT id, order_number, customer_name, email, phone, game, updated_at FROM deck_requests "
+     "WHERE status = 'ready' AND pickup_alert_sent = 0 AND updated_at < datetime('now', :hold_days)"),
+    ("auth.recent-failures", "routes/auth.ts login",
+     "SELECT COUNT(*) AS count FROM login_attempts "
+     "WHERE email = :email AND success = 0 AND attempted_at > datetime('now', '-15 minutes')"),
+    ("auth.user-by-email", "routes/auth.ts login", "SELECT * FROM users WHERE email = :user_email"),
+    ("auth.reset-token", "routes/auth.ts reset-password",
+     "SELECT * FROM password_reset_tokens "
+     "WHERE token_hash = :token_hash AND used_at IS NULL AND expires_at > datetime('now')"),
+    ("auth.revoked-tokens", "authCache.ts isTokenRevoked",
+     "SELECT id, token, expires_at FROM token_blacklist WHERE id > :last_revocation_id ORDER BY id"),
+    ("auth.user-by-id", "authCache.ts getAuthUser", "SELECT * FROM users WHERE id = :user_id"),
+    ("email.pending", "emailQueueService.ts processEmailQueue",
+     "SELECT * FROM email_queue WHERE status = 'pending'"),
+    ("cleanup.email-queue", "db/index.ts cleanExpiredRecords",
+     "DELETE FROM email_queue WHERE status IN ('sent', 'failed') AND created_at < datetime('now', '-30 days')"),
+    ("cleanup.login-attempts", "db/index.ts cleanExpiredRecords",
+     "DELETE FROM login_attempts WHERE attempted_at < datetime('now', '-1 day')"),
+    ("cleanup.token-blacklist", "db/index.ts cleanExpiredRecords",
+     "DELETE FROM token_blacklist WHERE expires_at < datetime('now')"),
+]
+
+
+def explain_params(conn: sqlite3.Connection) -> dict:
+    """Realistic parameter values: a random existing order and user, and the
+    newest revoked token (a blacklist refresh usually finds nothing new)."""
+    def pick(sql, default, params=()):
+        row = conn.execute(sql, params).fetchone()
+        return row[0] if row and row[0] is not None else default
+
+    order_id = pick("SELECT id FROM deck_requests ORDER BY random() LIMIT 1", "")
+    # Cursor for the second page of the staff list
+    cursor = conn.execute(
+        "SELECT created_at, id FROM deck_requests ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET 49"
+    ).fetchone() or ("", "")
+    return {
+        "limit": 50,
+        "offset": 50,
+        "cursor_created_at": cursor[0],
+        "cursor_id": cursor[1],
+        "status": "submitted",
+        "order_id": order_id,
+        "order_number": pick("SELECT order_number FROM deck_requests WHERE id = ?", "", (order_id,)),
+        "email": pick("SELECT email FROM deck_requests WHERE id = ?", "", (order_id,)),
+        "stale_hours": "-48 hours",
+        "hold_days": "-7 days",
+        "user_email": pick("SELECT email FROM users LIMIT 1", ""),
+        "user_id": pick("SELECT id FROM users LIMIT 1", ""),
+        "last_revocation_id": pick("SELECT max(id) FROM token_blacklist", 0),
+        "token_hash": pick("SELECT token_hash FROM password_reset_tokens LIMIT 1", ""),
+    }
+
+
+def query_plan(conn: sqlite3.Connection, sql: str, params: dict) -> list[str]:
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def plan_problems(plan: list[str]) -> list[str]:
+    """Full table scans and temp B-tree sorts in a query plan."""
+    problems = []
+    for detail in plan:
+        if detail.startswith("SCAN ") and " USING " not in detail:
+            problems.append(f"full scan of {detail.split()[1]}")
+        elif "USE TEMP B-TREE" in detail:
+            problems.append(detail.lower().replace("use ", ""))
+    return problems
+
+
+def suggest_index(sql: str) -> tuple:
+    """Derive (table, columns) for an index serving a catalog query, or None.
+
+    Equality columns come first, then the ORDER BY column, else the first
+    range column, which is the order SQLite can use them in.
+    """
+    match = re.search(r"FROM (\w+)(?: WHERE (.*?))?(?: ORDER BY (\w+).*?)?(?: LIMIT .*)?$", sql)
+    if not match:
+        return None
+    table, where, order = match.groups()
+    where = where or ""
+    columns = re.findall(r"(\w+) (?:=|IN \() ?", where)
+    ranges = [c for c in re.findall(r"(\w+) [<>]=? ", where) if c not in columns]
+    if order:
+        columns.append(order)
+    elif ranges:
+        columns.append(ranges[0])
+    return (table, columns) if columns else None
+
+
+def time_query(conn: sqlite3.Connection, sql: str, params: dict, runs: int) -> tuple:
+    """Median milliseconds and row count over runs; writes are rolled back."""
+    timings, rows = [], 0
+    for _ in range(runs):
+        conn.execute("SAVEPOINT explain_run")
+        start = time.perf_counter()
+        cursor = conn.execute(sql, params)
+        rows = len(cursor.fetchall()) if cursor.description else cursor.rowcount
+        timings.append((time.perf_counter() - start) * 1000)
+        conn.execute("ROLLBACK TO explain_run")
+        conn.execute("RELEASE explain_run")
+    return statistics.median(timings), rows
+
+
+def run_explain(db_path: Path, runs: int, only: list[str]) -> int:
+    """Plan and time the catalog, flag scans/sorts and verify suggested indexes.
+
+    Everything runs inside a transaction that is rolled back, including the
+    trial indexes, so the database is left as it was. Returns the number of
+    flagged queries.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    params = explain_params(conn)
+    flagged = []
+    print(f"  {'Query':<26} {'Median':>9} {'Rows':>7}  Plan")
+    conn.execute("BEGIN")
+    try:
+        for name, source, sql in EXPLAIN_CATALOG:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            plan = query_plan(conn, sql, params)
+            problems = plan_problems(plan)
+            median, rows = time_query(conn, sql, params, runs)
+            status = f"{Colors.YELLOW}{'; '.join(problems)}{Colors.END}" if problems else "ok"
+            print(f"  {name:<26} {median:>7.2f}ms {rows:>7,}  {status}")
+            if problems:
+                flagged.append((name, source, sql, plan, median))
+
+        for name, source, sql, plan, median in flagged:
+            print(f"\n{Colors.BOLD}{name}{Colors.END} ({source})\n    {sql}")
+            for detail in plan:
+                print(f"    plan: {detail}")
+            suggestion = suggest_index(sql)
+            if suggestion is None:
+                print("    No index can help; the query reads every row by design")
+                continue
+            table, columns = suggestion
+            ddl = f"CREATE INDEX idx_{table}_{'_'.join(columns)} ON {table}({', '.join(columns)})"
+            conn.execute("SAVEPOINT explain_index")
+            try:
+                conn.execute(ddl.replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ", 1))
+                remaining = plan_problems(query_plan(conn, sql, params))
+                after, _ = time_query(conn, sql, params, runs)
+            finally:
+                conn.execute("ROLLBACK TO explain_index")
+                conn.execute("RELEASE explain_index")
+            if remaining:
+                print(f"    Tried {ddl}: still {'; '.join(remaining)}")
+            elif after < median * EXPLAIN_MIN_SPEEDUP:
+                print(f"    {Colors.GREEN}Suggest:{Colors.END} {ddl};  ({median:.2f}ms -> {after:.2f}ms)")
+            else:
+                print(f"    Tried {ddl}: removes the {'; '.join(plan_problems(plan))} but does not help "
+                      f"({median:.2f}ms -> {after:.2f}ms)")
+    finally:
+        conn.execute("ROLLBACK")
+        conn.close()
+    return len(flagged)
@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import backup
+from backup import find_backup_manifest, run_backup, run_restore
+
+
+class SteppingClock(datetime):
+    """datetime whose now() moves a second per call, so backup ids never collide."""
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    calls = 0
+
+    @classmethod
+    def now(cls, tz=None):
+        cls.calls += 1
+        return cls.start + timedelta(seconds=cls.calls)
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, "datetime", SteppingClock)
+    db_path = tmp_path / "data" / "LaunchList.db"
+    db_path.parent.mkdir()
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE deck_requests (id TEXT PRIMARY KEY, status TEXT, notes TEXT)")
+    conn.execute("CREATE INDEX idx_status ON deck_requests (status)")
+    conn.executemany(
+        "INSERT INTO deck_requests VALUES (?, ?, ?)",
+        [(f"order-{i}", "submitted" if i % 3 else "ready", "x" * (i % 200)) for i in range(2000)],
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def age(db_path):
+    """Backdate the database files past BACKUP_QUIET_SECONDS."""
+    past = time.time() - backup.BACKUP_QUIET_SECONDS - 10
+    for path in (db_path, db_path.with_name(db_path.name + "-wal")):
+        if path.exists():
+            os.utime(path, (past, past))
+
+
+def read_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT * FROM deck_requests ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_backup_restore_round_trip(database, tmp_path):
+    backup_dir = tmp_path / "backups"
+    first = run_backup(database, backup_dir, "gzip", 64, 0, keep=5, full=False)
+    assert first["new_pages"] == first["pages"] > 0
+
+    conn = sqlite3.connect(database)
+    conn.execute("UPDATE deck_requests SET status = 'collected' WHERE id = 'order-7'")
+    conn.commit()
+    conn.close()
+    expected = read_rows(database)
+    second = run_backup(database, backup_dir, "gzip", 64, 0, keep=5, full=False)
+    assert 0 < second["new_pages"] < second["pages"]
+
+    manifest = find_backup_manifest(backup_dir, None)
+    assert manifest["id"] == second["id"]
+    target = tmp_path / "restore" / "LaunchList.db"
+    assert run_restore(manifest, backup_dir, target, workers=2, quick=False, swap=False)
+    assert not target.exists()
+    assert read_rows(target.with_name(f"{manifest['id']}.db")) == expected
+
+
+def test_restore_rejects_corrupt_pack(database, tmp_path):
+    backup_dir = tmp_path / "backups"
+    run_backup(database, backup_dir, "gzip", 64, 0, keep=5, full=False)
+    pack = next((backup_dir / "packs").iterdir())
+    data = bytearray(pack.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    pack.write_bytes(bytes(data))
+    target = tmp_path / "restore" / "LaunchList.db"
+    manifest = find_backup_manifest(backup_dir, None)
+    assert not run_restore(manifest, backup_dir, target, workers=2, quick=True, swap=False)
+    assert list(target.parent.iterdir()) == []
+
+
+def test_unchanged_database_reuses_latest_backup(database, tmp_path):
+    backup_dir = tmp_path / "backups"
+    age(database)
+    first = run_backup(database, backup_dir, "gzip", 64, 0, keep=5, full=False)
+    assert first["unchanged_since"] is None
+
+    second = run_backup(database, backup_dir, "gzip", 64, 0, keep=5, full=False)
+    assert second["unchanged_since"] == first["id"]
+    assert second["pages"] == first["pages"]
+    assert second["new_pages"] == 0
+    manifests = backup.load_backup_manifests(backup_dir)
+    assert [m["id"] for m in manifests] == [first["id"], second["id"]]
+    assert manifests[1]["pages"] == manifests[0]["pages"]
+
+    conn = sqlite3.connect(database)
+    conn.execute("DELETE FROM deck_requests WHERE id = 'order-1'")
+    conn.commit()
+    conn.close()
+    age(database)
+    third = run_backup(database, backup_dir, "gzip", 64, 0, keep=5, full=False)
+    assert third["unchanged_since"] is None
+
+
+def test_recently_written_database_is_not_trusted(database):
+    assert backup.database_file_state(database) is None
+    age(database)
+    state = backup.database_file_state(database)
+    assert state["db"][0] == database.stat().st_size
+    assert state["wal"] is None
+
+
+def test_restore_keeps_the_replaced_database_wal(database, tmp_path):
+    backup_dir = tmp_path / "backups"
+    run_backup(database, backup_dir, "gzip", 64, 0, keep=5, full=False)
+    # A write left in the WAL by a process that never closed the database
+    subprocess.run([sys.executable, "-c", f"""
+import os, sqlite3
+conn = sqlite3.connect({str(database)!r})
+conn.execute("PRAGMA journal_mode = WAL")
+conn.execute("PRAGMA wal_autocheckpoint = 0")
+conn.execute("INSERT INTO deck_requests VALUES ('after-backup', 'submitted', '')")
+conn.commit()
+os._exit(0)
+"""], check=True)
+    assert database.with_name(database.name + "-wal").stat().st_size > 0
+
+    assert run_restore(find_backup_manifest(backup_dir, None), backup_dir, database, workers=2, quick=True, swap=True)
+    assert ("after-backup",) not in [row[:1] for row in read_rows(database)]
+    (kept,) = database.parent.glob("LaunchList.db.pre-restore-*[0-9]")
+    assert kept.with_name(kept.name + "-wal").exists()
+    assert ("after-backup", "submitted", "") in read_rows(kept)
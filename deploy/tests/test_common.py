@@ -0,0 +1,19 @@
+from common import percentile
+
+
+def test_percentile_empty():
+    assert percentile([], 95) == 0.0
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 21))
+    assert percentile(samples, 50) == 10
+    assert percentile(samples, 95) == 19
+    assert percentile(samples, 99) == 20
+    assert percentile(samples, 100) == 20
+    assert percentile(samples, 0) == 1
+
+
+def test_percentile_unsorted_input():
+    assert percentile([0.3, 0.1, 0.2], 50) == 0.2
+    assert percentile([5.0], 99) == 5.0
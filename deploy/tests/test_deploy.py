@@ -0,0 +1,63 @@
+import pytest
+
+import deploy
+from deploy import classify_config_changes, invalidated_stages
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    src = tmp_path / "server" / "src"
+    (src / "services").mkdir(parents=True)
+    (src / "config.ts").write_text(
+        "const envSchema = z.object({\n"
+        "  PORT: z.string().default('3000'),\n"
+        "  SMTP_HOST: z.string().optional(),\n"
+        "});\n"
+    )
+    (src / "services" / "leader.ts").write_text("const id = process.env.HOSTNAME;\n")
+    (tmp_path / "docker-compose.yml").write_text(
+        "services:\n  app:\n    environment:\n      - FROM_NAME=${STORE_NAME:-LaunchList}\n"
+    )
+    return tmp_path
+
+
+def test_classify_config_changes(project_dir, monkeypatch):
+    monkeypatch.setattr(deploy, "FRONTEND_BUILD_ARGS", [("VITE_API_URL", None, "/api"), ("VITE_TITLE", "TITLE", "")])
+    old = {"PORT": "3000", "SMTP_HOST": "mail", "DOMAIN": "a.example", "TITLE": "Shop", "STORE_NAME": "A"}
+    new = {"PORT": "3000", "DOMAIN": "b.example", "TITLE": "Store", "STORE_NAME": "B",
+           "HOSTNAME": "app", "NODE_OPTIONS": "--max-old-space-size=512"}
+    assert classify_config_changes(project_dir, old, new) == {
+        "rebuild-frontend": ["TITLE"],
+        "restart": ["HOSTNAME", "NODE_OPTIONS", "SMTP_HOST", "STORE_NAME"],
+        "no-op": ["DOMAIN"],
+    }
+
+
+def test_classify_config_changes_unchanged(project_dir):
+    config = {"PORT": "3000", "DOMAIN": "a.example"}
+    assert classify_config_changes(project_dir, config, dict(config)) == {
+        "rebuild-frontend": [], "restart": [], "no-op": [],
+    }
+
+
+def test_invalidated_stages_first_build():
+    fingerprint = {"frontend": {"src": "a"}, "backend": {"server/src": "b"}}
+    assert invalidated_stages({}, fingerprint) == {
+        "frontend": ["no previous build"], "backend": ["no previous build"],
+    }
+
+
+def test_invalidated_stages_reports_changed_added_and_removed_inputs():
+    cache = {"stages": {
+        "frontend": {"src": "a", "public": "p"},
+        "backend": {"server/src": "b", "server/package.json": "c"},
+        "runtime": {"Dockerfile": "d"},
+    }}
+    fingerprint = {
+        "frontend": {"src": "a", "public": "p"},
+        "backend": {"server/src": "b2", "server/tsconfig.json": "t"},
+        "runtime": {"Dockerfile": "d"},
+    }
+    assert invalidated_stages(cache, fingerprint) == {
+        "backend": ["server/src", "server/tsconfig.json", "server/package.json"],
+    }
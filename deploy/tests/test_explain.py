@@ -0,0 +1,52 @@
+import sqlite3
+
+from explain import EXPLAIN_CATALOG, plan_problems, query_plan, suggest_index
+
+
+def test_suggest_index_equality_then_order():
+    sql = ("SELECT * FROM deck_requests WHERE status = :status AND (created_at, id) < (:a, :b) "
+           "ORDER BY created_at DESC, id DESC LIMIT :limit")
+    assert suggest_index(sql) == ("deck_requests", ["status", "created_at"])
+
+
+def test_suggest_index_range_column_last():
+    sql = ("SELECT * FROM login_attempts WHERE email = :email AND success = 0 "
+           "AND attempted_at > datetime('now', '-15 minutes')")
+    assert suggest_index(sql) == ("login_attempts", ["email", "success", "attempted_at"])
+
+
+def test_suggest_index_in_list():
+    sql = "DELETE FROM email_queue WHERE status IN ('sent', 'failed') AND created_at < datetime('now', '-30 days')"
+    assert suggest_index(sql) == ("email_queue", ["status", "created_at"])
+
+
+def test_suggest_index_nothing_to_index():
+    assert suggest_index("SELECT status, count FROM order_counts") is None
+
+
+def test_suggest_index_covers_catalog():
+    for name, _, sql in EXPLAIN_CATALOG:
+        suggestion = suggest_index(sql)
+        if suggestion:
+            table, columns = suggestion
+            assert f"FROM {table}" in sql, name
+            assert all(column in sql for column in columns), name
+
+
+def test_plan_problems():
+    plan = [
+        "SCAN deck_requests",
+        "SEARCH users USING INDEX idx_users_email (email=?)",
+        "SCAN deck_requests USING INDEX idx_deck_requests_created_at",
+        "USE TEMP B-TREE FOR ORDER BY",
+    ]
+    assert plan_problems(plan) == ["full scan of deck_requests", "temp b-tree for order by"]
+
+
+def test_plan_problems_from_sqlite():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (a INTEGER, b INTEGER)")
+    sql = "SELECT * FROM t WHERE a = :a ORDER BY b"
+    assert plan_problems(query_plan(conn, sql, {"a": 1})) == ["full scan of t", "temp b-tree for order by"]
+    conn.execute("CREATE INDEX t_a_b ON t (a, b)")
+    assert plan_problems(query_plan(conn, sql, {"a": 1})) == []
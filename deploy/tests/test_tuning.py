@@ -0,0 +1,59 @@
+from tuning import COMPOSE_OVERRIDE, compute_tuning, remove_compose_override, write_compose_override
+
+
+def host(cores, memory_mb, rotational=False):
+    return {"cores": cores, "memory_mb": memory_mb, "rotational": rotational}
+
+
+def test_small_host_runs_one_worker():
+    tuning = compute_tuning(host(1, 512))
+    assert tuning["cpus"] == 1.0
+    assert tuning["memory_mb"] == 256
+    assert tuning["workers"] == 1
+    assert tuning["heap_mb"] == 153
+    assert tuning["threadpool"] == 4
+    assert tuning["sqlite_cache_kb"] == 25 * 1024
+    assert tuning["sqlite_mmap_mb"] == 64
+
+
+def test_large_host_is_capped():
+    tuning = compute_tuning(host(64, 262144))
+    assert tuning["cpus"] == 63.0
+    assert tuning["memory_mb"] == 4096
+    assert tuning["workers"] == 8
+    assert tuning["heap_mb"] == 4096 * 60 // 100 // 8
+    assert tuning["threadpool"] == 8
+    assert tuning["sqlite_cache_kb"] == 51 * 1024
+    assert tuning["sqlite_mmap_mb"] == 1024
+
+
+def test_workers_limited_by_memory():
+    # 3 spare cores, but 512 MB only fits two 192 MB workers
+    tuning = compute_tuning(host(4, 1024))
+    assert tuning["memory_mb"] == 512
+    assert tuning["workers"] == 2
+    assert tuning["threadpool"] == 4
+
+
+def test_sqlite_cache_capped_per_worker():
+    tuning = compute_tuning(host(2, 8192))
+    assert tuning["workers"] == 1
+    assert tuning["sqlite_cache_kb"] == 256 * 1024
+
+
+def test_no_mmap_on_rotational_disks():
+    assert compute_tuning(host(4, 8192, rotational=True))["sqlite_mmap_mb"] == 0
+    assert compute_tuning(host(4, 8192))["sqlite_mmap_mb"] == 1024
+
+
+def test_no_tune_removes_only_a_generated_override(tmp_path):
+    override = tmp_path / COMPOSE_OVERRIDE
+    assert remove_compose_override(tmp_path) is False
+
+    assert write_compose_override(tmp_path, host(4, 8192), compute_tuning(host(4, 8192))) is True
+    assert remove_compose_override(tmp_path) is True
+    assert not override.exists()
+
+    override.write_text("services:\n  app:\n    mem_limit: 1g\n")
+    assert remove_compose_override(tmp_path) is False
+    assert override.exists()
@@ -0,0 +1,331 @@
+"""`deploy.py top`: live dashboard of the running containers, server metrics and database."""
+
+import time
+import asyncio
+import collections
+import curses
+import http.client
+import json
+import re
+import socket
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from common import DEPLOY_SLOTS, HttpResponse, HttpConnection, split_url, percentile
+
+# Docker Engine API, for per-container CPU and memory
+DOCKER_SOCKET = "/var/run/docker.sock"
+
+# nginx's default access log; one line per proxied request
+NGINX_ACCESS_LOG = Path("/var/log/nginx/access.log")
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP over a unix socket, for the Docker Engine API."""
+
+    def __init__(self, socket_path: str, timeout: float = 5.0):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def docker_api_get(path: str):
+    """GET a Docker Engine API path; returns parsed JSON or None on error."""
+    connection = UnixHTTPConnection(DOCKER_SOCKET)
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        body = response.read()
+        return json.loads(body) if response.status == 200 else None
+    except (OSError, ValueError, http.client.HTTPException):
+        return None
+    finally:
+        connection.close()
+
+
+def container_stats(name: str, previous: dict) -> dict:
+    """CPU % (against the previous sample) and memory of a running container.
+
+    one-shot skips the daemon's own second sample, so each call returns
+    at once and CPU is computed from our previous call instead.
+    """
+    stats = docker_api_get(f"/containers/{name}/stats?stream=false&one-shot=true")
+    if not stats or not stats.get("cpu_stats", {}).get("system_cpu_usage"):
+        return None
+    cpu = stats["cpu_stats"]
+    memory = stats.get("memory_stats", {})
+    detail = memory.get("stats", {})
+    sample = {
+        "cpu_total": cpu["cpu_usage"]["total_usage"],
+        "system": cpu["system_cpu_usage"],
+        "cpu_percent": None,
+        # Page cache is reclaimable; docker stats reports usage without it
+        "memory": memory.get("usage", 0) - detail.get("inactive_file", detail.get("total_inactive_file", 0)),
+        "memory_limit": memory.get("limit", 0),
+        "pids": stats.get("pids_stats", {}).get("current"),
+    }
+    if previous and sample["system"] > previous["system"]:
+        cpus = cpu.get("online_cpus") or len(cpu["cpu_usage"].get("percpu_usage") or [1])
+        sample["cpu_percent"] = (
+            (sample["cpu_total"] - previous["cpu_total"]) / (sample["system"] - previous["system"]) * cpus * 100
+        )
+    return sample
+
+
+def count_new_log_lines(path: Path, position: int) -> tuple:
+    """Lines appended to a log since position; returns (lines, new position).
+
+    The first call (position None) only records the end of the file, and a
+    truncated or rotated file is read from the start.
+    """
+    try:
+        size = path.stat().st_size
+        if position is None:
+            return 0, size
+        if size < position:
+            position = 0
+        with path.open("rb") as f:
+            f.seek(position)
+            data = f.read(size - position)
+        return data.count(b"\n"), position + len(data)
+    except OSError:
+        return None, position
+
+
+def read_db_gauges(db_path: Path) -> dict:
+    """Order and email queue counts from a read-only connection, plus WAL size."""
+    gauges = {"orders": {}, "emails": {}, "wal_bytes": None, "error": None}
+    wal = Path(f"{db_path}-wal")
+    gauges["wal_bytes"] = wal.stat().st_size if wal.exists() else 0
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=0.5)
+        try:
+            gauges["orders"] = dict(conn.execute("SELECT status, COUNT(*) FROM deck_requests GROUP BY status"))
+            gauges["emails"] = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM email_queue WHERE status IN ('pending', 'failed') GROUP BY status"
+            ))
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        gauges["error"] = str(e)
+    return gauges
+
+
+PROMETHEUS_SAMPLE_RE = re.compile(r"^([a-zA-Z_:][\w:]*)(?:\{(.*)\})? (\S+)$")
+PROMETHEUS_LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_prometheus(text: str) -> dict:
+    """Parse Prometheus text exposition into {name: [(labels, value), ...]}."""
+    metrics = collections.defaultdict(list)
+    for line in text.splitlines():
+        match = PROMETHEUS_SAMPLE_RE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            metrics[name].append((dict(PROMETHEUS_LABEL_RE.findall(labels or "")), float(value)))
+    return metrics
+
+
+def request_stats(previous: dict, current: dict, elapsed: float) -> dict:
+    """Request rate, mean and p95 latency and 429 rate between two scrapes.
+
+    Scrapes of /api/metrics itself are left out. Deltas are taken series by
+    series; a series that went down (the server or, in cluster mode, one of
+    its workers restarted) is left out of that interval instead of counting
+    negative.
+    """
+    def histograms(metrics):
+        series = {}
+        for suffix in ("count", "sum", "bucket"):
+            for labels, value in metrics.get(f"http_request_duration_seconds_{suffix}", []):
+                if labels.get("route") == "/api/metrics":
+                    continue
+                key = tuple(sorted((name, v) for name, v in labels.items() if name != "le"))
+                entry = series.setdefault(key, {"count": 0.0, "sum": 0.0, "buckets": {}})
+                if suffix == "bucket":
+                    entry["buckets"][float(labels["le"])] = value
+                else:
+                    entry[suffix] = value
+        return series
+
+    def rejections(metrics):
+        return {
+            tuple(sorted(labels.items())): value
+            for labels, value in metrics.get("launchlist_rate_limit_rejections_total", [])
+        }
+
+    empty = {"count": 0.0, "sum": 0.0, "buckets": {}}
+    before = histograms(previous)
+    count, total, buckets = 0.0, 0.0, collections.Counter()
+    for key, now in histograms(current).items():
+        then = before.get(key, empty)
+        if now["count"] < then["count"]:
+            continue
+        count += now["count"] - then["count"]
+        total += now["sum"] - then["sum"]
+        for le, value in now["buckets"].items():
+            buckets[le] += value - then["buckets"].get(le, 0.0)
+
+    rejected_before = rejections(previous)
+    rejected = sum(
+        max(value - rejected_before.get(key, 0.0), 0.0) for key, value in rejections(current).items()
+    )
+
+    p95 = None
+    if count > 0:
+        p95 = next((le for le in sorted(buckets) if buckets[le] >= 0.95 * count), None)
+    return {
+        "rate": count / elapsed,
+        "mean": total / count if count > 0 else None,
+        "p95": p95,
+        "rejected_rate": rejected / elapsed,
+    }
+
+
+def metric_value(metrics: dict, name: str, combine=sum, **labels) -> float:
+    """Combined samples of a metric whose labels include labels, or None.
+
+    In cluster mode per-process gauges have one sample per worker.
+    """
+    values = [value for sample, value in metrics.get(name, []) if labels.items() <= sample.items()]
+    return combine(values) if values else None
+
+
+async def fetch_once(url: str) -> HttpResponse:
+    """One GET over a fresh connection; returns the response, or None on failure."""
+    host, port, path = split_url(url)
+    connection = HttpConnection(host, port)
+    try:
+        return await connection.request("GET", path, timeout=2.0)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+        return None
+    finally:
+        await connection.close()
+
+
+def collect_top_sample(state: dict, db_path: Path, url: str) -> dict:
+    """Take one dashboard sample; state carries counters between samples."""
+    now = time.monotonic()
+    elapsed = now - state["at"] if "at" in state else None
+    state["at"] = now
+
+    containers = {}
+    for name, _port in DEPLOY_SLOTS.values():
+        stats = container_stats(name, state["containers"].get(name))
+        if stats is not None:
+            containers[name] = stats
+    state["containers"] = containers
+
+    lines, state["log_position"] = count_new_log_lines(NGINX_ACCESS_LOG, state.get("log_position"))
+    request_rate = lines / elapsed if lines is not None and elapsed else None
+
+    # The server's own request histograms, when it serves /api/metrics
+    response = asyncio.run(fetch_once(f"http://{urlsplit(url).netloc}/api/metrics"))
+    metrics = parse_prometheus(response.body.decode()) if response and response.status == 200 else None
+    server = None
+    if metrics is not None:
+        server = {
+            "requests": request_stats(state["metrics"], metrics, elapsed) if state.get("metrics") else None,
+            "loop_p99": metric_value(metrics, "nodejs_eventloop_lag_seconds", max, quantile="0.99"),
+            "heap": metric_value(metrics, "nodejs_memory_bytes", kind="heap_used"),
+        }
+    state["metrics"] = metrics
+
+    response = asyncio.run(fetch_once(url))
+    latency = response.elapsed if response and response.status == 200 else None
+    state["latencies"].append(latency)
+    answered = [value for value in state["latencies"] if value is not None]
+
+    return {
+        "time": datetime.now(),
+        "containers": containers,
+        "request_rate": request_rate,
+        "server": server,
+        "latency": latency,
+        "latency_p95": percentile(answered, 95) if answered else None,
+        "probe_failures": len(state["latencies"]) - len(answered),
+        "db": read_db_gauges(db_path),
+    }
+
+
+def format_top(sample: dict, url: str, db_path: Path) -> list[str]:
+    """Render a dashboard sample as plain text lines."""
+    def ms(seconds):
+        return f"{seconds * 1000:.1f} ms" if seconds is not None else "-"
+
+    lines = [f"LaunchList top - {sample['time']:%H:%M:%S}  (q to quit)", ""]
+    lines.append(f"{'Container':<20} {'CPU':>7} {'Memory':>20} {'PIDs':>5}")
+    if not sample["containers"]:
+        lines.append("  (no running LaunchList containers, or the Docker socket is not readable)")
+    for name, stats in sample["containers"].items():
+        cpu = f"{stats['cpu_percent']:.1f}%" if stats["cpu_percent"] is not None else "-"
+        memory = f"{stats['memory'] / 1e6:,.0f}/{stats['memory_limit'] / 1e6:,.0f} MB"
+        lines.append(f"{name:<20} {cpu:>7} {memory:>20} {stats['pids'] or '-':>5}")
+
+    lines.append("")
+    server = sample["server"]
+    if server is not None:
+        requests = server["requests"]
+        if requests is not None:
+            p95 = f"<= {ms(requests['p95'])}" if requests["p95"] not in (None, float("inf")) else "-"
+            lines.append(
+                f"Requests (server)  {requests['rate']:.1f}/s  mean {ms(requests['mean'])}  p95 {p95}"
+                f"  429s {requests['rejected_rate']:.1f}/s"
+            )
+        heap = f"{server['heap'] / 1e6:,.0f} MB" if server["heap"] is not None else "-"
+        lines.append(f"Event loop p99     {ms(server['loop_p99'])}  heap {heap}")
+    else:
+        rate = f"{sample['request_rate']:.1f}/s" if sample["request_rate"] is not None else "-"
+        lines.append(f"Requests (nginx)   {rate}")
+    lines.append(
+        f"Probe {urlsplit(url).path:<12} {ms(sample['latency'])}  p95 {ms(sample['latency_p95'])}"
+        f"  failed {sample['probe_failures']}"
+    )
+
+    db = sample["db"]
+    lines.append("")
+    lines.append(f"Database           {db_path}")
+    lines.append(f"WAL                {db['wal_bytes'] / 1e6:,.1f} MB")
+    if db["error"]:
+        lines.append(f"Read failed        {db['error']}")
+    else:
+        emails = db["emails"]
+        lines.append(f"Email queue        pending {emails.get('pending', 0):,}  failed {emails.get('failed', 0):,}")
+        orders = "  ".join(f"{status} {count:,}" for status, count in sorted(db["orders"].items()))
+        lines.append(f"Orders             {orders or '-'}")
+    return lines
+
+
+def run_top(db_path: Path, url: str, interval: float, once: bool) -> None:
+    """Refresh a full-screen dashboard every interval seconds until q is pressed.
+
+    With once, take two samples (so rates and CPU have a baseline) and print
+    the second as plain text.
+    """
+    state = {"containers": {}, "latencies": collections.deque(maxlen=60)}
+    if once:
+        collect_top_sample(state, db_path, url)
+        time.sleep(interval)
+        print("\n".join(format_top(collect_top_sample(state, db_path, url), url, db_path)))
+        return
+
+    def dashboard(screen):
+        curses.curs_set(0)
+        screen.timeout(int(interval * 1000))
+        while True:
+            lines = format_top(collect_top_sample(state, db_path, url), url, db_path)
+            screen.erase()
+            height, width = screen.getmaxyx()
+            for row, line in enumerate(lines[:height - 1]):
+                screen.addnstr(row, 0, line, width - 1, curses.A_BOLD if row == 0 else curses.A_NORMAL)
+            screen.refresh()
+            if screen.getch() in (ord("q"), ord("Q"), 27):
+                return
+
+    curses.wrapper(dashboard)
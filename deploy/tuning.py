@@ -0,0 +1,142 @@
+"""Host probing and the docker-compose.override.yml sizing written by deploy.py."""
+
+import os
+from pathlib import Path
+
+from common import print_step, print_success, print_warning
+
+# Host-tuned compose override written by tune_for_host (merged automatically by compose)
+COMPOSE_OVERRIDE = "docker-compose.override.yml"
+COMPOSE_OVERRIDE_MARKER = "Generated by deploy.py"
+
+
+def is_rotational(path: Path) -> bool:
+    """Whether the block device holding path is a spinning disk."""
+    dev = os.stat(path).st_dev
+    sys_dev = Path(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}")
+    try:
+        sys_dev = sys_dev.resolve(strict=True)
+    except OSError:
+        return False
+    # Partitions keep their queue settings on the parent disk
+    for candidate in (sys_dev, sys_dev.parent):
+        flag = candidate / "queue" / "rotational"
+        if flag.exists():
+            return flag.read_text().strip() == "1"
+    return False
+
+
+def probe_host(project_dir: Path) -> dict:
+    """Cores, RAM and disk type of the host that will run the container."""
+    mem_kb = 0
+    with open("/proc/meminfo") as fh:
+        for line in fh:
+            if line.startswith("MemTotal:"):
+                mem_kb = int(line.split()[1])
+                break
+    data_root = Path("/var/lib/docker")
+    return {
+        "cores": len(os.sched_getaffinity(0)),
+        "memory_mb": mem_kb // 1024,
+        "rotational": is_rotational(data_root if data_root.exists() else project_dir),
+    }
+
+
+def compute_tuning(host: dict) -> dict:
+    """Size the container and the runtimes inside it to the host.
+
+    One core and half the RAM are left to the host (nginx, Docker, backups).
+    The server runs one worker process per container CPU (at most 8, and at
+    least 192 MB of the memory limit each); one worker means no cluster.
+    Inside the memory limit the V8 heaps get 60% and the SQLite page caches
+    10%, split between workers; mmap is only used on SSDs, where a page fault
+    is cheap enough to take on the event loop, and is shared by all workers.
+    The libuv pool runs bcrypt, so it tracks cores per worker.
+    """
+    memory = min(max(host["memory_mb"] // 2, 256), 4096)
+    cpus = max(1, host["cores"] - 1)
+    workers = max(1, min(cpus, memory // 192, 8))
+    return {
+        "cpus": float(cpus),
+        "memory_mb": memory,
+        "workers": workers,
+        "heap_mb": memory * 60 // 100 // workers,
+        "threadpool": min(max(4, host["cores"] // workers), 16),
+        "sqlite_cache_kb": min(memory * 10 // 100 // workers, 256) * 1024,
+        "sqlite_mmap_mb": 0 if host["rotational"] else min(memory // 4, 1024),
+    }
+
+
+def write_compose_override(project_dir: Path, host: dict, tuning: dict) -> bool:
+    """Write docker-compose.override.yml with the tuned limits and runtime settings.
+
+    Variables set when compose runs win over the tuned defaults. An override
+    file deploy.py did not generate is left alone (returns None). Otherwise
+    returns whether the file changed, i.e. the container needs recreating.
+    """
+    path = project_dir / COMPOSE_OVERRIDE
+    if path.exists() and COMPOSE_OVERRIDE_MARKER not in path.read_text():
+        print_warning(f"{COMPOSE_OVERRIDE} was not generated by deploy.py; leaving it unchanged")
+        return None
+
+    disk = "HDD" if host["rotational"] else "SSD"
+    content = f"""# {COMPOSE_OVERRIDE_MARKER} for this host ({host['cores']} cores, {host['memory_mb']} MB RAM, {disk}).
+# Re-run deploy.py to regenerate, or with --no-tune to remove this file and use
+# the limits in docker-compose.yml. Variables set in the environment (or with
+# --env-file LaunchList.env) take precedence over the tuned values.
+services:
+  app:
+    environment:
+      - CLUSTER_WORKERS=${{CLUSTER_WORKERS:-{tuning['workers']}}}
+      - NODE_OPTIONS=${{NODE_OPTIONS:---max-old-space-size={tuning['heap_mb']}}}
+      - UV_THREADPOOL_SIZE=${{UV_THREADPOOL_SIZE:-{tuning['threadpool']}}}
+      - SQLITE_CACHE_SIZE_KB=${{SQLITE_CACHE_SIZE_KB:-{tuning['sqlite_cache_kb']}}}
+      - SQLITE_MMAP_SIZE_MB=${{SQLITE_MMAP_SIZE_MB:-{tuning['sqlite_mmap_mb']}}}
+    deploy:
+      resources:
+        limits:
+          cpus: '{tuning['cpus']:.1f}'
+          memory: {tuning['memory_mb']}M
+"""
+    if path.exists() and path.read_text() == content:
+        return False
+    path.write_text(content)
+    return True
+
+
+def tune_for_host(project_dir: Path) -> bool:
+    """Probe the host, write the compose override and print the chosen profile.
+
+    Returns whether the override changed.
+    """
+    print_step("Tuning for this host...")
+    host = probe_host(project_dir)
+    tuning = compute_tuning(host)
+    changed = write_compose_override(project_dir, host, tuning)
+    if changed is None:
+        return False
+    disk = "HDD" if host["rotational"] else "SSD"
+    print(f"  Host:      {host['cores']} cores, {host['memory_mb']:,} MB RAM, {disk}")
+    print(f"  Container: {tuning['cpus']:.1f} CPUs, {tuning['memory_mb']:,} MB memory")
+    per_worker = " per worker" if tuning["workers"] > 1 else ""
+    print(f"  Workers:   {tuning['workers']}" + (" (cluster mode)" if tuning["workers"] > 1 else ""))
+    print(f"  Node:      --max-old-space-size={tuning['heap_mb']}, UV_THREADPOOL_SIZE={tuning['threadpool']}{per_worker}")
+    print(f"  SQLite:    cache_size {tuning['sqlite_cache_kb'] // 1024} MB{per_worker}, mmap_size {tuning['sqlite_mmap_mb']} MB")
+    print_success(f"Wrote {COMPOSE_OVERRIDE}" if changed else f"{COMPOSE_OVERRIDE} unchanged")
+    return changed
+
+
+def remove_compose_override(project_dir: Path) -> bool:
+    """--no-tune: remove the override a previous run generated, so compose falls
+    back to the limits in docker-compose.yml. Returns whether it was removed,
+    i.e. the container needs recreating.
+    """
+    path = project_dir / COMPOSE_OVERRIDE
+    if not path.exists():
+        return False
+    if COMPOSE_OVERRIDE_MARKER not in path.read_text():
+        print_warning(f"{COMPOSE_OVERRIDE} was not generated by deploy.py and still applies")
+        return False
+    path.unlink()
+    print_success(f"Removed the {COMPOSE_OVERRIDE} a previous run generated")
+    return True
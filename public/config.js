@@ -0,0 +1,3 @@
+// Placeholder for `npm run dev`. In production the server answers /config.js
+// with the store settings from LaunchList.env (server/src/routes/clientConfig.ts).
+window.__LAUNCHLIST_CONFIG__ = window.__LAUNCHLIST_CONFIG__ || {};
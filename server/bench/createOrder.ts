@@ -0,0 +1,98 @@
+// Submit latency of createOrder for typical and maximum deck sizes, against
+// the previous one-INSERT-per-line-item path.
+// Run with: npm run bench:create-order
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import crypto from 'crypto';
+import { eq } from 'drizzle-orm';
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'launchlist-bench-'));
+process.env.DATABASE_PATH = path.join(dir, 'bench.db');
+process.env.JWT_SECRET ??= 'bench-only-secret-that-is-at-least-32-chars';
+
+const { initializeDatabase, getDatabase, getSqlite } = await import('../src/db/index.js');
+const { createOrder } = await import('../src/services/orderService.js');
+const { deckRequests, deckLineItems } = await import('../src/db/schema.js');
+
+const DECK_SIZES = [60, 100, 500];
+const ORDERS_PER_SIZE = 200;
+
+type Input = Parameters<typeof createOrder>[0];
+
+function makeInput(lines: number): Input {
+  const lineItems = Array.from({ length: lines }, (_, i) => ({
+    quantity: 1 + (i % 4),
+    cardName: `Bench Card ${i}`,
+    parseConfidence: 0.95,
+    lineRaw: `${1 + (i % 4)} Bench Card ${i}`,
+  }));
+  return {
+    customerName: 'Bench Customer',
+    email: 'bench@example.com',
+    game: 'magic',
+    rawDecklist: lineItems.map((item) => item.lineRaw).join('\n'),
+    lineItems,
+  };
+}
+
+// The previous implementation: a drizzle insert per line item, then a re-read
+function createOrderPerRow(input: Input) {
+  const db = getDatabase();
+  const now = new Date().toISOString();
+  const orderId = crypto.randomUUID();
+  return getSqlite().transaction(() => {
+    db.insert(deckRequests).values({
+      id: orderId,
+      orderNumber: `BENCH-${orderId}`,
+      customerName: input.customerName,
+      email: input.email,
+      game: input.game,
+      rawDecklist: input.rawDecklist,
+      status: 'submitted',
+      createdAt: now,
+      updatedAt: now,
+    }).run();
+    for (const item of input.lineItems) {
+      db.insert(deckLineItems).values({
+        id: crypto.randomUUID(),
+        deckRequestId: orderId,
+        quantity: item.quantity,
+        cardName: item.cardName,
+        parseConfidence: item.parseConfidence,
+        lineRaw: item.lineRaw,
+        createdAt: now,
+      }).run();
+    }
+    const order = db.select().from(deckRequests).where(eq(deckRequests.id, orderId)).get()!;
+    const lineItems = db.select().from(deckLineItems).where(eq(deckLineItems.deckRequestId, orderId)).all();
+    return { order, lineItems };
+  })();
+}
+
+function percentile(sorted: number[], pct: number): number {
+  return sorted[Math.min(sorted.length - 1, Math.ceil((pct / 100) * sorted.length) - 1)];
+}
+
+async function measure(fn: () => unknown | Promise<unknown>): Promise<string> {
+  const timings: number[] = [];
+  for (let i = 0; i < ORDERS_PER_SIZE; i++) {
+    const start = process.hrtime.bigint();
+    await fn();
+    timings.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  timings.sort((a, b) => a - b);
+  return `p50 ${percentile(timings, 50).toFixed(2).padStart(6)} ms  p95 ${percentile(timings, 95).toFixed(2).padStart(6)} ms`;
+}
+
+initializeDatabase();
+console.log(`${ORDERS_PER_SIZE} orders per deck size, database in ${dir}`);
+for (const lines of DECK_SIZES) {
+  const input = makeInput(lines);
+  const before = await measure(() => createOrderPerRow(input));
+  const after = await measure(() => createOrder(input));
+  console.log(`${String(lines).padStart(4)} lines  per-row: ${before}   batched: ${after}`);
+}
+
+fs.rmSync(dir, { recursive: true, force: true });
+process.exit(0);
@@ -0,0 +1,56 @@
+// Cost of the /api/metrics instrumentation on the hot path.
+// Run with: npm run bench:metrics
+import Database from 'better-sqlite3';
+import { EventEmitter } from 'events';
+import type { Request, Response } from 'express';
+import { Histogram, renderMetrics } from '../src/utils/metrics.js';
+import { requestMetrics } from '../src/middleware/metrics.js';
+
+// db/index.ts loads config.ts, which refuses to start without a JWT secret
+process.env.JWT_SECRET ??= 'bench-only-secret-that-is-at-least-32-chars';
+const { instrumentStatements } = await import('../src/db/index.js');
+
+const ITERATIONS = 200_000;
+
+function bench(name: string, fn: () => void): number {
+  for (let i = 0; i < ITERATIONS / 10; i++) fn(); // warm up
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < ITERATIONS; i++) fn();
+  const ns = Number(process.hrtime.bigint() - start) / ITERATIONS;
+  console.log(`${name.padEnd(36)} ${ns.toFixed(0).padStart(7)} ns/op`);
+  return ns;
+}
+
+function openDatabase(instrumented: boolean) {
+  const db = new Database(':memory:');
+  if (instrumented) instrumentStatements(db);
+  db.exec('CREATE TABLE users (id TEXT PRIMARY KEY, email TEXT, role TEXT)');
+  const insert = db.prepare('INSERT INTO users VALUES (?, ?, ?)');
+  for (let i = 0; i < 1000; i++) insert.run(`user-${i}`, `user${i}@example.com`, 'staff');
+  return db;
+}
+
+const histogram = new Histogram('bench_observe_seconds', 'Benchmark histogram');
+bench('Histogram.observe', () => histogram.observe({ method: 'GET', route: '/api/orders/:id', status: '200' }, 0.004));
+
+const request = { method: 'GET', baseUrl: '/api/orders', route: { path: '/:id' }, originalUrl: '/api/orders/1' };
+const bare = bench('response without middleware', () => {
+  const res = new EventEmitter();
+  res.emit('finish');
+});
+const timed = bench('response with requestMetrics', () => {
+  const res = new EventEmitter();
+  requestMetrics(request as unknown as Request, res as unknown as Response, () => {});
+  res.emit('finish');
+});
+console.log(`  -> ${(timed - bare).toFixed(0)} ns per request`);
+
+const plain = openDatabase(false).prepare('SELECT * FROM users WHERE id = ?');
+const wrapped = openDatabase(true).prepare('SELECT * FROM users WHERE id = ?');
+const raw = bench('statement.get', () => plain.get('user-500'));
+const instrumented = bench('statement.get, instrumented', () => wrapped.get('user-500'));
+console.log(`  -> ${(instrumented - raw).toFixed(0)} ns per statement`);
+
+const start = process.hrtime.bigint();
+const size = renderMetrics().length;
+console.log(`renderMetrics: ${(Number(process.hrtime.bigint() - start) / 1e6).toFixed(2)} ms, ${size} bytes`);
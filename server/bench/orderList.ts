@@ -0,0 +1,117 @@
+// Staff order list latency at 10k/100k/1M orders: the previous COUNT(*) plus
+// LIMIT/OFFSET query on the old indexes, against getAllOrders with a keyset
+// cursor and the order_counts totals. Pages are read at the same depths.
+// Run with: npm run bench:order-list
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import crypto from 'crypto';
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'launchlist-bench-'));
+process.env.DATABASE_PATH = path.join(dir, 'bench.db');
+process.env.JWT_SECRET ??= 'bench-only-secret-that-is-at-least-32-chars';
+
+const { initializeDatabase, getSqlite } = await import('../src/db/index.js');
+const { getAllOrders, encodeOrderCursor } = await import('../src/services/orderService.js');
+const { requestStatuses } = await import('../src/db/schema.js');
+
+const ORDER_COUNTS = [10_000, 100_000, 1_000_000];
+const PAGE = 25;
+const RUNS = 50;
+const INSERT_BATCH = 10_000;
+
+function percentile(sorted: number[], pct: number): number {
+  return sorted[Math.min(sorted.length - 1, Math.ceil((pct / 100) * sorted.length) - 1)];
+}
+
+function measure(fn: () => unknown): string {
+  const timings: number[] = [];
+  for (let i = 0; i < RUNS; i++) {
+    const start = process.hrtime.bigint();
+    fn();
+    timings.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  timings.sort((a, b) => a - b);
+  return `p50 ${percentile(timings, 50).toFixed(2).padStart(8)} ms  p95 ${percentile(timings, 95).toFixed(2).padStart(8)} ms`;
+}
+
+// One order a minute going back from now, statuses spread evenly
+function seed(from: number, to: number) {
+  const sqlite = getSqlite();
+  const insert = sqlite.prepare(`
+    INSERT INTO deck_requests (id, order_number, customer_name, email, game, raw_decklist, status, created_at, updated_at)
+    VALUES (?, ?, 'Bench Customer', 'bench@example.com', 'magic', '4 Bench Card', ?, ?, ?)
+  `);
+  const now = Date.now();
+  const insertBatch = sqlite.transaction((start: number, end: number) => {
+    for (let i = start; i < end; i++) {
+      const createdAt = new Date(now - i * 60_000).toISOString();
+      insert.run(crypto.randomUUID(), `BENCH-${i}`, requestStatuses[i % requestStatuses.length], createdAt, createdAt);
+    }
+  });
+  for (let start = from; start < to; start += INSERT_BATCH) {
+    insertBatch(start, Math.min(start + INSERT_BATCH, to));
+  }
+}
+
+// The indexes as they were before keyset pagination
+function useOldIndexes(old: boolean) {
+  getSqlite().exec(old ? `
+    DROP INDEX idx_deck_requests_created_at;
+    DROP INDEX idx_deck_requests_status_created_at;
+    DROP INDEX idx_deck_requests_status_updated_at;
+    CREATE INDEX idx_deck_requests_status ON deck_requests(status);
+  ` : `
+    DROP INDEX idx_deck_requests_status;
+    CREATE INDEX idx_deck_requests_created_at ON deck_requests(created_at, id);
+    CREATE INDEX idx_deck_requests_status_created_at ON deck_requests(status, created_at, id);
+    CREATE INDEX idx_deck_requests_status_updated_at ON deck_requests(status, updated_at);
+  `);
+}
+
+function offsetPage(offset: number, status?: string) {
+  const sqlite = getSqlite();
+  if (status) {
+    sqlite.prepare('SELECT COUNT(*) as total FROM deck_requests WHERE status = ?').get(status);
+    return sqlite.prepare('SELECT * FROM deck_requests WHERE status = ? ORDER BY created_at DESC LIMIT ? OFFSET ?')
+      .all(status, PAGE, offset);
+  }
+  sqlite.prepare('SELECT COUNT(*) as total FROM deck_requests').get();
+  return sqlite.prepare('SELECT * FROM deck_requests ORDER BY created_at DESC LIMIT ? OFFSET ?').all(PAGE, offset);
+}
+
+// Cursor for the page starting at offset, i.e. the row just before it
+function cursorAt(offset: number, status?: string): string | undefined {
+  if (offset === 0) return undefined;
+  const row = getSqlite().prepare(`
+    SELECT created_at AS createdAt, id FROM deck_requests ${status ? 'WHERE status = ?' : ''}
+    ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?
+  `).get(...(status ? [status, offset - 1] : [offset - 1])) as { createdAt: string; id: string };
+  return encodeOrderCursor(row);
+}
+
+initializeDatabase();
+console.log(`${RUNS} page reads of ${PAGE} orders per case, database in ${dir}`);
+
+let seeded = 0;
+for (const total of ORDER_COUNTS) {
+  seed(seeded, total);
+  seeded = total;
+  getSqlite().exec('ANALYZE');
+  console.log(`\n${total.toLocaleString()} orders`);
+
+  for (const status of [undefined, 'submitted'] as const) {
+    const rows = status ? total / requestStatuses.length : total;
+    for (const [label, offset] of [['first page', 0], ['middle', Math.floor(rows / 2)], ['last page', rows - PAGE]] as const) {
+      const cursor = cursorAt(offset, status);
+      useOldIndexes(true);
+      const before = measure(() => offsetPage(offset, status));
+      useOldIndexes(false);
+      const after = measure(() => getAllOrders({ limit: PAGE, cursor, status }));
+      console.log(`  ${(status ?? 'all').padEnd(9)} ${label.padEnd(10)}  offset: ${before}   keyset: ${after}`);
+    }
+  }
+}
+
+fs.rmSync(dir, { recursive: true, force: true });
+process.exit(0);
@@ -0,0 +1,106 @@
+// Per-request cost and memory of the rate limiter at 100k distinct clients,
+// against the previous fixed-window limiter sharing one global Map, plus the
+// SQLite store cluster workers share.
+// Run with: npm run bench:rate-limiter
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import Database from 'better-sqlite3';
+import type { Request, Response } from 'express';
+
+// rateLimiter.ts reads config.ts, which refuses to start without a JWT secret
+process.env.JWT_SECRET ??= 'bench-only-secret-that-is-at-least-32-chars';
+const { createRateLimiter, SlidingWindowStore, SqliteWindowStore } = await import('../src/middleware/rateLimiter.js');
+
+const CLIENTS = 100_000;
+const REQUESTS = 1_000_000;
+
+const gc = (globalThis as { gc?: () => void }).gc;
+
+function heapUsed(): number {
+  gc?.();
+  return process.memoryUsage().heapUsed;
+}
+
+// The previous implementation: one Map for every limiter, keyed by bare IP,
+// trimmed in insertion order once it passed 10k entries
+function createFixedWindowLimiter(windowMs: number, maxRequests: number) {
+  const store = new Map<string, { count: number; resetTime: number }>();
+  return (key: string, now: number) => {
+    let record = store.get(key);
+    if (!record || record.resetTime < now) {
+      record = { count: 1, resetTime: now + windowMs };
+      store.set(key, record);
+      if (store.size > 10_000) {
+        let remove = store.size - 9_000;
+        for (const oldKey of store.keys()) {
+          if (remove-- <= 0) break;
+          store.delete(oldKey);
+        }
+      }
+      return true;
+    }
+    return ++record.count <= maxRequests;
+  };
+}
+
+const keys = Array.from({ length: CLIENTS }, (_, i) => `10.${(i >> 16) & 255}.${(i >> 8) & 255}.${i & 255}`);
+
+// Skewed traffic: half the requests from 1% of clients, the rest spread evenly
+function keyFor(i: number): string {
+  return i % 2 === 0 ? keys[(i >> 1) % (CLIENTS / 100)] : keys[((i >> 1) * 7919) % CLIENTS];
+}
+
+function bench(name: string, hit: (key: string, now: number) => unknown, requests = REQUESTS) {
+  const before = heapUsed();
+  const now = Date.now();
+  for (let i = 0; i < requests / 10; i++) hit(keyFor(i), now); // warm up
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < requests; i++) hit(keyFor(i), now + (i >> 10));
+  const ns = Number(process.hrtime.bigint() - start) / requests;
+  const mb = (heapUsed() - before) / 1024 / 1024;
+  console.log(`${name.padEnd(40)} ${ns.toFixed(0).padStart(5)} ns/op  ${mb.toFixed(1).padStart(6)} MB retained`);
+}
+
+console.log(`${REQUESTS.toLocaleString()} requests from ${CLIENTS.toLocaleString()} clients${gc ? '' : ' (run with --expose-gc for exact memory)'}`);
+
+const fixedWindow = createFixedWindowLimiter(60_000, 100);
+bench('fixed window, shared Map', fixedWindow);
+
+const bounded = new SlidingWindowStore(60_000, 100);
+bench('sliding window, 10k client LRU', (key, now) => bounded.hit(key, now));
+
+const unbounded = new SlidingWindowStore(60_000, 100, CLIENTS);
+bench('sliding window, all 100k clients kept', (key, now) => unbounded.hit(key, now));
+console.log(`  -> ${unbounded.size.toLocaleString()} clients tracked`);
+
+// Full middleware path, as mounted on /api
+const limiter = createRateLimiter({ name: 'bench', windowMs: 60_000, maxRequests: 100 });
+const res = {
+  setHeader() {},
+  status() { return res; },
+  json() { return res; },
+};
+const req = { ip: '', socket: {} };
+bench('createRateLimiter middleware', (key) => {
+  req.ip = key;
+  limiter(req as unknown as Request, res as unknown as Response, () => {});
+});
+
+// Cluster mode: one write transaction per request in a file shared by workers
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'launchlist-bench-'));
+const db = new Database(path.join(dir, 'rate-limits.db'));
+db.pragma('journal_mode = WAL');
+db.pragma('synchronous = OFF');
+db.exec(`
+  CREATE TABLE rate_limits (
+    limiter TEXT NOT NULL, key TEXT NOT NULL, window_start INTEGER NOT NULL, previous INTEGER NOT NULL,
+    current INTEGER NOT NULL, expires_at INTEGER NOT NULL, PRIMARY KEY (limiter, key)
+  ) WITHOUT ROWID
+`);
+const shared = new SqliteWindowStore('bench', 60_000, 100, db);
+bench('sliding window, shared SQLite store', (key, now) => shared.hit(key, now), REQUESTS / 10);
+console.log(`  -> ${shared.size.toLocaleString()} clients tracked`);
+
+fs.rmSync(dir, { recursive: true, force: true });
+process.exit(0);
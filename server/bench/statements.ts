@@ -0,0 +1,91 @@
+// Per-request database overhead of the hot paths with drizzle queries built
+// and prepared on every call (before) and the prepared-statement registry or,
+// for requireAuth, the in-memory auth cache (after).
+// Run with: npm run bench:statements
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import crypto from 'crypto';
+import { eq } from 'drizzle-orm';
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'launchlist-bench-'));
+process.env.DATABASE_PATH = path.join(dir, 'bench.db');
+process.env.JWT_SECRET ??= 'bench-only-secret-that-is-at-least-32-chars';
+
+const { initializeDatabase, getDatabase } = await import('../src/db/index.js');
+const { getStatements, getStatementStats } = await import('../src/db/statements.js');
+const { createOrder } = await import('../src/services/orderService.js');
+const { isTokenRevoked, getAuthUser } = await import('../src/services/authCache.js');
+const { deckRequests, deckLineItems, users, tokenBlacklist } = await import('../src/db/schema.js');
+
+const ITERATIONS = 20_000;
+
+function bench(fn: () => void): number {
+  for (let i = 0; i < ITERATIONS / 10; i++) fn(); // warm up
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < ITERATIONS; i++) fn();
+  return Number(process.hrtime.bigint() - start) / ITERATIONS / 1000;
+}
+
+function compare(name: string, before: () => void, after: () => void) {
+  const beforeUs = bench(before);
+  const afterUs = bench(after);
+  console.log(
+    `${name.padEnd(28)} before ${beforeUs.toFixed(1).padStart(6)} us   after ${afterUs.toFixed(1).padStart(6)} us` +
+    `   (${(beforeUs / afterUs).toFixed(1)}x)`,
+  );
+}
+
+initializeDatabase();
+const db = getDatabase();
+const statements = getStatements();
+
+const userId = crypto.randomUUID();
+db.insert(users).values({
+  id: userId, email: 'bench@example.com', passwordHash: 'x', role: 'staff', createdAt: new Date().toISOString(),
+}).run();
+const token = crypto.randomBytes(120).toString('base64url');
+const { order, lineItems } = await createOrder({
+  customerName: 'Bench Customer',
+  email: 'bench@example.com',
+  game: 'magic',
+  rawDecklist: '60 lines',
+  lineItems: Array.from({ length: 60 }, (_, i) => ({ quantity: 1, cardName: `Card ${i}`, lineRaw: `1 Card ${i}` })),
+});
+const itemId = lineItems[30].id;
+
+compare('requireAuth lookups', () => {
+  db.select().from(tokenBlacklist).where(eq(tokenBlacklist.token, token)).get();
+  db.select().from(users).where(eq(users.id, userId)).get();
+}, () => {
+  // The blacklist Map and user LRU from services/authCache.ts
+  isTokenRevoked(token);
+  getAuthUser(userId);
+});
+
+compare('getOrderWithItems (60 lines)', () => {
+  db.select().from(deckRequests).where(eq(deckRequests.id, order.id)).get();
+  db.select().from(deckLineItems).where(eq(deckLineItems.deckRequestId, order.id)).all();
+}, () => {
+  statements.orderById.get({ id: order.id });
+  statements.lineItemsByOrder.all({ orderId: order.id });
+});
+
+compare('PATCH line item', () => {
+  db.select().from(deckRequests).where(eq(deckRequests.id, order.id)).get();
+  db.select().from(deckLineItems).where(eq(deckLineItems.id, itemId)).get();
+  db.update(deckLineItems).set({ quantityFound: 1 }).where(eq(deckLineItems.id, itemId)).run();
+  db.select().from(deckLineItems).where(eq(deckLineItems.id, itemId)).get();
+}, () => {
+  statements.orderById.get({ id: order.id });
+  statements.lineItemById.get({ id: itemId });
+  statements.updateLineItem.get({ id: itemId, quantityFound: 1, unitPrice: null, conditionVariants: null, cardName: null });
+});
+
+console.log('\nRegistry totals:');
+for (const [name, { calls, seconds }] of Object.entries(getStatementStats())) {
+  if (calls) console.log(`  ${name.padEnd(20)} ${String(calls).padStart(7)} calls  ${(seconds / calls * 1e6).toFixed(1)} us/call`);
+}
+
+fs.rmSync(dir, { recursive: true, force: true });
+process.exit(0);
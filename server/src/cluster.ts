@@ -0,0 +1,175 @@
+import cluster, { type Worker } from 'cluster';
+import type { MetricSnapshot } from './utils/metrics.js';
+
+// Cluster mode (CLUSTER_WORKERS > 1): the primary only forks and supervises
+// HTTP workers, which share the listening port. Workers share state through
+// SQLite (orders, the email queue, rate-limit counters, the job leader lease)
+// and relay in-memory cache invalidations to each other through the primary.
+// A metrics scrape, answered by any one worker, gathers every worker's metrics
+// through the primary.
+
+// Delay before replacing a worker that exited, so a crash loop cannot spin
+const RESTART_DELAY_MS = 1000;
+const SHUTDOWN_TIMEOUT_MS = 15_000;
+// How long the primary waits for workers' metrics before answering without them
+const METRICS_TIMEOUT_MS = 2000;
+
+export type ClusterMessage =
+  | { type: 'token-revoked'; token: string; expiresAt: number }
+  | { type: 'user-invalidated'; userId: string };
+
+export interface WorkerMetrics {
+  worker: number;
+  metrics: MetricSnapshot[];
+}
+
+// Exchanged between one worker and the primary, never relayed
+type MetricsMessage =
+  | { type: 'metrics-request'; id: number }
+  | { type: 'metrics-collect'; id: string }
+  | { type: 'metrics-snapshot'; id: string; snapshot: WorkerMetrics }
+  | { type: 'metrics-response'; id: number; snapshots: WorkerMetrics[] };
+
+interface MetricsGather {
+  requester: Worker;
+  id: number;
+  waiting: Set<number>;
+  snapshots: WorkerMetrics[];
+  timer: NodeJS.Timeout;
+}
+
+export function runPrimary(workers: number) {
+  console.log(`Cluster primary ${process.pid} starting ${workers} workers`);
+  let shuttingDown = false;
+
+  for (let i = 0; i < workers; i++) cluster.fork();
+
+  const gathers = new Map<string, MetricsGather>();
+
+  const finishGather = (key: string) => {
+    const gather = gathers.get(key);
+    if (!gather) return;
+    clearTimeout(gather.timer);
+    gathers.delete(key);
+    if (gather.requester.isConnected()) {
+      gather.requester.send({ type: 'metrics-response', id: gather.id, snapshots: gather.snapshots });
+    }
+  };
+
+  // Ask every worker for its metrics on behalf of the one being scraped
+  const startGather = (requester: Worker, id: number) => {
+    const key = `${requester.id}:${id}`;
+    const gather: MetricsGather = {
+      requester, id, waiting: new Set(), snapshots: [],
+      timer: setTimeout(() => finishGather(key), METRICS_TIMEOUT_MS),
+    };
+    gathers.set(key, gather);
+    for (const worker of Object.values(cluster.workers ?? {})) {
+      if (!worker?.isConnected()) continue;
+      gather.waiting.add(worker.id);
+      worker.send({ type: 'metrics-collect', id: key });
+    }
+  };
+
+  cluster.on('message', (sender, message: ClusterMessage | MetricsMessage) => {
+    if (message.type === 'metrics-request') {
+      startGather(sender, message.id);
+      return;
+    }
+    if (message.type === 'metrics-snapshot') {
+      const gather = gathers.get(message.id);
+      if (!gather) return;
+      gather.snapshots.push(message.snapshot);
+      gather.waiting.delete(sender.id);
+      if (gather.waiting.size === 0) finishGather(message.id);
+      return;
+    }
+    if (message.type === 'metrics-collect' || message.type === 'metrics-response') return;
+    // Relay each worker's message to every other worker
+    for (const worker of Object.values(cluster.workers ?? {})) {
+      if (worker && worker !== sender && worker.isConnected()) worker.send(message);
+    }
+  });
+
+  cluster.on('exit', (worker, code, signal) => {
+    for (const [key, gather] of gathers) {
+      if (gather.waiting.delete(worker.id) && gather.waiting.size === 0) finishGather(key);
+    }
+    if (shuttingDown) {
+      if (Object.keys(cluster.workers ?? {}).length === 0) process.exit(0);
+      return;
+    }
+    console.error(`Worker ${worker.process.pid} exited (${signal ?? code}), restarting`);
+    setTimeout(() => cluster.fork(), RESTART_DELAY_MS);
+  });
+
+  // Workers drain their connections and release the leader lease themselves
+  const shutdown = () => {
+    if (shuttingDown) return;
+    shuttingDown = true;
+    console.log('Shutting down workers...');
+    for (const worker of Object.values(cluster.workers ?? {})) worker?.process.kill('SIGTERM');
+    setTimeout(() => {
+      console.error('Forced shutdown after timeout');
+      process.exit(1);
+    }, SHUTDOWN_TIMEOUT_MS).unref();
+  };
+
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+}
+
+// Send a message to every other worker; a no-op outside cluster mode
+export function broadcast(message: ClusterMessage) {
+  if (cluster.isWorker && process.send) process.send(message);
+}
+
+export function onBroadcast<T extends ClusterMessage['type']>(
+  type: T,
+  handler: (message: Extract<ClusterMessage, { type: T }>) => void,
+) {
+  if (!cluster.isWorker) return;
+  process.on('message', (message: unknown) => {
+    if ((message as ClusterMessage | null)?.type === type) handler(message as Extract<ClusterMessage, { type: T }>);
+  });
+}
+
+const pendingMetrics = new Map<number, (snapshots: WorkerMetrics[] | null) => void>();
+let nextMetricsRequest = 0;
+
+// In each worker: hand this process's metrics to the primary when asked. The
+// snapshot comes from the caller so the primary never loads the metrics module.
+export function answerMetricsRequests(snapshot: () => MetricSnapshot[]) {
+  if (!cluster.isWorker) return;
+  process.on('message', (message: unknown) => {
+    const request = message as MetricsMessage | null;
+    if (request?.type === 'metrics-collect') {
+      const reply: MetricsMessage = {
+        type: 'metrics-snapshot', id: request.id, snapshot: { worker: cluster.worker!.id, metrics: snapshot() },
+      };
+      process.send?.(reply);
+    } else if (request?.type === 'metrics-response') {
+      pendingMetrics.get(request.id)?.(request.snapshots);
+      pendingMetrics.delete(request.id);
+    }
+  });
+}
+
+// Every worker's metrics, gathered by the primary; null outside cluster mode
+// or if the primary does not answer
+export function collectWorkerMetrics(): Promise<WorkerMetrics[] | null> {
+  if (!cluster.isWorker || !process.send) return Promise.resolve(null);
+  const id = nextMetricsRequest++;
+  return new Promise((resolve) => {
+    const timer = setTimeout(() => {
+      pendingMetrics.delete(id);
+      resolve(null);
+    }, METRICS_TIMEOUT_MS * 2);
+    pendingMetrics.set(id, (snapshots) => {
+      clearTimeout(timer);
+      resolve(snapshots);
+    });
+    const request: MetricsMessage = { type: 'metrics-request', id };
+    process.send!(request);
+  });
+}
@@ -1,4 +1,5 @@
 import { z } from 'zod';
+import path from 'path';
 
 const envSchema = z.object({
   PORT: z.string().default('3000'),
@@ -25,6 +26,30 @@ const envSchema = z.object({
   ORDER_PREFIX: z.string().default('LP'),
   ORDER_HOLD_DAYS: z.string().optional().default('7'),
 
+  // Upload limits and client-side API pacing (served to the frontend at runtime)
+  MAX_FILE_SIZE_MB: z.string().optional().default('1'),
+  MAX_DECKLIST_CARDS: z.string().optional().default('500'),
+  SCRYFALL_RATE_LIMIT_MS: z.string().optional().default('100'),
+  POKEMON_RATE_LIMIT_MS: z.string().optional().default('200'),
+  AUTOCOMPLETE_DEBOUNCE_MS: z.string().optional().default('200'),
+
+  // SQLite page cache and memory-mapped I/O (sized per host by deploy.py)
+  SQLITE_CACHE_SIZE_KB: z.string().optional().default('2000'),
+  SQLITE_MMAP_SIZE_MB: z.string().optional().default('0'),
+
+  // HTTP worker processes; above 1 the server runs in cluster mode (sized per host by deploy.py)
+  CLUSTER_WORKERS: z.string().optional().default('1'),
+  // Rate-limit counters shared by cluster workers; defaults to rate-limits.db next to the database
+  RATE_LIMIT_DATABASE_PATH: z.string().optional(),
+
+  // Extra addresses or CIDRs (comma-separated) allowed to read /api/ready and
+  // /api/metrics, besides loopback and the Docker gateway
+  OPS_ALLOW_CIDRS: z.string().optional().default(''),
+
+  // /api/ready reports 503 above these
+  READY_MAX_DB_READ_MS: z.string().optional().default('250'),
+  READY_MAX_WAL_MB: z.string().optional().default('512'),
+
   // CORS
   CORS_ORIGIN: z.string().optional(),
 
@@ -73,6 +98,35 @@ function loadConfig() {
     orderPrefix: result.data.ORDER_PREFIX,
     orderHoldDays: parseInt(result.data.ORDER_HOLD_DAYS || '7', 10),
 
+    limits: {
+      maxFileSizeMB: parseInt(result.data.MAX_FILE_SIZE_MB || '1', 10),
+      maxDecklistCards: parseInt(result.data.MAX_DECKLIST_CARDS || '500', 10),
+    },
+
+    sqlite: {
+      cacheSizeKb: parseInt(result.data.SQLITE_CACHE_SIZE_KB || '2000', 10),
+      mmapSizeMb: parseInt(result.data.SQLITE_MMAP_SIZE_MB || '0', 10),
+    },
+
+    cluster: {
+      workers: Math.max(1, parseInt(result.data.CLUSTER_WORKERS || '1', 10) || 1),
+      rateLimitDatabasePath: result.data.RATE_LIMIT_DATABASE_PATH
+        || path.join(path.dirname(result.data.DATABASE_PATH), 'rate-limits.db'),
+    },
+
+    opsAllowCidrs: (result.data.OPS_ALLOW_CIDRS || '').split(',').map((entry) => entry.trim()).filter(Boolean),
+
+    readiness: {
+      maxDbReadMs: parseInt(result.data.READY_MAX_DB_READ_MS || '250', 10),
+      maxWalMb: parseInt(result.data.READY_MAX_WAL_MB || '512', 10),
+    },
+
+    clientApi: {
+      scryfallRateLimitMs: parseInt(result.data.SCRYFALL_RATE_LIMIT_MS || '100', 10),
+      pokemonRateLimitMs: parseInt(result.data.POKEMON_RATE_LIMIT_MS || '200', 10),
+      autocompleteDebounceMs: parseInt(result.data.AUTOCOMPLETE_DEBOUNCE_MS || '200', 10),
+    },
+
     corsOrigin: result.data.CORS_ORIGIN || null,
 
     discord: {
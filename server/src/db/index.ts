@@ -4,6 +4,8 @@ import path from 'path';
 import fs from 'fs';
 import { config } from '../config.js';
 import * as schema from './schema.js';
+import { Histogram, secondsSince } from '../utils/metrics.js';
+import { prepareStatements, registryStatement } from './statements.js';
 
 let db: ReturnType<typeof drizzle<typeof schema>>;
 let sqlite: SqliteDatabase;
@@ -17,8 +19,15 @@ export function initializeDatabase() {
 
   // Create SQLite connection
   sqlite = new Database(config.databasePath);
+  instrumentStatements(sqlite);
+  // Only takes effect on a new database; `deploy.py db-maint --convert-incremental`
+  // switches an existing one so freed pages can be released without a full VACUUM
+  sqlite.pragma('auto_vacuum = INCREMENTAL');
   sqlite.pragma('journal_mode = WAL');
   sqlite.pragma('foreign_keys = ON');
+  // Negative cache_size is in KiB rather than pages
+  sqlite.pragma(`cache_size = -${config.sqlite.cacheSizeKb}`);
+  sqlite.pragma(`mmap_size = ${config.sqlite.mmapSizeMb * 1024 * 1024}`);
 
   // Create Drizzle instance
   db = drizzle(sqlite, { schema });
@@ -26,13 +35,67 @@ export function initializeDatabase() {
   // Initialize tables
   createTables();
 
+  // Prepare the hot-path statement registry (needs the tables)
+  prepareStatements(db, sqlite);
+
   // Clean up expired tokens on startup and periodically
   cleanExpiredRecords();
-  setInterval(cleanExpiredRecords, 60 * 60 * 1000);
+  setInterval(cleanExpiredRecords, 60 * 60 * 1000).unref();
 
   console.log(`Database initialized at ${config.databasePath}`);
 }
 
+const statementDuration = new Histogram(
+  'launchlist_sqlite_statement_duration_seconds',
+  'SQLite statement execution time by operation and table',
+);
+
+// Labels per SQL text; drizzle re-prepares the same few strings on every query
+const statementLabels = new Map<string, Record<string, string>>();
+
+function labelsFor(source: string): Record<string, string> {
+  let labels = statementLabels.get(source);
+  if (!labels) {
+    labels = {
+      op: /^\s*(\w+)/.exec(source)?.[1].toLowerCase() ?? 'other',
+      table: /\b(?:from|into|update)\s+["`]?(\w+)/i.exec(source)?.[1] ?? '',
+    };
+    if (statementLabels.size < 1000) statementLabels.set(source, labels);
+  }
+  return labels;
+}
+
+// Time run/get/all of every prepared statement, drizzle's included. This is
+// the only wrapper: hot-path registry statements are timed here too, under
+// their registry name.
+export function instrumentStatements(db: SqliteDatabase) {
+  const prepare = db.prepare.bind(db);
+  db.prepare = ((source: string) => {
+    const statement = prepare(source);
+    const registry = registryStatement();
+    const labels = registry ? { ...labelsFor(source), statement: registry.name } : labelsFor(source);
+    const stats = registry?.stats;
+    const methods = statement as unknown as Record<string, (...args: unknown[]) => unknown>;
+    for (const method of ['run', 'get', 'all']) {
+      const original = methods[method];
+      methods[method] = function (this: unknown, ...args: unknown[]) {
+        const start = process.hrtime.bigint();
+        try {
+          return original.apply(this, args);
+        } finally {
+          const seconds = secondsSince(start);
+          statementDuration.observe(labels, seconds);
+          if (stats) {
+            stats.calls++;
+            stats.seconds += seconds;
+          }
+        }
+      };
+    }
+    return statement;
+  }) as SqliteDatabase['prepare'];
+}
+
 function createTables() {
   // Create deck_requests table
   sqlite.exec(`
@@ -141,6 +204,16 @@ function createTables() {
     CREATE INDEX IF NOT EXISTS idx_email_queue_status ON email_queue(status);
   `);
 
+  // Lease naming the one process that runs background jobs (email queue,
+  // Discord scheduler) when several workers or containers share the database
+  sqlite.exec(`
+    CREATE TABLE IF NOT EXISTS leader_lease (
+      name TEXT PRIMARY KEY,
+      holder TEXT NOT NULL,
+      expires_at INTEGER NOT NULL
+    )
+  `);
+
   // Add alert deduplication columns (migration-safe)
   try {
     sqlite.exec(`ALTER TABLE deck_requests ADD COLUMN stale_alert_sent INTEGER NOT NULL DEFAULT 0`);
@@ -171,14 +244,45 @@ function createTables() {
     CREATE INDEX IF NOT EXISTS idx_password_reset_hash ON password_reset_tokens(token_hash);
   `);
 
-  // Create indexes
+  // Create indexes. The (created_at, id) pairs back the staff list's keyset
+  // pagination, newest first; (status, ...) also serves status filters, so the
+  // old single-column status index is dropped.
   sqlite.exec(`
     CREATE INDEX IF NOT EXISTS idx_deck_requests_order_number ON deck_requests(order_number);
     CREATE INDEX IF NOT EXISTS idx_deck_requests_email ON deck_requests(email);
-    CREATE INDEX IF NOT EXISTS idx_deck_requests_status ON deck_requests(status);
+    CREATE INDEX IF NOT EXISTS idx_deck_requests_created_at ON deck_requests(created_at, id);
+    CREATE INDEX IF NOT EXISTS idx_deck_requests_status_created_at ON deck_requests(status, created_at, id);
+    CREATE INDEX IF NOT EXISTS idx_deck_requests_status_updated_at ON deck_requests(status, updated_at);
+    DROP INDEX IF EXISTS idx_deck_requests_status;
     CREATE INDEX IF NOT EXISTS idx_deck_line_items_deck_request_id ON deck_line_items(deck_request_id);
     CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
   `);
+
+  // Orders per status, kept by triggers so list totals never COUNT(*) the
+  // table. Filled from deck_requests once, when the table is first created.
+  sqlite.exec(`
+    CREATE TABLE IF NOT EXISTS order_counts (
+      status TEXT PRIMARY KEY,
+      count INTEGER NOT NULL DEFAULT 0
+    );
+    INSERT INTO order_counts (status, count)
+      SELECT status, COUNT(*) FROM deck_requests
+      WHERE NOT EXISTS (SELECT 1 FROM order_counts)
+      GROUP BY status;
+    CREATE TRIGGER IF NOT EXISTS order_counts_insert AFTER INSERT ON deck_requests BEGIN
+      INSERT INTO order_counts (status, count) VALUES (NEW.status, 1)
+        ON CONFLICT(status) DO UPDATE SET count = count + 1;
+    END;
+    CREATE TRIGGER IF NOT EXISTS order_counts_delete AFTER DELETE ON deck_requests BEGIN
+      UPDATE order_counts SET count = count - 1 WHERE status = OLD.status;
+    END;
+    CREATE TRIGGER IF NOT EXISTS order_counts_update AFTER UPDATE OF status ON deck_requests
+    WHEN NEW.status IS NOT OLD.status BEGIN
+      UPDATE order_counts SET count = count - 1 WHERE status = OLD.status;
+      INSERT INTO order_counts (status, count) VALUES (NEW.status, 1)
+        ON CONFLICT(status) DO UPDATE SET count = count + 1;
+    END;
+  `);
 }
 
 function cleanExpiredRecords() {
@@ -187,6 +291,8 @@ function cleanExpiredRecords() {
   sqlite.exec(`DELETE FROM login_attempts WHERE attempted_at < datetime('now', '-1 day')`);
   sqlite.exec(`DELETE FROM password_reset_tokens WHERE expires_at < datetime('now')`);
   sqlite.exec(`DELETE FROM email_queue WHERE status IN ('sent', 'failed') AND created_at < datetime('now', '-30 days')`);
+  // Refresh planner statistics for tables whose size changed noticeably (cheap when nothing did)
+  sqlite.pragma('optimize');
 }
 
 export function getDatabase() {
@@ -203,4 +309,10 @@ export function getSqlite(): SqliteDatabase {
   return sqlite;
 }
 
+// On shutdown: closing the last connection checkpoints the WAL into the main
+// file and removes it, so the database is a single file once the app stops
+export function closeDatabase() {
+  if (sqlite?.open) sqlite.close();
+}
+
 export { schema };
@@ -42,6 +42,12 @@ export const deckRequests = sqliteTable('deck_requests', {
 export type DeckRequest = typeof deckRequests.$inferSelect;
 export type NewDeckRequest = typeof deckRequests.$inferInsert;
 
+// Orders per status, maintained by triggers on deck_requests (see db/index.ts)
+export const orderCounts = sqliteTable('order_counts', {
+  status: text('status').$type<RequestStatus>().primaryKey(),
+  count: integer('count').notNull().default(0),
+});
+
 // Deck line items table
 export const deckLineItems = sqliteTable('deck_line_items', {
   id: text('id').primaryKey(),
@@ -0,0 +1,149 @@
+import type { Database as SqliteDatabase, Statement } from 'better-sqlite3';
+import type { BetterSQLite3Database } from 'drizzle-orm/better-sqlite3';
+import { and, desc, eq, sql } from 'drizzle-orm';
+import { deckRequests, deckLineItems, users, orderCounts } from './schema.js';
+import type * as schema from './schema.js';
+
+// Hot-path queries, prepared once when the database is initialized instead of
+// rebuilding a drizzle query and re-preparing its SQL on every call. Their
+// timings carry a statement label with the registry name
+// (launchlist_sqlite_statement_duration_seconds in /api/metrics).
+
+// Line items per multi-row INSERT: 7 columns x 100 rows stays under
+// SQLITE_MAX_VARIABLE_NUMBER even on builds with the old 999 default
+export const LINE_ITEM_CHUNK = 100;
+const LINE_ITEM_COLUMNS = 7;
+
+export interface StatementStats {
+  calls: number;
+  seconds: number;
+}
+
+const stats = new Map<string, StatementStats>();
+
+// The registry statement being prepared, if any. Every statement is timed once,
+// by the prepare hook in db/index.ts, which reads this to name registry ones.
+let preparing: { name: string; stats: StatementStats } | null = null;
+
+export function registryStatement() {
+  return preparing;
+}
+
+// Prepare a statement under a registry name
+function named<T>(name: string, prepare: () => T): T {
+  const entry = stats.get(name) ?? { calls: 0, seconds: 0 };
+  stats.set(name, entry);
+  preparing = { name, stats: entry };
+  try {
+    return prepare();
+  } finally {
+    preparing = null;
+  }
+}
+
+// Staff order list, newest first: rows after a (created_at, id) cursor. Row-value
+// comparison lets SQLite range-scan idx_deck_requests_(status_)created_at.
+const afterCursor = sql`(${deckRequests.createdAt}, ${deckRequests.id}) < (${sql.placeholder('createdAt')}, ${sql.placeholder('id')})`;
+const newestFirst = [desc(deckRequests.createdAt), desc(deckRequests.id)];
+
+function buildStatements(db: BetterSQLite3Database<typeof schema>, sqlite: SqliteDatabase) {
+  return {
+    // getAllOrders: first page and the pages after a cursor, with and without a status filter
+    ordersFirstPage: named('ordersFirstPage', () => db.select().from(deckRequests)
+      .orderBy(...newestFirst).limit(sql.placeholder('limit')).prepare()),
+    ordersAfter: named('ordersAfter', () => db.select().from(deckRequests).where(afterCursor)
+      .orderBy(...newestFirst).limit(sql.placeholder('limit')).prepare()),
+    ordersByStatusFirstPage: named('ordersByStatusFirstPage', () => db.select().from(deckRequests)
+      .where(eq(deckRequests.status, sql.placeholder('status')))
+      .orderBy(...newestFirst).limit(sql.placeholder('limit')).prepare()),
+    ordersByStatusAfter: named('ordersByStatusAfter', () => db.select().from(deckRequests)
+      .where(and(eq(deckRequests.status, sql.placeholder('status')), afterCursor))
+      .orderBy(...newestFirst).limit(sql.placeholder('limit')).prepare()),
+    orderCounts: named('orderCounts', () => db.select().from(orderCounts).prepare()),
+
+    // orderService
+    orderById: named('orderById', () => db.select().from(deckRequests)
+      .where(eq(deckRequests.id, sql.placeholder('id'))).prepare()),
+    lineItemsByOrder: named('lineItemsByOrder', () => db.select().from(deckLineItems)
+      .where(eq(deckLineItems.deckRequestId, sql.placeholder('orderId'))).prepare()),
+    lineItemById: named('lineItemById', () => db.select().from(deckLineItems)
+      .where(eq(deckLineItems.id, sql.placeholder('id'))).prepare()),
+
+    // Fields passed as null keep their current value; a status change resets
+    // the matching alert flag. RETURNING saves the re-read.
+    updateOrder: named('updateOrder', () => db.update(deckRequests).set({
+      status: sql`coalesce(${sql.placeholder('status')}, ${deckRequests.status})`,
+      staffNotes: sql`coalesce(${sql.placeholder('staffNotes')}, ${deckRequests.staffNotes})`,
+      estimatedTotal: sql`coalesce(${sql.placeholder('estimatedTotal')}, ${deckRequests.estimatedTotal})`,
+      missingItems: sql`coalesce(${sql.placeholder('missingItems')}, ${deckRequests.missingItems})`,
+      staleAlertSent: sql`case when ${sql.placeholder('status')} = 'in_progress' then 0 else ${deckRequests.staleAlertSent} end`,
+      pickupAlertSent: sql`case when ${sql.placeholder('status')} = 'picked_up' then 0 else ${deckRequests.pickupAlertSent} end`,
+      updatedAt: sql`${sql.placeholder('updatedAt')}`,
+    }).where(eq(deckRequests.id, sql.placeholder('id'))).returning().prepare()),
+    updateLineItem: named('updateLineItem', () => db.update(deckLineItems).set({
+      quantityFound: sql`coalesce(${sql.placeholder('quantityFound')}, ${deckLineItems.quantityFound})`,
+      unitPrice: sql`coalesce(${sql.placeholder('unitPrice')}, ${deckLineItems.unitPrice})`,
+      conditionVariants: sql`coalesce(${sql.placeholder('conditionVariants')}, ${deckLineItems.conditionVariants})`,
+      cardName: sql`coalesce(${sql.placeholder('cardName')}, ${deckLineItems.cardName})`,
+    }).where(eq(deckLineItems.id, sql.placeholder('id'))).returning().prepare()),
+
+    // createOrder binds plain values; rows are built by the caller
+    insertOrder: named('insertOrder', () => sqlite.prepare(`
+      INSERT INTO deck_requests (id, order_number, customer_name, email, phone, notify_method, game, format,
+        pickup_window, notes, raw_decklist, status, created_at, updated_at)
+      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'submitted', ?, ?)
+    `)),
+
+    // requireAuth (behind the caches in services/authCache.ts): tokens revoked
+    // since the last read, by any process sharing the database, and users
+    revokedTokensAfter: named('revokedTokensAfter', () => sqlite.prepare(`
+      SELECT id, token, expires_at AS expiresAt FROM token_blacklist WHERE id > ? ORDER BY id
+    `)),
+    userById: named('userById', () => db.select({ id: users.id, email: users.email, role: users.role }).from(users)
+      .where(eq(users.id, sql.placeholder('id'))).prepare()),
+  };
+}
+
+export type Statements = ReturnType<typeof buildStatements>;
+
+let statements: Statements | null = null;
+let sqliteDb: SqliteDatabase | null = null;
+const insertLineItemStatements = new Map<number, Statement>();
+
+export function prepareStatements(db: BetterSQLite3Database<typeof schema>, sqlite: SqliteDatabase) {
+  sqliteDb = sqlite;
+  insertLineItemStatements.clear();
+  statements = buildStatements(db, sqlite);
+  insertLineItems(LINE_ITEM_CHUNK);
+}
+
+export function getStatements(): Statements {
+  if (!statements) {
+    throw new Error('Database not initialized. Call initializeDatabase() first.');
+  }
+  return statements;
+}
+
+// Multi-row line item INSERT for a chunk of rows: the full chunk is prepared at
+// startup, each remainder size the first time it is needed
+export function insertLineItems(rows: number): Statement {
+  let statement = insertLineItemStatements.get(rows);
+  if (!statement) {
+    const sqlite = sqliteDb;
+    if (!sqlite) {
+      throw new Error('Database not initialized. Call initializeDatabase() first.');
+    }
+    const values = new Array(rows).fill(`(${new Array(LINE_ITEM_COLUMNS).fill('?').join(', ')})`).join(', ');
+    statement = named('insertLineItems', () => sqlite.prepare(`
+      INSERT INTO deck_line_items (id, deck_request_id, quantity, card_name, parse_confidence, line_raw, created_at)
+      VALUES ${values}
+    `));
+    insertLineItemStatements.set(rows, statement);
+  }
+  return statement;
+}
+
+// Per-statement call counts and cumulative seconds since startup, for profiling
+export function getStatementStats(): Record<string, StatementStats> {
+  return Object.fromEntries([...stats].map(([name, entry]) => [name, { ...entry }]));
+}
@@ -1,9 +1,8 @@
 import { Request, Response, NextFunction } from 'express';
 import jwt from 'jsonwebtoken';
 import { config } from '../config.js';
-import { getDatabase } from '../db/index.js';
-import { users, tokenBlacklist, UserRole } from '../db/schema.js';
-import { eq } from 'drizzle-orm';
+import { UserRole } from '../db/schema.js';
+import { getAuthUser, isTokenRevoked } from '../services/authCache.js';
 import { createError } from './errorHandler.js';
 
 export interface AuthUser {
@@ -34,19 +33,13 @@ export function requireAuth(req: AuthRequest, res: Response, next: NextFunction)
   try {
     const payload = jwt.verify(token, config.jwtSecret) as JwtPayload;
 
-    // Check token blacklist
-    const db = getDatabase();
-    const blacklisted = db.select()
-      .from(tokenBlacklist)
-      .where(eq(tokenBlacklist.token, token))
-      .get();
-
-    if (blacklisted) {
+    // Check token blacklist (in memory, see services/authCache.ts)
+    if (isTokenRevoked(token)) {
       return next(createError('Token has been revoked', 401, 'TOKEN_REVOKED'));
     }
 
     // Verify user still exists
-    const user = db.select().from(users).where(eq(users.id, payload.userId)).get();
+    const user = getAuthUser(payload.userId);
 
     if (!user) {
       return next(createError('User not found', 401, 'USER_NOT_FOUND'));
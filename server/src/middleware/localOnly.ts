@@ -0,0 +1,56 @@
+import { Request, Response, NextFunction } from 'express';
+import fs from 'fs';
+import { BlockList, isIP } from 'net';
+import { config } from '../config.js';
+
+// The Docker gateway, when running in a container: connections to a published
+// port from the host itself (deploy.py, a local scraper) arrive from it
+function dockerGateway(): string | null {
+  if (!fs.existsSync('/.dockerenv')) return null;
+  try {
+    for (const line of fs.readFileSync('/proc/net/route', 'utf8').split('\n').slice(1)) {
+      const [, destination, gateway] = line.trim().split(/\s+/);
+      if (destination === '00000000' && gateway && gateway !== '00000000') {
+        // Little-endian hex, e.g. 010011AC is 172.17.0.1
+        return (gateway.match(/../g) ?? []).reverse().map((byte) => parseInt(byte, 16)).join('.');
+      }
+    }
+  } catch {
+    // No route table to read; only loopback and the configured addresses
+  }
+  return null;
+}
+
+function buildAllowList(): BlockList {
+  const allowed = new BlockList();
+  allowed.addSubnet('127.0.0.0', 8, 'ipv4');
+  allowed.addAddress('::1', 'ipv6');
+  const gateway = dockerGateway();
+  if (gateway) allowed.addAddress(gateway, 'ipv4');
+  for (const entry of config.opsAllowCidrs) {
+    const [address, prefix] = entry.split('/');
+    const family = isIP(address) === 6 ? 'ipv6' : 'ipv4';
+    if (prefix) allowed.addSubnet(address, parseInt(prefix, 10), family);
+    else allowed.addAddress(address, family);
+  }
+  return allowed;
+}
+
+const allowList = buildAllowList();
+
+function isAllowedAddress(address: string | undefined): boolean {
+  if (!address) return false;
+  const ip = address.startsWith('::ffff:') ? address.slice(7) : address;
+  const family = isIP(ip);
+  return family !== 0 && allowList.check(ip, family === 6 ? 'ipv6' : 'ipv4');
+}
+
+// Operational endpoints: only loopback, the Docker gateway (the host) and
+// OPS_ALLOW_CIDRS. Requests proxied by nginx carry X-Forwarded-For, so the
+// public never reaches these even though nginx itself connects from the host.
+export function localOnly(req: Request, res: Response, next: NextFunction) {
+  if (req.headers['x-forwarded-for'] || !isAllowedAddress(req.socket.remoteAddress)) {
+    return res.status(404).json({ error: 'Not found' });
+  }
+  next();
+}
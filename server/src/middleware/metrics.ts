@@ -0,0 +1,24 @@
+import { Request, Response, NextFunction } from 'express';
+import { Histogram, secondsSince } from '../utils/metrics.js';
+
+const httpRequestDuration = new Histogram(
+  'http_request_duration_seconds',
+  'HTTP request latency by method, route and status (the _count series is the request count)',
+);
+
+// Route templates keep the label set small: /api/orders/:id, never the id itself
+function routeLabel(req: Request): string {
+  if (req.route) return `${req.baseUrl}${req.route.path}`;
+  return req.originalUrl.startsWith('/api') ? 'unmatched' : 'static';
+}
+
+export function requestMetrics(req: Request, res: Response, next: NextFunction) {
+  const start = process.hrtime.bigint();
+  res.on('finish', () => {
+    httpRequestDuration.observe(
+      { method: req.method, route: routeLabel(req), status: String(res.statusCode) },
+      secondsSince(start),
+    );
+  });
+  next();
+}
@@ -1,112 +1,298 @@
 import { Request, Response, NextFunction } from 'express';
+import Database, { type Database as SqliteDatabase, type Statement } from 'better-sqlite3';
+import { config } from '../config.js';
+import { Counter, Gauge } from '../utils/metrics.js';
 
-interface RateLimitRecord {
-  count: number;
-  resetTime: number;
+const rejections = new Counter('launchlist_rate_limit_rejections_total', 'Requests refused with 429 by limiter');
+
+// Sliding-window counter: the previous fixed window's count is weighted by how
+// much of it still overlaps the sliding window, so a client cannot burst 2x
+// the limit across a window boundary. Two counters per client, not a log of
+// request timestamps.
+export interface WindowCounts {
+  windowStart: number;
+  previous: number;
+  current: number;
+}
+
+export interface RateLimitResult {
+  allowed: boolean;
+  retryAfterMs: number;
+}
+
+// Count a request against counts (updated in place) unless it is over the limit
+export function slide(counts: WindowCounts, now: number, windowMs: number, maxRequests: number): RateLimitResult {
+  const elapsedWindows = Math.floor((now - counts.windowStart) / windowMs);
+  if (elapsedWindows > 0) {
+    counts.previous = elapsedWindows === 1 ? counts.current : 0;
+    counts.current = 0;
+    counts.windowStart += elapsedWindows * windowMs;
+  }
+
+  const elapsed = now - counts.windowStart;
+  const weight = 1 - elapsed / windowMs;
+  if (counts.previous * weight + counts.current < maxRequests) {
+    counts.current++;
+    return { allowed: true, retryAfterMs: 0 };
+  }
+  return { allowed: false, retryAfterMs: retryAfter(counts, elapsed, windowMs, maxRequests) };
+}
+
+// Time until the weighted count drops below the limit again
+export function retryAfter(counts: WindowCounts, elapsed: number, windowMs: number, maxRequests: number): number {
+  if (counts.current < maxRequests) {
+    // smallest t with previous * (1 - (elapsed + t) / windowMs) + current < maxRequests
+    return Math.max(1, Math.floor(windowMs * (1 - (maxRequests - counts.current) / counts.previous) - elapsed) + 1);
+  }
+  // Once this window rolls over, its count becomes the decaying previous one
+  return windowMs - elapsed + Math.floor(windowMs * (1 - maxRequests / counts.current)) + 1;
 }
 
-// In-memory store for rate limiting
-const MAX_STORE_SIZE = 10_000;
-const rateLimitStore = new Map<string, RateLimitRecord>();
+export interface RateLimitStore {
+  readonly size: number;
+  hit(key: string, now?: number): RateLimitResult;
+}
 
-// Clean up expired entries every 5 minutes
-setInterval(() => {
-  const now = Date.now();
-  for (const [key, record] of rateLimitStore) {
-    if (record.resetTime < now) {
-      rateLimitStore.delete(key);
+interface ClientWindow extends WindowCounts {
+  key: string;
+  // Recency list, least recently seen first
+  older: ClientWindow | null;
+  newer: ClientWindow | null;
+}
+
+// Default clients tracked per limiter; beyond it the least recently seen
+// client is forgotten (and starts over with a fresh window)
+const MAX_CLIENTS = 10_000;
+
+// Single-process store
+export class SlidingWindowStore implements RateLimitStore {
+  // Lookup by key, recency by an intrusive doubly linked list: touch and
+  // evict are pointer swaps, and no timer has to sweep the Map. (Re-inserting
+  // into the Map to keep it in recency order leaves deleted slots at its
+  // front, which every eviction would then have to walk past.)
+  private clients = new Map<string, ClientWindow>();
+  private oldest: ClientWindow | null = null;
+  private newest: ClientWindow | null = null;
+
+  constructor(
+    readonly windowMs: number,
+    readonly maxRequests: number,
+    readonly maxClients = MAX_CLIENTS,
+  ) {}
+
+  get size(): number {
+    return this.clients.size;
+  }
+
+  hit(key: string, now = Date.now()): RateLimitResult {
+    let client = this.clients.get(key);
+    if (client) {
+      this.unlink(client);
+    } else {
+      this.evict(now);
+      client = { key, windowStart: now - (now % this.windowMs), previous: 0, current: 0, older: null, newer: null };
+      this.clients.set(key, client);
     }
+    this.append(client);
+    return slide(client, now, this.windowMs, this.maxRequests);
   }
-}, 5 * 60 * 1000);
-
-// Evict oldest entries if store exceeds max size
-function evictIfNeeded() {
-  if (rateLimitStore.size <= MAX_STORE_SIZE) return;
-  const entriesToRemove = rateLimitStore.size - MAX_STORE_SIZE + 1000;
-  let removed = 0;
-  for (const key of rateLimitStore.keys()) {
-    if (removed >= entriesToRemove) break;
-    rateLimitStore.delete(key);
-    removed++;
+
+  // Before adding a client, drop least recently seen ones while there is no
+  // room, or while they have been idle long enough that both windows expired
+  private evict(now: number) {
+    while (this.oldest && (this.clients.size >= this.maxClients || now - this.oldest.windowStart >= 2 * this.windowMs)) {
+      const client = this.oldest;
+      this.unlink(client);
+      this.clients.delete(client.key);
+    }
+  }
+
+  private unlink(client: ClientWindow) {
+    if (client.older) client.older.newer = client.newer;
+    else this.oldest = client.newer;
+    if (client.newer) client.newer.older = client.older;
+    else this.newest = client.older;
+    client.older = client.newer = null;
+  }
+
+  private append(client: ClientWindow) {
+    client.older = this.newest;
+    if (this.newest) this.newest.newer = client;
+    else this.oldest = client;
+    this.newest = client;
+  }
+}
+
+// Cluster mode: counters live in their own SQLite file, shared by every
+// worker, so a client's limit holds whichever worker serves it. They are
+// disposable, so the file skips fsync and stays out of the main database,
+// its WAL and its backups.
+let sharedDb: SqliteDatabase | null = null;
+
+function getSharedDatabase(): SqliteDatabase {
+  if (!sharedDb) {
+    sharedDb = new Database(config.cluster.rateLimitDatabasePath);
+    sharedDb.pragma('journal_mode = WAL');
+    sharedDb.pragma('synchronous = OFF');
+    sharedDb.exec(`
+      CREATE TABLE IF NOT EXISTS rate_limits (
+        limiter TEXT NOT NULL,
+        key TEXT NOT NULL,
+        window_start INTEGER NOT NULL,
+        previous INTEGER NOT NULL,
+        current INTEGER NOT NULL,
+        expires_at INTEGER NOT NULL,
+        PRIMARY KEY (limiter, key)
+      ) WITHOUT ROWID;
+      CREATE INDEX IF NOT EXISTS idx_rate_limits_expires ON rate_limits(expires_at);
+    `);
+    // Rows for clients idle for two windows no longer affect any decision
+    const prune = sharedDb.prepare('DELETE FROM rate_limits WHERE expires_at < ?');
+    setInterval(() => prune.run(Date.now()), 60 * 1000).unref();
+  }
+  return sharedDb;
+}
+
+export class SqliteWindowStore implements RateLimitStore {
+  private statements: { hit: (key: string, now: number) => RateLimitResult; count: Statement } | null = null;
+
+  // db defaults to the shared rate-limit database, opened on the first request
+  // (the data directory may not exist yet when limiters are created)
+  constructor(
+    readonly name: string,
+    readonly windowMs: number,
+    readonly maxRequests: number,
+    private readonly db?: SqliteDatabase,
+  ) {}
+
+  get size(): number {
+    return (this.prepare().count.get(this.name) as { n: number }).n;
+  }
+
+  hit(key: string, now = Date.now()): RateLimitResult {
+    return this.prepare().hit(key, now);
+  }
+
+  private prepare() {
+    if (this.statements) return this.statements;
+    const { name, windowMs, maxRequests } = this;
+    const db = this.db ?? getSharedDatabase();
+    const select = db.prepare(`
+      SELECT window_start AS windowStart, previous, current FROM rate_limits WHERE limiter = ? AND key = ?
+    `);
+    const upsert = db.prepare(`
+      INSERT INTO rate_limits (limiter, key, window_start, previous, current, expires_at) VALUES (?, ?, ?, ?, ?, ?)
+      ON CONFLICT(limiter, key) DO UPDATE SET window_start = excluded.window_start,
+        previous = excluded.previous, current = excluded.current, expires_at = excluded.expires_at
+    `);
+    // Read-modify-write under the write lock, so concurrent workers cannot
+    // both admit a client's last allowed request
+    const hit = db.transaction((key: string, now: number): RateLimitResult => {
+      const counts = (select.get(name, key) as WindowCounts | undefined)
+        ?? { windowStart: now - (now % windowMs), previous: 0, current: 0 };
+      const result = slide(counts, now, windowMs, maxRequests);
+      if (result.allowed) {
+        upsert.run(name, key, counts.windowStart, counts.previous, counts.current, counts.windowStart + 2 * windowMs);
+      }
+      return result;
+    });
+    this.statements = {
+      hit: hit.immediate,
+      count: db.prepare('SELECT COUNT(*) AS n FROM rate_limits WHERE limiter = ?'),
+    };
+    return this.statements;
   }
 }
 
+// Each limiter counts in its own store, so one IP's traffic on the general
+// limiter does not consume its login or order-submit allowance
+const stores = new Map<string, RateLimitStore>();
+
+// In cluster mode the stores are the shared SQLite table, the same in every worker
+new Gauge('launchlist_rate_limit_clients', 'Clients currently tracked by limiter', (gauge) => {
+  for (const [name, store] of stores) gauge.set({ limiter: name }, store.size);
+}, config.cluster.workers > 1);
+
 interface RateLimitOptions {
+  name: string; // metrics label; also separates this limiter's counters
   windowMs: number;
   maxRequests: number;
+  maxClients?: number;
   message?: string;
   keyGenerator?: (req: Request) => string;
 }
 
 export function createRateLimiter(options: RateLimitOptions) {
   const {
+    name,
     windowMs,
     maxRequests,
+    maxClients,
     message = 'Too many requests, please try again later',
     keyGenerator = (req: Request) => req.ip || req.socket.remoteAddress || 'unknown',
   } = options;
 
+  if (stores.has(name)) {
+    throw new Error(`Rate limiter "${name}" already exists`);
+  }
+  const store = config.cluster.workers > 1
+    ? new SqliteWindowStore(name, windowMs, maxRequests)
+    : new SlidingWindowStore(windowMs, maxRequests, maxClients);
+  stores.set(name, store);
+
   return (req: Request, res: Response, next: NextFunction) => {
-    const key = keyGenerator(req);
-    const now = Date.now();
-
-    let record = rateLimitStore.get(key);
-
-    if (!record || record.resetTime < now) {
-      record = {
-        count: 1,
-        resetTime: now + windowMs,
-      };
-      rateLimitStore.set(key, record);
-      evictIfNeeded();
+    const { allowed, retryAfterMs } = store.hit(keyGenerator(req));
+    if (allowed) {
       return next();
     }
 
-    record.count++;
-
-    if (record.count > maxRequests) {
-      res.setHeader('Retry-After', Math.ceil((record.resetTime - now) / 1000));
-      return res.status(429).json({
-        error: message,
-        retryAfter: Math.ceil((record.resetTime - now) / 1000),
-      });
-    }
-
-    next();
+    rejections.inc({ limiter: name });
+    const retryAfter = Math.ceil(retryAfterMs / 1000);
+    res.setHeader('Retry-After', retryAfter);
+    return res.status(429).json({
+      error: message,
+      retryAfter,
+    });
   };
 }
 
 // Pre-configured rate limiters
 export const generalRateLimiter = createRateLimiter({
+  name: 'general',
   windowMs: 60 * 1000, // 1 minute
   maxRequests: 100, // 100 requests per minute
 });
 
 export const authRateLimiter = createRateLimiter({
+  name: 'auth',
   windowMs: 15 * 60 * 1000, // 15 minutes
   maxRequests: 10, // 10 attempts per 15 minutes
   message: 'Too many login attempts, please try again later',
 });
 
 export const orderSubmitRateLimiter = createRateLimiter({
+  name: 'order_submit',
   windowMs: 60 * 60 * 1000, // 1 hour
   maxRequests: 20, // 20 orders per hour per IP
   message: 'Too many order submissions, please try again later',
 });
 
 export const notificationRateLimiter = createRateLimiter({
+  name: 'notification',
   windowMs: 60 * 1000, // 1 minute
   maxRequests: 5, // 5 notifications per minute
   message: 'Too many notification requests, please wait',
 });
 
 export const passwordResetRateLimiter = createRateLimiter({
+  name: 'password_reset',
   windowMs: 15 * 60 * 1000, // 15 minutes
   maxRequests: 3, // 3 reset requests per 15 minutes
   message: 'Too many password reset requests, please try again later',
 });
 
 export const proxyRateLimiter = createRateLimiter({
+  name: 'proxy',
   windowMs: 60 * 1000,
   maxRequests: 30,
   message: 'Too many card search requests',
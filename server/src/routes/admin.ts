@@ -7,6 +7,7 @@ import { getDatabase, getSqlite } from '../db/index.js';
 import { users } from '../db/schema.js';
 import { requireAuth, requireAdmin, AuthRequest } from '../middleware/auth.js';
 import { logAudit } from '../services/auditService.js';
+import { invalidateUser } from '../services/authCache.js';
 import { sendWelcomeEmail } from '../services/staffEmailService.js';
 import { config } from '../config.js';
 
@@ -115,6 +116,7 @@ router.delete('/users/:id', (req: AuthRequest, res, next) => {
     }
 
     db.delete(users).where(eq(users.id, userId)).run();
+    invalidateUser(userId);
 
     // Clean up password reset tokens for deleted user
     getSqlite().prepare('DELETE FROM password_reset_tokens WHERE user_id = ?').run(userId);
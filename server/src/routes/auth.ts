@@ -6,11 +6,12 @@ import { z } from 'zod';
 import { eq } from 'drizzle-orm';
 import { config } from '../config.js';
 import { getDatabase, getSqlite } from '../db/index.js';
-import { users, tokenBlacklist } from '../db/schema.js';
+import { users } from '../db/schema.js';
 import { requireAuth, AuthRequest } from '../middleware/auth.js';
 import { createError } from '../middleware/errorHandler.js';
 import { authRateLimiter, passwordResetRateLimiter } from '../middleware/rateLimiter.js';
 import { logAudit } from '../services/auditService.js';
+import { revokeToken } from '../services/authCache.js';
 import { sendPasswordResetEmail } from '../services/staffEmailService.js';
 
 const router = Router();
@@ -115,15 +116,12 @@ router.post('/login', authRateLimiter, async (req, res, next) => {
 router.post('/logout', requireAuth, (req: AuthRequest, res) => {
   const token = req.headers.authorization?.replace('Bearer ', '');
   if (token) {
-    const db = getDatabase();
     const decoded = jwt.decode(token) as { exp?: number };
     const expiresAt = decoded?.exp
       ? new Date(decoded.exp * 1000).toISOString()
       : new Date(Date.now() + 7 * 24 * 60 * 60 * 1000).toISOString();
 
-    db.insert(tokenBlacklist)
-      .values({ token, expiresAt })
-      .run();
+    revokeToken(token, expiresAt);
   }
   logAudit(req, { action: 'auth.logout', entityType: 'user', entityId: req.user!.id });
   res.json({ message: 'Logged out' });
@@ -0,0 +1,33 @@
+import { Router } from 'express';
+import { config } from '../config.js';
+
+const router = Router();
+
+// Store settings the frontend reads at startup (see src/lib/config.ts), keyed
+// like the VITE_* variables without the prefix. Serving them at runtime means
+// changing LaunchList.env only needs a container restart, not an image rebuild.
+const clientConfig: Record<string, string | undefined> = {
+  STORE_NAME: config.store.name,
+  STORE_EMAIL: config.store.email,
+  STORE_PHONE: config.store.phone,
+  STORE_ADDRESS: config.store.address,
+  ORDER_PREFIX: config.orderPrefix,
+  ORDER_HOLD_DAYS: String(config.orderHoldDays),
+  MAX_FILE_SIZE_MB: String(config.limits.maxFileSizeMB),
+  MAX_DECKLIST_CARDS: String(config.limits.maxDecklistCards),
+  SCRYFALL_RATE_LIMIT_MS: String(config.clientApi.scryfallRateLimitMs),
+  POKEMON_RATE_LIMIT_MS: String(config.clientApi.pokemonRateLimitMs),
+  AUTOCOMPLETE_DEBOUNCE_MS: String(config.clientApi.autocompleteDebounceMs),
+};
+
+// Escape '<' so a value can never close the surrounding <script>
+const script = `window.__LAUNCHLIST_CONFIG__ = ${JSON.stringify(clientConfig).replace(/</g, '\\u003c')};\n`;
+
+// GET /config.js - Runtime store configuration for the frontend
+router.get('/config.js', (_req, res) => {
+  res.type('application/javascript');
+  res.setHeader('Cache-Control', 'no-cache');
+  res.send(script);
+});
+
+export default router;
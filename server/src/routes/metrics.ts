@@ -0,0 +1,46 @@
+import { Router } from 'express';
+import { getSqlite } from '../db/index.js';
+import { localOnly } from '../middleware/localOnly.js';
+import { answerMetricsRequests, collectWorkerMetrics } from '../cluster.js';
+import { Gauge, mergeMetrics, renderMetrics, snapshotMetrics } from '../utils/metrics.js';
+
+const router = Router();
+
+interface QueueRow {
+  status: string;
+  depth: number;
+  oldest_age: number;
+}
+
+// Backlog of the email queue, read when scraped
+new Gauge('launchlist_email_queue_depth', 'Queued emails by status', (gauge) => {
+  for (const row of queueRows()) gauge.set({ status: row.status }, row.depth);
+}, true);
+new Gauge('launchlist_email_queue_oldest_age_seconds', 'Age of the oldest queued email by status', (gauge) => {
+  for (const row of queueRows()) gauge.set({ status: row.status }, row.oldest_age);
+}, true);
+
+function queueRows(): QueueRow[] {
+  return getSqlite().prepare(`
+    SELECT status, COUNT(*) AS depth,
+           ROUND((julianday('now') - julianday(MIN(created_at))) * 86400) AS oldest_age
+    FROM email_queue WHERE status IN ('pending', 'failed') GROUP BY status
+  `).all() as QueueRow[];
+}
+
+answerMetricsRequests(snapshotMetrics);
+
+// GET /api/metrics - Prometheus text exposition, for local scrapers only. In
+// cluster mode it covers every worker, whichever one answers the scrape.
+router.get('/api/metrics', localOnly, async (_req, res, next) => {
+  try {
+    const workers = await collectWorkerMetrics();
+    res.type('text/plain; version=0.0.4');
+    res.setHeader('Cache-Control', 'no-store');
+    res.send(renderMetrics(workers ? mergeMetrics(workers) : undefined));
+  } catch (error) {
+    next(error);
+  }
+});
+
+export default router;
@@ -6,8 +6,9 @@ import { gameTypes } from '../db/schema.js';
 import { orderSubmitRateLimiter, createRateLimiter } from '../middleware/rateLimiter.js';
 import { validateCsrf } from '../middleware/csrf.js';
 import { enqueueEmail } from '../services/emailQueueService.js';
+import { config } from '../config.js';
 
-const lookupRateLimiter = createRateLimiter({ windowMs: 15 * 60 * 1000, maxRequests: 20, message: 'Too many lookup attempts' });
+const lookupRateLimiter = createRateLimiter({ name: 'order_lookup', windowMs: 15 * 60 * 1000, maxRequests: 20, message: 'Too many lookup attempts' });
 
 const router = Router();
 
@@ -31,7 +32,7 @@ const submitOrderSchema = z.object({
   pickupWindow: z.string().trim().max(200).optional(),
   notes: z.string().trim().max(1000).optional(),
   rawDecklist: z.string().trim().min(1).max(50000),
-  lineItems: z.array(lineItemSchema).min(1).max(500),
+  lineItems: z.array(lineItemSchema).min(1).max(config.limits.maxDecklistCards),
 });
 
 // POST /api/orders - Submit a new order (rate limited per IP)
@@ -0,0 +1,100 @@
+import { Router } from 'express';
+import fs from 'fs';
+import { config } from '../config.js';
+import { getSqlite } from '../db/index.js';
+import { localOnly } from '../middleware/localOnly.js';
+import { getEmailProcessorStatus } from '../services/emailQueueService.js';
+import { getSchedulerStatus } from '../services/schedulerService.js';
+import { getLeaderStatus } from '../services/leaderService.js';
+
+const router = Router();
+
+// A pass of the email processor taking longer than this is considered stuck
+const MAX_EMAIL_PASS_MS = 5 * 60 * 1000;
+
+interface QueueRow {
+  pending: number;
+  oldest_age: number | null;
+}
+
+function walBytes(): number {
+  try {
+    return fs.statSync(`${config.databasePath}-wal`).size;
+  } catch {
+    return 0;
+  }
+}
+
+// GET /api/ready - Readiness: database, email queue and scheduler health.
+// 503 with reasons when degraded; deploy.py waits for this before cutting over.
+// The email processor and scheduler are only checked in the process holding
+// the job leader lease; elsewhere it is enough that some process holds it.
+router.get('/api/ready', localOnly, (_req, res) => {
+  const now = Date.now();
+  const reasons: string[] = [];
+  const checks: Record<string, unknown> = {};
+
+  try {
+    const sqlite = getSqlite();
+    const start = process.hrtime.bigint();
+    sqlite.prepare('SELECT id FROM deck_requests LIMIT 1').get();
+    const readMs = Number(process.hrtime.bigint() - start) / 1e6;
+    const wal = walBytes();
+    checks.database = { readMs: Math.round(readMs * 100) / 100, walBytes: wal };
+    if (readMs > config.readiness.maxDbReadMs) {
+      reasons.push(`database read took ${readMs.toFixed(0)} ms (limit ${config.readiness.maxDbReadMs} ms)`);
+    }
+    if (wal > config.readiness.maxWalMb * 1024 * 1024) {
+      reasons.push(`WAL is ${(wal / 1024 / 1024).toFixed(0)} MB (limit ${config.readiness.maxWalMb} MB)`);
+    }
+
+    const queue = sqlite.prepare(`
+      SELECT COUNT(*) AS pending,
+             ROUND((julianday('now') - julianday(MIN(created_at))) * 86400) AS oldest_age
+      FROM email_queue WHERE status = 'pending'
+    `).get() as QueueRow;
+    const leader = getLeaderStatus();
+    checks.leader = {
+      isLeader: leader.isLeader,
+      holder: leader.holder,
+      expiresInSeconds: leader.expiresInMs === null ? null : Math.round(leader.expiresInMs / 1000),
+    };
+    const email = getEmailProcessorStatus();
+    checks.emailQueue = {
+      pending: queue.pending,
+      oldestPendingSeconds: queue.oldest_age,
+      lastRunSecondsAgo: email.started ? Math.round((now - email.lastRunAt) / 1000) : null,
+    };
+    if (!leader.isLeader) {
+      if (leader.expiresInMs === null || leader.expiresInMs < 0) {
+        reasons.push('no process holds the job leader lease');
+      }
+    } else if (!email.started) {
+      reasons.push('email processor not started');
+    } else if (email.processingSince && now - email.processingSince > MAX_EMAIL_PASS_MS) {
+      reasons.push(`email processor stuck for ${Math.round((now - email.processingSince) / 1000)} s`);
+    } else if (now - email.lastRunAt > 3 * email.intervalMs) {
+      reasons.push(`email processor has not run for ${Math.round((now - email.lastRunAt) / 1000)} s`);
+    }
+  } catch (err: unknown) {
+    reasons.push(`database unavailable: ${err instanceof Error ? err.message : String(err)}`);
+  }
+
+  const scheduler = getSchedulerStatus();
+  checks.scheduler = scheduler
+    ? { lastTickSecondsAgo: Math.round((now - scheduler.lastTickAt) / 1000) }
+    : { running: false, reason: config.discord.webhookUrl ? 'not the job leader' : 'no Discord webhook' };
+  if (scheduler && now - scheduler.lastTickAt > 3 * scheduler.intervalMs) {
+    reasons.push(`scheduler has not ticked for ${Math.round((now - scheduler.lastTickAt) / 1000)} s`);
+  }
+
+  res.setHeader('Cache-Control', 'no-store');
+  res.status(reasons.length ? 503 : 200).json({
+    status: reasons.length ? 'degraded' : 'ready',
+    reasons,
+    checks,
+    timestamp: new Date().toISOString(),
+  });
+});
+
+export default router;
@@ -23,15 +23,17 @@ router.use(requireStaff);
 
 const listOrdersSchema = z.object({
   limit: z.coerce.number().int().min(1).max(100).optional(),
+  cursor: z.string().max(200).optional(),
   offset: z.coerce.number().int().min(0).optional(),
   status: z.enum(requestStatuses).optional(),
 });
 
-// GET /api/staff/orders - List orders with pagination
+// GET /api/staff/orders - List orders, newest first. Pass the previous page's
+// nextCursor as ?cursor= for the next page; ?offset= is still accepted.
 router.get('/orders', (req, res, next) => {
   try {
-    const { limit, offset, status } = listOrdersSchema.parse(req.query);
-    const result = getAllOrders({ limit, offset, status });
+    const { limit, cursor, offset, status } = listOrdersSchema.parse(req.query);
+    const result = getAllOrders({ limit, cursor, offset, status });
     res.json(result);
   } catch (err) {
     next(err);
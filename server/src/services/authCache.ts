@@ -0,0 +1,111 @@
+import { getDatabase } from '../db/index.js';
+import { tokenBlacklist } from '../db/schema.js';
+import { getStatements } from '../db/statements.js';
+import type { AuthUser } from '../middleware/auth.js';
+import { broadcast, onBroadcast } from '../cluster.js';
+
+// requireAuth runs on every staff request (the dashboard polls), so the
+// revoked-token check and the user lookup are served from memory. Revoked
+// tokens live in a Map loaded at startup and updated on logout; verified
+// users in a bounded LRU, dropped when an admin deletes the user. In cluster
+// mode both changes are relayed to the other workers' caches. A process that
+// shares the database but not those messages (the other container during a
+// blue/green deploy) revokes tokens through token_blacklist, which is read
+// again for new rows at most every BLACKLIST_REFRESH_MS.
+
+const USER_CACHE_SIZE = 1000;
+// Bounds staleness for changes made outside the app (seed script, sqlite3 CLI)
+const USER_CACHE_TTL_MS = 60 * 1000;
+// How long a token revoked by another container can still be accepted here
+const BLACKLIST_REFRESH_MS = 1000;
+
+interface CachedUser {
+  user: AuthUser;
+  cachedAt: number;
+}
+
+// Map iteration order is insertion order: re-inserting on a hit keeps the
+// least recently used entry first, so get, set and evict are all O(1)
+const userCache = new Map<string, CachedUser>();
+
+// token -> expiry (ms); exact, so no false positives to fall back on SQLite for
+let revokedTokens: Map<string, number> | null = null;
+// Highest token_blacklist id read so far (AUTOINCREMENT, so never reused) and
+// when the table was last read
+let lastRevocationId = 0;
+let blacklistReadAt = 0;
+
+// Add the rows written since the last read, by this or any other process
+function readRevocations(now: number) {
+  const rows = getStatements().revokedTokensAfter.all(lastRevocationId) as
+    { id: number; token: string; expiresAt: string }[];
+  for (const row of rows) {
+    revokedTokens!.set(row.token, Date.parse(row.expiresAt));
+    lastRevocationId = row.id;
+  }
+  blacklistReadAt = now;
+}
+
+export function loadTokenBlacklist(now = Date.now()) {
+  revokedTokens = new Map();
+  lastRevocationId = 0;
+  readRevocations(now);
+}
+
+export function isTokenRevoked(token: string, now = Date.now()): boolean {
+  if (!revokedTokens) loadTokenBlacklist(now);
+  else if (now - blacklistReadAt >= BLACKLIST_REFRESH_MS) readRevocations(now);
+  return revokedTokens!.has(token);
+}
+
+export function revokeToken(token: string, expiresAt: string) {
+  getDatabase().insert(tokenBlacklist).values({ token, expiresAt }).run();
+  if (!revokedTokens) loadTokenBlacklist();
+  revokedTokens!.set(token, Date.parse(expiresAt));
+  broadcast({ type: 'token-revoked', token, expiresAt: Date.parse(expiresAt) });
+}
+
+export function getAuthUser(userId: string): AuthUser | undefined {
+  const now = Date.now();
+  const cached = userCache.get(userId);
+  if (cached) {
+    userCache.delete(userId);
+    if (now - cached.cachedAt < USER_CACHE_TTL_MS) {
+      userCache.set(userId, cached);
+      return cached.user;
+    }
+  }
+
+  const user = getStatements().userById.get({ id: userId });
+  if (!user) return undefined;
+
+  userCache.set(userId, { user, cachedAt: now });
+  if (userCache.size > USER_CACHE_SIZE) {
+    userCache.delete(userCache.keys().next().value!);
+  }
+  return user;
+}
+
+// Call whenever a user is deleted or their email or role changes
+export function invalidateUser(userId: string) {
+  userCache.delete(userId);
+  broadcast({ type: 'user-invalidated', userId });
+}
+
+onBroadcast('token-revoked', ({ token, expiresAt }) => {
+  // Not loaded yet means the row will be read from SQLite when it is
+  revokedTokens?.set(token, expiresAt);
+});
+
+onBroadcast('user-invalidated', ({ userId }) => {
+  userCache.delete(userId);
+});
+
+// Expired tokens fail jwt.verify before the blacklist is consulted; drop them hourly
+setInterval(() => {
+  if (!revokedTokens) return;
+  const now = Date.now();
+  for (const [token, expiresAt] of revokedTokens) {
+    if (expiresAt < now) revokedTokens.delete(token);
+  }
+}, 60 * 60 * 1000).unref();
@@ -5,8 +5,18 @@ import { sendConfirmationEmail, sendReadyEmail } from './emailService.js';
 import { getOrderWithItems } from './orderService.js';
 
 const MAX_ATTEMPTS = 3;
+const PROCESS_INTERVAL_MS = 30_000;
 
 let processing = false;
+let startedAt = 0;
+let lastRunAt = 0;
+let processingSince = 0;
+let timer: NodeJS.Timeout | null = null;
+
+// For /api/ready: when the processor last ran, and since when the current pass has been running
+export function getEmailProcessorStatus() {
+  return { started: startedAt > 0, lastRunAt: lastRunAt || startedAt, processingSince, intervalMs: PROCESS_INTERVAL_MS };
+}
 
 export function enqueueEmail(orderId: string, recipient: string, template: 'confirmation' | 'ready') {
   const db = getDatabase();
@@ -16,6 +26,7 @@ export function enqueueEmail(orderId: string, recipient: string, template: 'conf
 export async function processEmailQueue() {
   if (processing) return;
   processing = true;
+  lastRunAt = processingSince = Date.now();
 
   try {
     const db = getDatabase();
@@ -28,6 +39,7 @@ export async function processEmailQueue() {
     }
   } finally {
     processing = false;
+    processingSince = 0;
   }
 }
 
@@ -73,5 +85,15 @@ export function cleanupOldEmails() {
 }
 
 export function startEmailProcessor() {
-  setInterval(processEmailQueue, 30_000); // Every 30 seconds
+  if (timer) return;
+  startedAt = Date.now();
+  lastRunAt = 0;
+  timer = setInterval(processEmailQueue, PROCESS_INTERVAL_MS);
+}
+
+// When this process stops being the job leader; a pass in flight finishes
+export function stopEmailProcessor() {
+  if (timer) clearInterval(timer);
+  timer = null;
+  startedAt = 0;
 }
@@ -0,0 +1,82 @@
+import os from 'os';
+import { getSqlite } from '../db/index.js';
+
+// Background jobs must run in exactly one process, even with several cluster
+// workers or, during a blue/green deploy, two containers on one database.
+// Every process competes for a lease row in leader_lease; the holder renews it
+// well before it expires, and a process that cannot renew stops its jobs.
+
+const LEASE_NAME = 'jobs';
+const LEASE_MS = 30_000;
+const RENEW_INTERVAL_MS = 10_000;
+
+const holder = `${os.hostname()}:${process.pid}`;
+let leader = false;
+let renewTimer: NodeJS.Timeout | null = null;
+
+interface LeaseRow {
+  holder: string;
+  expiresAt: number;
+}
+
+// Take the lease if it is free or expired, or extend it if we hold it
+function tryAcquire(now: number): boolean {
+  const result = getSqlite().prepare(`
+    INSERT INTO leader_lease (name, holder, expires_at) VALUES (?, ?, ?)
+    ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+    WHERE leader_lease.holder = excluded.holder OR leader_lease.expires_at < ?
+  `).run(LEASE_NAME, holder, now + LEASE_MS, now);
+  return result.changes === 1;
+}
+
+export function startLeaderElection(onElected: () => void, onDeposed: () => void) {
+  const campaign = () => {
+    let acquired = false;
+    try {
+      acquired = tryAcquire(Date.now());
+    } catch (err) {
+      console.error('Leader lease renewal failed:', err);
+    }
+    if (acquired && !leader) {
+      leader = true;
+      console.log(`Process ${holder} is the job leader`);
+      onElected();
+    } else if (!acquired && leader) {
+      leader = false;
+      console.warn(`Process ${holder} lost the job leader lease`);
+      onDeposed();
+    }
+  };
+
+  campaign();
+  renewTimer = setInterval(campaign, RENEW_INTERVAL_MS);
+}
+
+// On shutdown: hand the lease over now instead of when it expires
+export function releaseLeadership() {
+  if (renewTimer) clearInterval(renewTimer);
+  renewTimer = null;
+  if (!leader) return;
+  leader = false;
+  try {
+    getSqlite().prepare('DELETE FROM leader_lease WHERE name = ? AND holder = ?').run(LEASE_NAME, holder);
+  } catch (err) {
+    console.error('Failed to release leader lease:', err);
+  }
+}
+
+export function isLeader(): boolean {
+  return leader;
+}
+
+// For /api/ready: who holds the lease, and for how much longer
+export function getLeaderStatus() {
+  const row = getSqlite().prepare(
+    'SELECT holder, expires_at AS expiresAt FROM leader_lease WHERE name = ?'
+  ).get(LEASE_NAME) as LeaseRow | undefined;
+  return {
+    isLeader: leader,
+    holder: row?.holder ?? null,
+    expiresInMs: row ? row.expiresAt - Date.now() : null,
+  };
+}
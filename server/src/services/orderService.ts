@@ -1,10 +1,10 @@
-import { v4 as uuidv4 } from 'uuid';
 import crypto from 'crypto';
 import { eq, and, desc } from 'drizzle-orm';
 import { getDatabase, getSqlite } from '../db/index.js';
-import { deckRequests, deckLineItems, DeckRequest, DeckLineItem, NewDeckRequest, NewDeckLineItem, GameType, RequestStatus, NotifyMethod } from '../db/schema.js';
-import * as schema from '../db/schema.js';
+import { getStatements, insertLineItems, LINE_ITEM_CHUNK } from '../db/statements.js';
+import { deckRequests, deckLineItems, DeckRequest, DeckLineItem, GameType, RequestStatus, NotifyMethod } from '../db/schema.js';
 import { config } from '../config.js';
+import { createError } from '../middleware/errorHandler.js';
 
 const VALID_TRANSITIONS: Record<string, string[]> = {
   submitted: ['in_progress', 'cancelled'],
@@ -49,57 +49,67 @@ function generateOrderNumber(): string {
 }
 
 export async function createOrder(input: CreateOrderInput): Promise<{ order: DeckRequest; lineItems: DeckLineItem[] }> {
-  const db = getDatabase();
   const sqliteDb = getSqlite();
+  const { insertOrder } = getStatements();
 
   const MAX_RETRIES = 3;
   for (let attempt = 0; attempt < MAX_RETRIES; attempt++) {
     try {
       const now = new Date().toISOString();
-      const orderId = uuidv4();
       const orderNumber = generateOrderNumber();
 
-      const result = sqliteDb.transaction(() => {
-        // Insert order
-        db.insert(deckRequests).values({
-          id: orderId,
-          orderNumber,
-          customerName: input.customerName,
-          email: input.email.toLowerCase(),
-          phone: input.phone,
-          notifyMethod: input.notifyMethod,
-          game: input.game,
-          format: input.format,
-          pickupWindow: input.pickupWindow,
-          notes: input.notes,
-          rawDecklist: input.rawDecklist,
-          status: 'submitted',
-          createdAt: now,
-          updatedAt: now,
-        }).run();
-
-        // Insert line items
-        for (const item of input.lineItems) {
-          const itemId = uuidv4();
-          db.insert(deckLineItems).values({
-            id: itemId,
-            deckRequestId: orderId,
-            quantity: item.quantity,
-            cardName: item.cardName,
-            parseConfidence: item.parseConfidence,
-            lineRaw: item.lineRaw,
-            createdAt: now,
-          }).run();
+      // Build the rows up front so the write transaction only binds and steps
+      const order: DeckRequest = {
+        id: crypto.randomUUID(),
+        orderNumber,
+        customerName: input.customerName,
+        email: input.email.toLowerCase(),
+        phone: input.phone ?? null,
+        notifyMethod: input.notifyMethod ?? null,
+        game: input.game,
+        format: input.format ?? null,
+        pickupWindow: input.pickupWindow ?? null,
+        notes: input.notes ?? null,
+        rawDecklist: input.rawDecklist,
+        status: 'submitted',
+        staffNotes: null,
+        estimatedTotal: null,
+        missingItems: null,
+        staleAlertSent: false,
+        pickupAlertSent: false,
+        createdAt: now,
+        updatedAt: now,
+      };
+      const lineItems: DeckLineItem[] = input.lineItems.map((item) => ({
+        id: crypto.randomUUID(),
+        deckRequestId: order.id,
+        quantity: item.quantity,
+        cardName: item.cardName,
+        parseConfidence: item.parseConfidence ?? null,
+        lineRaw: item.lineRaw,
+        quantityFound: null,
+        unitPrice: null,
+        conditionVariants: null,
+        createdAt: now,
+      }));
+
+      sqliteDb.transaction(() => {
+        insertOrder.run(
+          order.id, order.orderNumber, order.customerName, order.email, order.phone, order.notifyMethod,
+          order.game, order.format, order.pickupWindow, order.notes, order.rawDecklist, now, now,
+        );
+
+        for (let start = 0; start < lineItems.length; start += LINE_ITEM_CHUNK) {
+          const chunk = lineItems.slice(start, start + LINE_ITEM_CHUNK);
+          const params: unknown[] = [];
+          for (const item of chunk) {
+            params.push(item.id, item.deckRequestId, item.quantity, item.cardName, item.parseConfidence, item.lineRaw, now);
+          }
+          insertLineItems(chunk.length).run(params);
         }
-
-        // Fetch the created order and items within transaction
-        const order = db.select().from(deckRequests).where(eq(deckRequests.id, orderId)).get()!;
-        const items = db.select().from(deckLineItems).where(eq(deckLineItems.deckRequestId, orderId)).all();
-
-        return { order, lineItems: items };
       })();
 
-      return result;
+      return { order, lineItems };
     } catch (err: unknown) {
       const message = err instanceof Error ? err.message : String(err);
       if (message.includes('UNIQUE constraint') && attempt < MAX_RETRIES - 1) {
@@ -125,22 +135,20 @@ export function getOrderByNumberAndEmail(orderNumber: string, email: string): De
 }
 
 export function getOrderLineItems(orderId: string, email: string): DeckLineItem[] {
-  const db = getDatabase();
+  const statements = getStatements();
 
   // Verify order exists and email matches
-  const order = db.select().from(deckRequests).where(eq(deckRequests.id, orderId)).get();
+  const order = statements.orderById.get({ id: orderId });
   if (!order || order.email.toLowerCase() !== email.toLowerCase()) {
     return [];
   }
 
-  return db.select()
-    .from(deckLineItems)
-    .where(eq(deckLineItems.deckRequestId, orderId))
-    .all();
+  return statements.lineItemsByOrder.all({ orderId });
 }
 
 interface GetOrdersOptions {
   limit?: number;
+  cursor?: string;
   offset?: number;
   status?: RequestStatus;
 }
@@ -149,48 +157,67 @@ interface PaginatedOrders {
   orders: DeckRequest[];
   total: number;
   limit: number;
-  offset: number;
+  nextCursor: string | null;
+  offset?: number;
+}
+
+// Opaque keyset cursor: the (created_at, id) of the last order on a page
+export function encodeOrderCursor(order: Pick<DeckRequest, 'createdAt' | 'id'>): string {
+  return Buffer.from(`${order.createdAt}|${order.id}`).toString('base64url');
+}
+
+export function decodeOrderCursor(cursor: string): { createdAt: string; id: string } | undefined {
+  const [createdAt, id, ...rest] = Buffer.from(cursor, 'base64url').toString().split('|');
+  return createdAt && id && rest.length === 0 ? { createdAt, id } : undefined;
 }
 
 export function getAllOrders(options: GetOrdersOptions = {}): PaginatedOrders {
-  const sqliteDb = getSqlite();
-  const db = getDatabase();
-  const { limit = 50, offset = 0, status } = options;
-
-  // Efficient count using raw SQL instead of fetching all rows
-  const countRow = status
-    ? sqliteDb.prepare('SELECT COUNT(*) as total FROM deck_requests WHERE status = ?').get(status) as { total: number }
-    : sqliteDb.prepare('SELECT COUNT(*) as total FROM deck_requests').get() as { total: number };
-  const total = countRow.total;
-
-  // Get paginated results
-  const orders = status
-    ? db.select().from(deckRequests)
-        .where(eq(deckRequests.status, status))
-        .orderBy(desc(deckRequests.createdAt))
-        .limit(limit)
-        .offset(offset)
-        .all()
-    : db.select().from(deckRequests)
-        .orderBy(desc(deckRequests.createdAt))
-        .limit(limit)
-        .offset(offset)
-        .all();
-
-  return { orders, total, limit, offset };
+  const statements = getStatements();
+  const { limit = 50, cursor, offset, status } = options;
+
+  // Totals from the trigger-maintained order_counts table instead of a COUNT(*) scan
+  const counts = statements.orderCounts.all();
+  const total = counts.reduce((sum, row) => (!status || row.status === status ? sum + row.count : sum), 0);
+
+  // Legacy offset paging still works (walks the index, so cost grows with offset)
+  if (offset !== undefined && cursor === undefined) {
+    const db = getDatabase();
+    const orders = db.select().from(deckRequests)
+      .where(status ? eq(deckRequests.status, status) : undefined)
+      .orderBy(desc(deckRequests.createdAt), desc(deckRequests.id))
+      .limit(limit)
+      .offset(offset)
+      .all();
+    const nextCursor = orders.length === limit && offset + limit < total ? encodeOrderCursor(orders[limit - 1]) : null;
+    return { orders, total, limit, nextCursor, offset };
+  }
+
+  const after = cursor !== undefined ? decodeOrderCursor(cursor) : undefined;
+  if (cursor !== undefined && !after) {
+    throw createError('Invalid cursor', 400, 'INVALID_CURSOR');
+  }
+
+  // One extra row tells whether another page follows
+  const params = { limit: limit + 1, status, ...after };
+  const rows = status
+    ? (after ? statements.ordersByStatusAfter : statements.ordersByStatusFirstPage).all(params)
+    : (after ? statements.ordersAfter : statements.ordersFirstPage).all(params);
+  const orders = rows.slice(0, limit);
+  const nextCursor = rows.length > limit ? encodeOrderCursor(orders[limit - 1]) : null;
+
+  return { orders, total, limit, nextCursor };
 }
 
 export function getOrderById(orderId: string): DeckRequest | undefined {
-  const db = getDatabase();
-  return db.select().from(deckRequests).where(eq(deckRequests.id, orderId)).get();
+  return getStatements().orderById.get({ id: orderId });
 }
 
 export function getOrderWithItems(orderId: string): { order: DeckRequest; lineItems: DeckLineItem[] } | undefined {
-  const db = getDatabase();
-  const order = db.select().from(deckRequests).where(eq(deckRequests.id, orderId)).get();
+  const statements = getStatements();
+  const order = statements.orderById.get({ id: orderId });
   if (!order) return undefined;
 
-  const items = db.select().from(deckLineItems).where(eq(deckLineItems.deckRequestId, orderId)).all();
+  const items = statements.lineItemsByOrder.all({ orderId });
   return { order, lineItems: items };
 }
 
@@ -202,40 +229,28 @@ interface UpdateOrderInput {
 }
 
 export function updateOrder(orderId: string, updates: UpdateOrderInput): DeckRequest | undefined {
-  const db = getDatabase();
-  const now = new Date().toISOString();
-
-  const updateData: Partial<NewDeckRequest> = {
-    updatedAt: now,
-  };
+  const statements = getStatements();
 
   if (updates.status !== undefined) {
-    const currentOrder = db.select().from(schema.deckRequests).where(eq(schema.deckRequests.id, orderId)).get();
+    const currentOrder = statements.orderById.get({ id: orderId });
     if (currentOrder) {
       const allowed = VALID_TRANSITIONS[currentOrder.status] || [];
       if (!allowed.includes(updates.status)) {
         throw new Error(`Cannot transition from '${currentOrder.status}' to '${updates.status}'`);
       }
     }
-    updateData.status = updates.status;
-    // Reset alert flags on status transitions
-    if (updates.status === 'in_progress') {
-      updateData.staleAlertSent = false;
-    }
-    if (updates.status === 'picked_up') {
-      updateData.pickupAlertSent = false;
-    }
   }
-  if (updates.staffNotes !== undefined) updateData.staffNotes = updates.staffNotes;
-  if (updates.estimatedTotal !== undefined) updateData.estimatedTotal = updates.estimatedTotal;
-  if (updates.missingItems !== undefined) updateData.missingItems = updates.missingItems;
-
-  db.update(deckRequests)
-    .set(updateData)
-    .where(eq(deckRequests.id, orderId))
-    .run();
 
-  return db.select().from(deckRequests).where(eq(deckRequests.id, orderId)).get();
+  // Unset fields bind as null and keep their value; moving to in_progress or
+  // picked_up also resets the matching alert flag
+  return statements.updateOrder.get({
+    id: orderId,
+    status: updates.status ?? null,
+    staffNotes: updates.staffNotes ?? null,
+    estimatedTotal: updates.estimatedTotal ?? null,
+    missingItems: updates.missingItems ?? null,
+    updatedAt: new Date().toISOString(),
+  });
 }
 
 interface UpdateLineItemInput {
@@ -246,21 +261,13 @@ interface UpdateLineItemInput {
 }
 
 export function updateLineItem(itemId: string, updates: UpdateLineItemInput): DeckLineItem | undefined {
-  const db = getDatabase();
-
-  const updateData: Partial<NewDeckLineItem> = {};
-
-  if (updates.quantityFound !== undefined) updateData.quantityFound = updates.quantityFound;
-  if (updates.unitPrice !== undefined) updateData.unitPrice = updates.unitPrice;
-  if (updates.conditionVariants !== undefined) updateData.conditionVariants = updates.conditionVariants;
-  if (updates.cardName !== undefined) updateData.cardName = updates.cardName;
-
-  db.update(deckLineItems)
-    .set(updateData)
-    .where(eq(deckLineItems.id, itemId))
-    .run();
-
-  return db.select().from(deckLineItems).where(eq(deckLineItems.id, itemId)).get();
+  return getStatements().updateLineItem.get({
+    id: itemId,
+    quantityFound: updates.quantityFound ?? null,
+    unitPrice: updates.unitPrice ?? null,
+    conditionVariants: updates.conditionVariants ?? null,
+    cardName: updates.cardName ?? null,
+  });
 }
 
 export function deleteLineItem(itemId: string): boolean {
@@ -270,11 +277,9 @@ export function deleteLineItem(itemId: string): boolean {
 }
 
 export function getLineItemById(itemId: string): DeckLineItem | undefined {
-  const db = getDatabase();
-  return db.select().from(deckLineItems).where(eq(deckLineItems.id, itemId)).get();
+  return getStatements().lineItemById.get({ id: itemId });
 }
 
 export function getLineItemsByOrderId(orderId: string): DeckLineItem[] {
-  const db = getDatabase();
-  return db.select().from(deckLineItems).where(eq(deckLineItems.deckRequestId, orderId)).all();
+  return getStatements().lineItemsByOrder.all({ orderId });
 }
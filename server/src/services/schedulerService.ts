@@ -3,6 +3,15 @@ import { sendDailyDigest, checkStaleOrders } from './discordService.js';
 
 let lastDigestDate = '';
 let lastStaleCheck = 0;
+let lastTickAt = 0;
+let timer: NodeJS.Timeout | null = null;
+
+const TICK_INTERVAL_MS = 60 * 1000;
+
+// For /api/ready: null when the scheduler is disabled (no Discord webhook) or not started yet
+export function getSchedulerStatus() {
+  return lastTickAt ? { lastTickAt, intervalMs: TICK_INTERVAL_MS } : null;
+}
 
 function getCurrentHourInTimezone(timezone: string): { hour: number; dateStr: string } {
   const now = new Date();
@@ -25,6 +34,7 @@ function getCurrentHourInTimezone(timezone: string): { hour: number; dateStr: st
 
 async function tick() {
   if (!config.discord.webhookUrl) return;
+  lastTickAt = Date.now();
 
   try {
     const { hour, dateStr } = getCurrentHourInTimezone(config.discord.timezone);
@@ -51,13 +61,22 @@ export function startScheduler() {
     console.log('Discord webhook not configured — scheduler disabled');
     return;
   }
+  if (timer) return;
 
   console.log(`Scheduler started: daily digest at ${config.discord.dailyDigestHour}:00 ${config.discord.timezone}`);
 
   // Check every 60 seconds
-  setInterval(tick, 60 * 1000);
+  lastTickAt = Date.now();
+  timer = setInterval(tick, TICK_INTERVAL_MS);
 
   // Run stale check immediately on startup
   lastStaleCheck = Date.now();
   checkStaleOrders().catch(err => console.error('Initial stale check failed:', err));
 }
+
+// When this process stops being the job leader
+export function stopScheduler() {
+  if (timer) clearInterval(timer);
+  timer = null;
+  lastTickAt = 0;
+}
@@ -0,0 +1,256 @@
+import { monitorEventLoopDelay, PerformanceObserver, constants } from 'perf_hooks';
+
+// Minimal Prometheus text-format (0.0.4) metrics. Observations only touch a
+// Map and a small array, so they are cheap enough for every request and every
+// SQLite statement; all formatting happens when /api/metrics is scraped.
+
+type Labels = Record<string, string>;
+
+// Request and statement latency buckets, in seconds
+export const LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+interface Series {
+  labels: Labels;
+  value: number;
+}
+
+interface HistogramSeries {
+  labels: Labels;
+  buckets: number[];
+  sum: number;
+  count: number;
+}
+
+function seriesKey(labels: Labels): string {
+  let key = '';
+  for (const name in labels) key += `${labels[name]}\u0000`;
+  return key;
+}
+
+function escapeLabel(value: string): string {
+  return value.replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+}
+
+function formatLabels(labels: Labels, extra?: string): string {
+  const parts = Object.entries(labels).map(([name, value]) => `${name}="${escapeLabel(value)}"`);
+  if (extra) parts.push(extra);
+  return parts.length ? `{${parts.join(',')}}` : '';
+}
+
+function formatValue(value: number): string {
+  if (value === Infinity) return '+Inf';
+  if (value === -Infinity) return '-Inf';
+  return String(value);
+}
+
+// A metric's current series, as sent between cluster workers
+export type MetricSnapshot =
+  | { type: 'counter' | 'gauge'; name: string; help: string; shared?: boolean; series: Series[] }
+  | { type: 'histogram'; name: string; help: string; bounds: number[]; series: HistogramSeries[] };
+
+interface Metric {
+  snapshot(): MetricSnapshot;
+}
+
+const registry: Metric[] = [];
+
+export class Counter implements Metric {
+  private series = new Map<string, Series>();
+
+  constructor(readonly name: string, readonly help: string) {
+    registry.push(this);
+  }
+
+  inc(labels: Labels = {}, amount = 1) {
+    const key = seriesKey(labels);
+    const series = this.series.get(key);
+    if (series) {
+      series.value += amount;
+    } else {
+      this.series.set(key, { labels, value: amount });
+    }
+  }
+
+  snapshot(): MetricSnapshot {
+    return { type: 'counter', name: this.name, help: this.help, series: [...this.series.values()] };
+  }
+}
+
+export class Gauge implements Metric {
+  private series = new Map<string, Series>();
+
+  // collect, if given, runs at scrape time and replaces all series. A shared
+  // gauge reads state every process sees alike (the database), so in cluster
+  // mode it is reported once instead of per worker.
+  constructor(
+    readonly name: string,
+    readonly help: string,
+    private readonly collect?: (gauge: Gauge) => void,
+    readonly shared = false,
+  ) {
+    registry.push(this);
+  }
+
+  set(labels: Labels, value: number) {
+    this.series.set(seriesKey(labels), { labels, value });
+  }
+
+  snapshot(): MetricSnapshot {
+    if (this.collect) {
+      this.series.clear();
+      this.collect(this);
+    }
+    return { type: 'gauge', name: this.name, help: this.help, shared: this.shared, series: [...this.series.values()] };
+  }
+}
+
+export class Histogram implements Metric {
+  private series = new Map<string, HistogramSeries>();
+
+  constructor(
+    readonly name: string,
+    readonly help: string,
+    readonly bounds: number[] = LATENCY_BUCKETS,
+  ) {
+    registry.push(this);
+  }
+
+  observe(labels: Labels, value: number) {
+    const key = seriesKey(labels);
+    let series = this.series.get(key);
+    if (!series) {
+      series = { labels, buckets: new Array(this.bounds.length + 1).fill(0), sum: 0, count: 0 };
+      this.series.set(key, series);
+    }
+    let i = 0;
+    while (i < this.bounds.length && value > this.bounds[i]) i++;
+    series.buckets[i]++;
+    series.sum += value;
+    series.count++;
+  }
+
+  snapshot(): MetricSnapshot {
+    return {
+      type: 'histogram', name: this.name, help: this.help, bounds: this.bounds, series: [...this.series.values()],
+    };
+  }
+}
+
+function renderSnapshot(metric: MetricSnapshot): string[] {
+  const lines = [`# HELP ${metric.name} ${metric.help}`, `# TYPE ${metric.name} ${metric.type}`];
+  if (metric.type !== 'histogram') {
+    for (const { labels, value } of metric.series) {
+      lines.push(`${metric.name}${formatLabels(labels)} ${formatValue(value)}`);
+    }
+    return lines;
+  }
+  for (const { labels, buckets, sum, count } of metric.series) {
+    let cumulative = 0;
+    for (let i = 0; i <= metric.bounds.length; i++) {
+      cumulative += buckets[i];
+      const le = i < metric.bounds.length ? formatValue(metric.bounds[i]) : '+Inf';
+      lines.push(`${metric.name}_bucket${formatLabels(labels, `le="${le}"`)} ${cumulative}`);
+    }
+    lines.push(`${metric.name}_sum${formatLabels(labels)} ${sum}`);
+    lines.push(`${metric.name}_count${formatLabels(labels)} ${count}`);
+  }
+  return lines;
+}
+
+// Seconds elapsed since a process.hrtime.bigint() reading
+export function secondsSince(start: bigint): number {
+  return Number(process.hrtime.bigint() - start) / 1e9;
+}
+
+export function snapshotMetrics(): MetricSnapshot[] {
+  return registry.map((metric) => metric.snapshot());
+}
+
+export function renderMetrics(metrics: MetricSnapshot[] = snapshotMetrics()): string {
+  return metrics.flatMap(renderSnapshot).join('\n') + '\n';
+}
+
+// Combine the snapshots of every cluster worker into one set of metrics:
+// counters and histograms are summed, per-process gauges get a worker label
+// and shared gauges are taken from the first worker that reports them
+export function mergeMetrics(workers: { worker: number; metrics: MetricSnapshot[] }[]): MetricSnapshot[] {
+  const merged = new Map<string, { metric: MetricSnapshot; series: Map<string, Series | HistogramSeries> }>();
+  for (const { worker, metrics } of workers) {
+    for (const metric of metrics) {
+      let target = merged.get(metric.name);
+      if (!target) {
+        target = { metric: { ...metric, series: [] }, series: new Map() };
+        merged.set(metric.name, target);
+      } else if (metric.type === 'gauge' && metric.shared) {
+        continue;
+      }
+      for (const series of metric.series) {
+        if (metric.type === 'gauge' && !metric.shared) {
+          const labels = { ...series.labels, worker: String(worker) };
+          target.series.set(seriesKey(labels), { labels, value: (series as Series).value });
+          continue;
+        }
+        const key = seriesKey(series.labels);
+        const existing = target.series.get(key);
+        if (metric.type !== 'histogram') {
+          const value = (series as Series).value;
+          if (existing) (existing as Series).value += value;
+          else target.series.set(key, { labels: series.labels, value });
+          continue;
+        }
+        const { buckets, sum, count } = series as HistogramSeries;
+        if (existing) {
+          const into = existing as HistogramSeries;
+          buckets.forEach((n, i) => { into.buckets[i] += n; });
+          into.sum += sum;
+          into.count += count;
+        } else {
+          target.series.set(key, { labels: series.labels, buckets: [...buckets], sum, count });
+        }
+      }
+    }
+  }
+  return [...merged.values()].map(({ metric, series }) => ({ ...metric, series: [...series.values()] }) as MetricSnapshot);
+}
+
+// ---------------------------------------------------------------------------
+// Runtime metrics
+
+const eventLoopDelay = monitorEventLoopDelay({ resolution: 10 });
+eventLoopDelay.enable();
+
+// Percentiles since the previous scrape; the histogram resets each time
+new Gauge('nodejs_eventloop_lag_seconds', 'Event loop delay since the previous scrape', (gauge) => {
+  gauge.set({ quantile: '0.5' }, eventLoopDelay.percentile(50) / 1e9);
+  gauge.set({ quantile: '0.99' }, eventLoopDelay.percentile(99) / 1e9);
+  gauge.set({ quantile: '1' }, eventLoopDelay.max / 1e9);
+  eventLoopDelay.reset();
+});
+
+new Gauge('nodejs_memory_bytes', 'Process memory by kind', (gauge) => {
+  const usage = process.memoryUsage();
+  gauge.set({ kind: 'rss' }, usage.rss);
+  gauge.set({ kind: 'heap_total' }, usage.heapTotal);
+  gauge.set({ kind: 'heap_used' }, usage.heapUsed);
+  gauge.set({ kind: 'external' }, usage.external);
+});
+
+const gcKinds: Record<number, string> = {
+  [constants.NODE_PERFORMANCE_GC_MAJOR]: 'major',
+  [constants.NODE_PERFORMANCE_GC_MINOR]: 'minor',
+  [constants.NODE_PERFORMANCE_GC_INCREMENTAL]: 'incremental',
+  [constants.NODE_PERFORMANCE_GC_WEAKCB]: 'weakcb',
+};
+
+const gcDuration = new Histogram(
+  'nodejs_gc_duration_seconds',
+  'Garbage collection pauses by kind',
+  [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1],
+);
+
+new PerformanceObserver((list) => {
+  for (const entry of list.getEntries()) {
+    const kind = (entry.detail as { kind?: number } | undefined)?.kind;
+    gcDuration.observe({ kind: gcKinds[kind ?? -1] ?? 'other' }, entry.duration / 1000);
+  }
+}).observe({ entryTypes: ['gc'] });
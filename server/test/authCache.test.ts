@@ -0,0 +1,54 @@
+// Revoked tokens: this process's logouts at once, other processes' within a refresh
+import { test, after } from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'launchlist-test-'));
+process.env.DATABASE_PATH = path.join(dir, 'test.db');
+process.env.JWT_SECRET ??= 'test-only-secret-that-is-at-least-32-chars';
+
+const { initializeDatabase, getSqlite } = await import('../src/db/index.js');
+const { loadTokenBlacklist, isTokenRevoked, revokeToken } = await import('../src/services/authCache.js');
+
+initializeDatabase();
+after(() => fs.rmSync(dir, { recursive: true, force: true }));
+
+const expiresAt = new Date(Date.now() + 60 * 60 * 1000).toISOString();
+
+// As the other blue/green container would: a row in the shared database, no broadcast
+function revokeElsewhere(token: string) {
+  getSqlite().prepare('INSERT INTO token_blacklist (token, expires_at) VALUES (?, ?)').run(token, expiresAt);
+}
+
+test('tokens revoked before startup are loaded', () => {
+  revokeElsewhere('revoked-before-start');
+  loadTokenBlacklist();
+  assert.equal(isTokenRevoked('revoked-before-start'), true);
+  assert.equal(isTokenRevoked('never-revoked'), false);
+});
+
+test('a logout in this process applies at once', () => {
+  revokeToken('logged-out-here', expiresAt);
+  assert.equal(isTokenRevoked('logged-out-here'), true);
+});
+
+test('a token revoked by another process is picked up on the next refresh', () => {
+  const start = Date.now();
+  loadTokenBlacklist(start);
+  revokeElsewhere('logged-out-elsewhere');
+  assert.equal(isTokenRevoked('logged-out-elsewhere', start + 1), false, 'read at most once per refresh interval');
+  assert.equal(isTokenRevoked('logged-out-elsewhere', start + 1000), true);
+  assert.equal(isTokenRevoked('logged-out-here', start + 1000), true);
+  assert.equal(isTokenRevoked('revoked-before-start', start + 1000), true);
+});
+
+test('a refresh adds new rows without reloading the table', () => {
+  const start = Date.now();
+  loadTokenBlacklist(start);
+  getSqlite().exec("DELETE FROM token_blacklist WHERE token = 'revoked-before-start'");
+  revokeElsewhere('revoked-after-prune');
+  assert.equal(isTokenRevoked('revoked-after-prune', start + 1000), true);
+  assert.equal(isTokenRevoked('revoked-before-start', start + 1000), true, 'still revoked until it expires');
+});
@@ -0,0 +1,59 @@
+// Job leader lease: taken only once the other holder's lease has expired
+import { test, after } from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'launchlist-test-'));
+process.env.DATABASE_PATH = path.join(dir, 'test.db');
+process.env.JWT_SECRET ??= 'test-only-secret-that-is-at-least-32-chars';
+
+const { initializeDatabase, getSqlite } = await import('../src/db/index.js');
+const { startLeaderElection, releaseLeadership, isLeader, getLeaderStatus } =
+  await import('../src/services/leaderService.js');
+
+initializeDatabase();
+after(() => {
+  releaseLeadership();
+  fs.rmSync(dir, { recursive: true, force: true });
+});
+
+const OTHER = 'other-host:1';
+
+function leaseHeldBy(holder: string, expiresAt: number) {
+  getSqlite().prepare(`
+    INSERT INTO leader_lease (name, holder, expires_at) VALUES ('jobs', ?, ?)
+    ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+  `).run(holder, expiresAt);
+}
+
+function campaign() {
+  const events: string[] = [];
+  startLeaderElection(() => events.push('elected'), () => events.push('deposed'));
+  return events;
+}
+
+test('a live lease held by another process is left alone', () => {
+  leaseHeldBy(OTHER, Date.now() + 30_000);
+  const events = campaign();
+  releaseLeadership();
+  assert.deepEqual(events, []);
+  assert.equal(isLeader(), false);
+  assert.equal(getLeaderStatus().holder, OTHER);
+});
+
+test('an expired lease is taken over', () => {
+  leaseHeldBy(OTHER, Date.now() - 1);
+  const events = campaign();
+  assert.deepEqual(events, ['elected']);
+  assert.equal(isLeader(), true);
+  const status = getLeaderStatus();
+  assert.equal(status.holder, `${os.hostname()}:${process.pid}`);
+  assert.ok(status.expiresInMs! > 20_000);
+
+  // Releasing hands the lease over at once instead of when it expires
+  releaseLeadership();
+  assert.equal(isLeader(), false);
+  assert.equal(getLeaderStatus().holder, null);
+});
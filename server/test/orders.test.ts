@@ -0,0 +1,109 @@
+// Keyset cursors for the staff order list and the trigger-kept order_counts
+import { test, after } from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'launchlist-test-'));
+process.env.DATABASE_PATH = path.join(dir, 'test.db');
+process.env.JWT_SECRET ??= 'test-only-secret-that-is-at-least-32-chars';
+
+const { initializeDatabase, getSqlite } = await import('../src/db/index.js');
+const { getAllOrders, encodeOrderCursor, decodeOrderCursor } = await import('../src/services/orderService.js');
+
+initializeDatabase();
+after(() => fs.rmSync(dir, { recursive: true, force: true }));
+
+function insertOrder(id: string, status: string, createdAt: string) {
+  getSqlite().prepare(`
+    INSERT INTO deck_requests (id, order_number, customer_name, email, game, raw_decklist, status, created_at, updated_at)
+    VALUES (?, ?, 'Test Customer', 'test@example.com', 'magic', '4 Test Card', ?, ?, ?)
+  `).run(id, `TEST-${id}`, status, createdAt, createdAt);
+}
+
+function orderCounts(): Record<string, number> {
+  const rows = getSqlite().prepare('SELECT status, count FROM order_counts WHERE count != 0').all() as
+    { status: string; count: number }[];
+  return Object.fromEntries(rows.map((row) => [row.status, row.count]));
+}
+
+function countedByScan(): Record<string, number> {
+  const rows = getSqlite().prepare('SELECT status, COUNT(*) AS count FROM deck_requests GROUP BY status').all() as
+    { status: string; count: number }[];
+  return Object.fromEntries(rows.map((row) => [row.status, row.count]));
+}
+
+function clearOrders() {
+  getSqlite().exec('DELETE FROM deck_requests');
+}
+
+test('order cursors round-trip', () => {
+  const order = { createdAt: '2026-01-02T03:04:05.000Z', id: 'f3c0f5a2-0000-4000-8000-000000000001' };
+  const cursor = encodeOrderCursor(order);
+  assert.match(cursor, /^[A-Za-z0-9_-]+$/);
+  assert.deepEqual(decodeOrderCursor(cursor), order);
+});
+
+test('malformed cursors decode to undefined', () => {
+  assert.equal(decodeOrderCursor(''), undefined);
+  assert.equal(decodeOrderCursor('not-a-cursor'), undefined);
+  assert.equal(decodeOrderCursor(Buffer.from('2026-01-01|a|b').toString('base64url')), undefined);
+  assert.equal(decodeOrderCursor(Buffer.from('|a').toString('base64url')), undefined);
+});
+
+test('getAllOrders rejects an invalid cursor with a 400', () => {
+  assert.throws(() => getAllOrders({ cursor: 'not-a-cursor' }), { statusCode: 400, code: 'INVALID_CURSOR' });
+});
+
+test('getAllOrders pages through every order newest first', () => {
+  clearOrders();
+  // Two orders share a timestamp, so the id breaks the tie
+  const orders = [
+    ['a', 'submitted', '2026-01-01T00:00:00.000Z'],
+    ['b', 'ready', '2026-01-02T00:00:00.000Z'],
+    ['c', 'submitted', '2026-01-02T00:00:00.000Z'],
+    ['d', 'submitted', '2026-01-03T00:00:00.000Z'],
+    ['e', 'cancelled', '2026-01-04T00:00:00.000Z'],
+  ] as const;
+  for (const [id, status, createdAt] of orders) insertOrder(id, status, createdAt);
+
+  const seen: string[] = [];
+  let cursor: string | undefined;
+  do {
+    const page = getAllOrders({ limit: 2, cursor });
+    assert.equal(page.total, 5);
+    seen.push(...page.orders.map((order) => order.id));
+    cursor = page.nextCursor ?? undefined;
+  } while (cursor);
+  assert.deepEqual(seen, ['e', 'd', 'c', 'b', 'a']);
+
+  const submitted = getAllOrders({ limit: 2, status: 'submitted' });
+  assert.equal(submitted.total, 3);
+  assert.deepEqual(submitted.orders.map((order) => order.id), ['d', 'c']);
+  const rest = getAllOrders({ limit: 2, status: 'submitted', cursor: submitted.nextCursor! });
+  assert.deepEqual(rest.orders.map((order) => order.id), ['a']);
+  assert.equal(rest.nextCursor, null);
+});
+
+test('order_counts follows inserts, deletes and status changes', () => {
+  clearOrders();
+  assert.deepEqual(orderCounts(), {});
+
+  insertOrder('1', 'submitted', '2026-01-01T00:00:00.000Z');
+  insertOrder('2', 'submitted', '2026-01-01T00:01:00.000Z');
+  insertOrder('3', 'ready', '2026-01-01T00:02:00.000Z');
+  assert.deepEqual(orderCounts(), { submitted: 2, ready: 1 });
+
+  const sqlite = getSqlite();
+  sqlite.prepare("UPDATE deck_requests SET status = 'in_progress' WHERE id = '1'").run();
+  assert.deepEqual(orderCounts(), { submitted: 1, in_progress: 1, ready: 1 });
+
+  // Other columns and same-status updates leave the counts alone
+  sqlite.prepare("UPDATE deck_requests SET notes = 'x', status = 'ready' WHERE id = '3'").run();
+  assert.deepEqual(orderCounts(), { submitted: 1, in_progress: 1, ready: 1 });
+
+  sqlite.prepare("DELETE FROM deck_requests WHERE id = '2'").run();
+  assert.deepEqual(orderCounts(), { in_progress: 1, ready: 1 });
+  assert.deepEqual(orderCounts(), countedByScan());
+});
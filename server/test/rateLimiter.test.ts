@@ -0,0 +1,83 @@
+// Sliding-window arithmetic and the per-limiter client LRU
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import type { WindowCounts } from '../src/middleware/rateLimiter.js';
+
+// rateLimiter.ts reads config.ts, which refuses to start without a JWT secret
+process.env.JWT_SECRET ??= 'test-only-secret-that-is-at-least-32-chars';
+const { slide, SlidingWindowStore } = await import('../src/middleware/rateLimiter.js');
+
+const WINDOW = 1000;
+const LIMIT = 10;
+
+function allowedAt(counts: WindowCounts, now: number): boolean {
+  return slide({ ...counts }, now, WINDOW, LIMIT).allowed;
+}
+
+test('slide admits up to the limit within one window', () => {
+  const counts = { windowStart: 0, previous: 0, current: 0 };
+  for (let i = 0; i < LIMIT; i++) assert.equal(slide(counts, 100 + i, WINDOW, LIMIT).allowed, true);
+  const denied = slide(counts, 200, WINDOW, LIMIT);
+  assert.equal(denied.allowed, false);
+  assert.equal(counts.current, LIMIT, 'a refused request is not counted');
+  // A full window's count only starts to decay once it becomes the previous one
+  assert.equal(denied.retryAfterMs, 801);
+});
+
+test('slide weights the previous window by its remaining overlap', () => {
+  // 25% into the window: 10 * 0.75 + 2 = 9.5 < 10, so allowed
+  assert.equal(allowedAt({ windowStart: 1000, previous: 10, current: 2 }, 1250), true);
+  // 10 * 0.75 + 3 = 10.5, refused
+  assert.equal(allowedAt({ windowStart: 1000, previous: 10, current: 3 }, 1250), false);
+});
+
+test('slide rolls windows over', () => {
+  const next = { windowStart: 0, previous: 4, current: 7 };
+  slide(next, 1500, WINDOW, LIMIT);
+  assert.deepEqual(next, { windowStart: 1000, previous: 7, current: 1 });
+
+  const idle = { windowStart: 0, previous: 4, current: 7 };
+  slide(idle, 2500, WINDOW, LIMIT);
+  assert.deepEqual(idle, { windowStart: 2000, previous: 0, current: 1 });
+});
+
+test('retryAfterMs is the first moment the request would be allowed', () => {
+  const cases: [WindowCounts, number][] = [
+    [{ windowStart: 0, previous: 0, current: 10 }, 100],
+    [{ windowStart: 1000, previous: 10, current: 3 }, 1250],
+    [{ windowStart: 1000, previous: 10, current: 9 }, 1010],
+    [{ windowStart: 1000, previous: 3, current: 12 }, 1999],
+    [{ windowStart: 5000, previous: 25, current: 0 }, 5001],
+  ];
+  for (const [counts, now] of cases) {
+    const { allowed, retryAfterMs } = slide({ ...counts }, now, WINDOW, LIMIT);
+    assert.equal(allowed, false, JSON.stringify(counts));
+    assert.ok(retryAfterMs >= 1);
+    assert.equal(allowedAt(counts, now + retryAfterMs - 1), false, `early at ${JSON.stringify(counts)}`);
+    assert.equal(allowedAt(counts, now + retryAfterMs), true, `late at ${JSON.stringify(counts)}`);
+  }
+});
+
+test('SlidingWindowStore evicts the least recently seen client', () => {
+  const store = new SlidingWindowStore(WINDOW, 1, 2);
+  assert.equal(store.hit('a', 0).allowed, true);
+  assert.equal(store.hit('b', 0).allowed, true);
+  assert.equal(store.hit('a', 1).allowed, false); // a is now the most recent
+  assert.equal(store.hit('c', 2).allowed, true); // evicts b
+  assert.equal(store.size, 2);
+  assert.equal(store.hit('a', 3).allowed, false, 'a kept its count');
+  assert.equal(store.hit('b', 4).allowed, true, 'b starts over'); // evicts c
+  assert.equal(store.hit('c', 5).allowed, true, 'c starts over');
+  assert.equal(store.size, 2);
+});
+
+test('SlidingWindowStore drops clients idle for two windows', () => {
+  const store = new SlidingWindowStore(WINDOW, LIMIT);
+  store.hit('a', 0);
+  store.hit('b', 1500);
+  assert.equal(store.size, 2);
+  store.hit('c', 2000);
+  assert.equal(store.size, 2);
+  assert.equal(store.hit('a', 2001).allowed, true);
+  assert.equal(store.size, 3);
+});
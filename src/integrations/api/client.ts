@@ -184,6 +184,7 @@ export const staff = {
   async getOrders(params: GetOrdersParams = {}): Promise<OrdersListResponse> {
     const searchParams = new URLSearchParams();
     if (params.limit !== undefined) searchParams.set('limit', params.limit.toString());
+    if (params.cursor) searchParams.set('cursor', params.cursor);
     if (params.offset !== undefined) searchParams.set('offset', params.offset.toString());
     if (params.status) searchParams.set('status', params.status);
 
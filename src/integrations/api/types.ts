@@ -121,11 +121,14 @@ export interface OrdersListResponse {
   orders: DeckRequest[];
   total: number;
   limit: number;
-  offset: number;
+  // Pass as GetOrdersParams.cursor for the next page; null on the last page
+  nextCursor: string | null;
+  offset?: number;
 }
 
 export interface GetOrdersParams {
   limit?: number;
+  cursor?: string;
   offset?: number;
   status?: RequestStatus;
 }
@@ -1,5 +1,6 @@
 // Centralized configuration for LaunchList
-// All values can be overridden via VITE_* environment variables
+// Values come from window.__LAUNCHLIST_CONFIG__ (served by the backend at
+// /config.js from LaunchList.env), then VITE_* build-time variables, then defaults
 
 interface StoreConfig {
   name: string;
@@ -28,8 +29,20 @@ interface Config {
   api: ApiConfig;
 }
 
+declare global {
+  interface Window {
+    // Runtime settings keyed like the VITE_* variables without the prefix
+    __LAUNCHLIST_CONFIG__?: Record<string, string>;
+  }
+}
+
+function lookup(key: string): string | undefined {
+  const runtime = window.__LAUNCHLIST_CONFIG__?.[key.replace(/^VITE_/, '')];
+  return runtime ?? import.meta.env[key];
+}
+
 function getEnv(key: string, defaultValue: string): string {
-  return import.meta.env[key] ?? defaultValue;
+  return lookup(key) ?? defaultValue;
 }
 
 /**
@@ -46,7 +59,7 @@ function formatPhoneNumber(phone: string): string {
 }
 
 function getEnvNumber(key: string, defaultValue: number): number {
-  const value = import.meta.env[key];
+  const value = lookup(key);
   if (value === undefined || value === '') return defaultValue;
   const parsed = parseInt(value, 10);
   return isNaN(parsed) ? defaultValue : parsed;
@@ -16,6 +16,7 @@ import { useAuth } from '@/hooks/useAuth';
 import api from '@/integrations/api/client';
 import { CONFIG } from '@/lib/config';
 import type { DeckRequest, RequestStatus, GameType } from '@/lib/types';
+import type { GetOrdersParams } from '@/integrations/api/types';
 
 // Map API response to frontend type
 function mapApiOrdersToFrontend(apiOrders: Array<{
@@ -50,6 +51,8 @@ export default function StaffDashboard() {
   const [statusFilter, setStatusFilter] = useState<string>('all');
   const [page, setPage] = useState(1);
   const [totalOrders, setTotalOrders] = useState(0);
+  // cursors[n] fetches page n + 1; page 1 has no cursor
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
 
   useEffect(() => {
     if (!authLoading && !user) {
@@ -70,25 +73,28 @@ export default function StaffDashboard() {
   useEffect(() => {
     if (isStaff) {
       setPage(1);
-      fetchRequests(1);
+      setCursors([undefined]);
+      fetchRequests(1, undefined);
     }
   }, [statusFilter]);
 
-  const fetchRequests = async (pageNum = page) => {
+  const fetchRequests = async (pageNum = page, cursor = cursors[pageNum - 1]) => {
     setLoading(true);
     setError(null);
 
     try {
-      const params: { limit: number; offset: number; status?: RequestStatus } = {
-        limit: 25,
-        offset: (pageNum - 1) * 25,
-      };
+      const params: GetOrdersParams = { limit: 25, cursor };
       if (statusFilter !== 'all') {
         params.status = statusFilter as RequestStatus;
       }
       const response = await api.staff.getOrders(params);
       setRequests(mapApiOrdersToFrontend(response.orders));
       setTotalOrders(response.total);
+      setCursors((prev) => {
+        const next = prev.slice(0, pageNum);
+        next[pageNum] = response.nextCursor ?? undefined;
+        return next;
+      });
     } catch {
       setError('Failed to load orders. Please try again.');
     } finally {
@@ -297,7 +303,7 @@ export default function StaffDashboard() {
                     <Button variant="outline" size="sm" onClick={() => setPage(p => Math.max(1, p - 1))} disabled={page === 1}>
                       Previous
                     </Button>
-                    <Button variant="outline" size="sm" onClick={() => setPage(p => p + 1)} disabled={page * 25 >= totalOrders}>
+                    <Button variant="outline" size="sm" onClick={() => setPage(p => p + 1)} disabled={!cursors[page]}>
                       Next
                     </Button>
                   </div>